@@ -333,6 +333,26 @@ async def _api_verify_batch(
     return all_results
 
 
+def triage_emails(emails: list[str], skip_disposable: bool = False) -> tuple[list[str], list[dict]]:
+    """Settle what can be decided locally before calling the API.
+
+    Invalid syntax (and, with skip_disposable, disposable domains) is answered
+    by engine.triage in one vectorized pass. Returns (emails still to verify,
+    OmniVerifier-style results for the rest).
+    """
+    if not emails:
+        return emails, []
+    try:
+        from engine.triage import needs_network, settled_results, triage
+        table = triage(emails)
+    except ImportError as e:
+        logger.info(f"Skipping local triage: {e}")
+        return emails, []
+    settled = [result.to_omniverifier() for _, result in settled_results(table, skip_disposable)]
+    pending = needs_network(table, skip_disposable).column("email").to_pylist()
+    return pending, settled
+
+
 # ── Squeeze Loop ────────────────────────────────────────────────────────────
 
 
@@ -571,6 +591,7 @@ async def run_pipeline(
     api_url: str,
     api_key: str,
     squeeze: int,
+    skip_disposable: bool = False,
 ):
     """Run the full find → verify → squeeze pipeline."""
     start = time.time()
@@ -599,12 +620,15 @@ async def run_pipeline(
         click.echo(f"  PHASE 1: Find emails + Verify existing (parallel)")
         click.echo(f"{'='*60}")
 
-        emails_to_verify = list({c["email"] for c in have_email})
+        emails_to_verify, triaged = triage_emails(list({c["email"] for c in have_email}), skip_disposable)
+        if triaged:
+            click.echo(f"  Triage settled {len(triaged)} emails locally (invalid syntax / disposable)")
 
         find_coro = _api_find_batch(session, can_find, api_url, headers, "FIND")
         verify_coro = _api_verify_batch(session, emails_to_verify, api_url, headers, "VERIFY")
 
         find_results, verify_results = await asyncio.gather(find_coro, verify_coro)
+        verify_results.extend(triaged)
 
         # Merge find results back into contacts
         found_emails = []
@@ -636,15 +660,23 @@ async def run_pipeline(
         # ── Phase 2: Verify newly found emails ──────────────────────────
         if found_emails:
             click.echo(f"\n  PHASE 2: Verify {len(found_emails)} newly found emails")
+            found_emails, triaged = triage_emails(found_emails, skip_disposable)
             found_verify = await _api_verify_batch(session, found_emails, api_url, headers, "FOUND-VERIFY")
-            verify_results.extend(found_verify)
+            verify_results.extend(found_verify + triaged)
 
         # ── Build email result map ──────────────────────────────────────
+        try:
+            from engine.triage import DISPOSABLE_SKIPPED
+        except ImportError:
+            DISPOSABLE_SKIPPED = None  # no local triage ran, so nothing was skipped
         email_results = {}
+        skipped = set()
         for r in verify_results:
             e = (r.get("email") or "").lower().strip()
             if e:
                 email_results[e] = {"email": e, "result": r.get("result", "unknown")}
+                if r.get("reason") == DISPOSABLE_SKIPPED:
+                    skipped.add(e)
 
         # Assign results to contacts
         for c in contacts:
@@ -665,7 +697,10 @@ async def run_pipeline(
             click.echo(f"  PHASE 3: Squeeze (max {squeeze} iterations)")
             click.echo(f"{'='*60}")
 
-            gained = await squeeze_loop(session, email_results, api_url, headers, max_iterations=squeeze)
+            # Skipped disposables stay unknown on purpose; the entries are shared,
+            # so squeezed results still land in email_results
+            squeezable = {e: r for e, r in email_results.items() if e not in skipped}
+            gained = await squeeze_loop(session, squeezable, api_url, headers, max_iterations=squeeze)
 
             # Update contacts with squeezed results
             for c in contacts:
@@ -723,7 +758,8 @@ def main():
 @click.option("--api-key", default=DEFAULT_API_KEY, help="API key")
 @click.option("--squeeze", default=5, type=int, help="Max squeeze iterations (0 to skip)")
 @click.option("--no-export", is_flag=True, help="Skip xlsx export")
-def run(input_path, output_file, output_dir, api_url, api_key, squeeze, no_export):
+@click.option("--skip-disposable", is_flag=True, help="Mark disposable emails risky without verifying them")
+def run(input_path, output_file, output_dir, api_url, api_key, squeeze, no_export, skip_disposable):
     """Process contact files end-to-end: find → verify → squeeze → export.
 
     INPUT_PATH can be a single xlsx/csv file or a directory of files.
@@ -751,7 +787,7 @@ def run(input_path, output_file, output_dir, api_url, api_key, squeeze, no_expor
         return
 
     # Run pipeline
-    contacts = asyncio.run(run_pipeline(contacts, out_dir, api_url, api_key, squeeze))
+    contacts = asyncio.run(run_pipeline(contacts, out_dir, api_url, api_key, squeeze, skip_disposable))
 
     # Export
     if not no_export:
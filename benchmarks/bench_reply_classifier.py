@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Microbenchmark for engine.errors.parse_smtp_response.
+
+Times three ways of classifying the reply corpus in smtp_replies.txt:
+
+  baseline  one re.I search per pattern, category by category (the parser
+            before patterns were compiled per category)
+  cold      parse_smtp_response with an empty memo
+  warm      parse_smtp_response answering from the memo
+
+It also checks that parse_smtp_response returns the same flags as the
+baseline for every corpus line, so the corpus doubles as a regression set.
+
+Usage: python benchmarks/bench_reply_classifier.py [--rounds 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engine import errors  # noqa: E402
+from engine.models import SmtpResponse  # noqa: E402
+
+CORPUS_PATH = Path(__file__).with_name("smtp_replies.txt")
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> list[tuple[int, str]]:
+    corpus = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        code, message = line.split("\t", 1)
+        corpus.append((int(code), message.replace("\\n", "\n")))
+    return corpus
+
+
+def _match_any(message: str, patterns: list[re.Pattern]) -> bool:
+    return any(p.search(message) for p in patterns)
+
+
+def baseline_flags(code: int, message: str) -> tuple[bool, bool, bool, bool, bool, bool]:
+    """Per-pattern reference classifier: (blacklisted, rcpt_limit, greylisted,
+    full_inbox, disabled, invalid)."""
+    SmtpResponse(code=code, message=message)  # the old parser built one per reply too
+    if 200 <= code < 300:
+        return (False,) * 6
+    if _match_any(message, errors._BLACKLIST_PATTERNS):
+        return (True, False, False, False, False, False)
+    if code in (421, 451, 452, 550, 552) and _match_any(message, errors._RCPT_LIMIT_PATTERNS):
+        return (False, True, False, False, False, False)
+    if 400 <= code < 500:
+        if _match_any(message, errors._GREYLIST_PATTERNS):
+            return (False, False, True, False, False, False)
+        if _match_any(message, errors._FULL_INBOX_PATTERNS):
+            return (False, False, False, True, False, False)
+        return (False, False, True, False, False, False)
+    if 500 <= code < 600:
+        if _match_any(message, errors._DISABLED_PATTERNS):
+            return (False, False, False, False, True, True)
+        if _match_any(message, errors._FULL_INBOX_PATTERNS):
+            return (False, False, False, True, False, False)
+        if _match_any(message, errors._INVALID_PATTERNS):
+            return (False, False, False, False, False, True)
+        if code in (550, 551, 552, 553):
+            return (False, False, False, False, False, True)
+    return (False,) * 6
+
+
+def parsed_flags(code: int, message: str) -> tuple[bool, bool, bool, bool, bool, bool]:
+    r = errors.parse_smtp_response(code, message)
+    return (r.is_blacklisted, r.is_rcpt_limit, r.is_greylisted, r.is_full_inbox, r.is_disabled, r.is_invalid)
+
+
+def _time(fn, corpus: list[tuple[int, str]], rounds: int, clear: bool = False) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        if clear:
+            errors._classify.cache_clear()
+        started = time.perf_counter()
+        for code, message in corpus:
+            fn(code, message)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    mismatches = [
+        (code, message) for code, message in corpus
+        if baseline_flags(code, message) != parsed_flags(code, message)
+    ]
+    for code, message in mismatches:
+        print(f"MISMATCH {code} {message[:100]!r}", file=sys.stderr)
+
+    baseline = _time(baseline_flags, corpus, args.rounds)
+    cold = _time(parsed_flags, corpus, args.rounds, clear=True)
+    warm = _time(parsed_flags, corpus, args.rounds)
+
+    per_reply = 1e6 / len(corpus)
+    print(f"corpus: {len(corpus)} replies, best of {args.rounds} rounds")
+    print(f"baseline  {baseline * per_reply:8.2f} us/reply")
+    print(f"cold      {cold * per_reply:8.2f} us/reply  ({baseline / cold:.1f}x)")
+    print(f"warm      {warm * per_reply:8.2f} us/reply  ({baseline / warm:.1f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
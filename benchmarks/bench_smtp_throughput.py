@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""End-to-end SMTP throughput benchmark against the local MTA simulator.
+
+Runs verify_batch, find_emails_batch and the HTTP /verify/batch endpoint
+(in-process via httpx's ASGI transport) against benchmarks/mta_simulator.py
+with DNS stubbed to point every domain at the simulator. For each target and
+batch size it reports throughput, p50/p99 time-to-result and connection
+counts on both sides.
+
+Results can be saved as a baseline and later runs compared against it:
+
+  python benchmarks/bench_smtp_throughput.py --sizes 1000,10000 --save benchmarks/results/baseline.json
+  python benchmarks/bench_smtp_throughput.py --sizes 1000,10000 --compare benchmarks/results/baseline.json
+
+With --compare the exit status is 1 when any throughput falls more than
+--tolerance below the baseline (or p99 grows by more than that).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import sys
+import time
+import zlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PROFILES = {
+    # Everything answers quickly: measures engine overhead
+    "fast": {},
+    "lan": {"latency": 0.002},
+    "wan": {"latency": 0.05},
+    # Real-world friction: greylisting, small RCPT limits, drops, no pipelining
+    "hostile": {"latency": 0.02, "greylist": True, "rcpt_limit": 5, "disconnect_rate": 0.01, "pipelining": False},
+    "catch_all": {"latency": 0.01, "catch_all": True},
+}
+
+TARGETS = ("verify_batch", "find_emails_batch", "http")
+
+
+def _free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _emails(size: int, per_domain: int, valid_ratio: float) -> list[str]:
+    valid_every = max(1, round(1 / valid_ratio)) if valid_ratio > 0 else 0
+    emails = []
+    for i in range(size):
+        local = f"user{i}" if valid_every and i % valid_every == 0 else f"nobody{i}"
+        emails.append(f"{local}@bench{i // per_domain}.test")
+    return emails
+
+
+def _contacts(size: int, per_domain: int) -> list[dict]:
+    return [
+        {"first_name": "user", "last_name": f"n{i}", "domain": f"bench{i // per_domain}.test"}
+        for i in range(size)
+    ]
+
+
+def _stub_dns(mx_hosts: list[str]) -> None:
+    from engine import bulk_dns, email_finder, verifier
+    from engine.models import DnsInfo
+
+    async def lookup_mx(domain: str, *args, **kwargs) -> DnsInfo:
+        mx = mx_hosts[zlib.crc32(domain.encode()) % len(mx_hosts)]
+        return DnsInfo(mx_hosts=[mx], has_mx=True, domain=domain)
+
+    verifier.lookup_mx = lookup_mx
+    bulk_dns.lookup_mx = lookup_mx
+    email_finder.lookup_mx = lookup_mx
+
+
+async def _run_target(target: str, size: int, args: argparse.Namespace, sim) -> dict:
+    from engine.smtp import close_session_pool, get_session_pool
+
+    done_at: list[float] = []
+    errors = 0
+    started = time.perf_counter()
+
+    def on_result(result) -> None:
+        nonlocal errors
+        done_at.append(time.perf_counter() - started)
+        errors += bool(result.error)
+
+    if target == "verify_batch":
+        from engine.verifier import verify_batch
+
+        await verify_batch(_emails(size, args.per_domain, args.valid_ratio), concurrency=args.concurrency,
+                           progress_callback=on_result)
+    elif target == "find_emails_batch":
+        from engine.email_finder import find_emails_batch
+
+        await find_emails_batch(_contacts(size, args.per_domain), concurrency=args.concurrency,
+                                progress_callback=on_result)
+    else:
+        import httpx
+        import server
+
+        server.RATE_LIMIT_MAX = sys.maxsize
+        server.CONCURRENCY = args.concurrency
+        emails = _emails(size, args.per_domain, args.valid_ratio)
+        chunks = [emails[i:i + server.MAX_BATCH_SIZE] for i in range(0, len(emails), server.MAX_BATCH_SIZE)]
+        gate = asyncio.Semaphore(args.http_parallel)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            async def post(chunk: list[str]) -> None:
+                async with gate:
+                    response = await client.post("/verify/batch", json={"emails": chunk})
+                    response.raise_for_status()
+                    done_at.extend([time.perf_counter() - started] * len(chunk))
+
+            await asyncio.gather(*(post(chunk) for chunk in chunks))
+
+    elapsed = time.perf_counter() - started
+    pool_stats = get_session_pool().stats()
+    await close_session_pool()
+    return {
+        "target": target,
+        "size": size,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(size / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(done_at, 0.50) * 1000.0, 1),
+        "p99_ms": round(_percentile(done_at, 0.99) * 1000.0, 1),
+        "errors": errors,
+        "mta": sim.stats.as_dict(),
+        "pool": {key: pool_stats[key] for key in ("dialed", "reused", "evicted")},
+    }
+
+
+def _run_one(target: str, size: int, args: argparse.Namespace, port: int, mx_hosts: list[str]) -> dict:
+    from mta_simulator import MtaProfile, MtaSimulator
+
+    async def run() -> dict:
+        sim = MtaSimulator(MtaProfile(seed=1, **PROFILES[args.profile]), host=mx_hosts, port=port)
+        await sim.start()
+        try:
+            return await _run_target(target, size, args, sim)
+        finally:
+            await sim.stop()
+
+    return asyncio.run(run())
+
+
+def _compare(runs: list[dict], baseline_path: Path, tolerance: float) -> bool:
+    baseline = json.loads(baseline_path.read_text())
+    previous = {(r["target"], r["size"]): r for r in baseline.get("runs", [])}
+    regressed = False
+    print(f"\ncompared with {baseline_path} (tolerance {tolerance:.0%})")
+    for run in runs:
+        old = previous.get((run["target"], run["size"]))
+        if old is None:
+            continue
+        throughput = run["throughput_per_s"] / old["throughput_per_s"] - 1 if old["throughput_per_s"] else 0.0
+        p99 = run["p99_ms"] / old["p99_ms"] - 1 if old["p99_ms"] else 0.0
+        bad = throughput < -tolerance or p99 > tolerance
+        regressed |= bad
+        print(
+            f"{'REGRESSION' if bad else 'ok':10s} {run['target']:18s} {run['size']:>7d}  "
+            f"throughput {throughput:+.1%}  p99 {p99:+.1%}"
+        )
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end SMTP throughput benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="lan")
+    parser.add_argument("--mx-hosts", type=int, default=4, help="loopback MX aliases (127.0.0.1..N)")
+    parser.add_argument("--per-domain", type=int, default=50, help="addresses per domain")
+    parser.add_argument("--valid-ratio", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--http-parallel", type=int, default=4, help="concurrent /verify/batch requests")
+    parser.add_argument("--save", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    port = _free_port()
+    # The engine reads these at import time
+    os.environ["KADENVERIFY_SMTP_PORT"] = str(port)
+    os.environ.setdefault("KADENVERIFY_SMTP_GREYLIST_DELAY", "0")
+    os.environ.setdefault("KADENVERIFY_CACHE_BACKEND", "none")
+    os.environ.setdefault("KADENVERIFY_INTEL_DB", "none")
+    os.environ.setdefault("KADENVERIFY_TIERED", "false")
+    for key in ("APOLLO_API_KEY", "EXA_API_KEY", "APOLLO_DB_PATH", "KADENVERIFY_API_KEY"):
+        os.environ.pop(key, None)
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    mx_hosts = [f"127.0.0.{i + 1}" for i in range(max(1, args.mx_hosts))]
+    _stub_dns(mx_hosts)
+
+    runs = []
+    for target in [t.strip() for t in args.targets.split(",") if t.strip()]:
+        if target not in TARGETS:
+            parser.error(f"unknown target {target!r}")
+        for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            run = _run_one(target, size, args, port, mx_hosts)
+            runs.append(run)
+            print(
+                f"{target:18s} {size:>7d}  {run['throughput_per_s']:>9.1f}/s  "
+                f"p50 {run['p50_ms']:>9.1f}ms  p99 {run['p99_ms']:>9.1f}ms  "
+                f"conns {run['mta']['connections']:>6d} (peak {run['mta']['peak_connections']})  "
+                f"dialed {run['pool']['dialed']} reused {run['pool']['reused']}",
+                flush=True,
+            )
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps({
+            "meta": {
+                "profile": args.profile,
+                "mx_hosts": args.mx_hosts,
+                "per_domain": args.per_domain,
+                "valid_ratio": args.valid_ratio,
+                "concurrency": args.concurrency,
+                "python": platform.python_version(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            "runs": runs,
+        }, indent=2) + "\n")
+        print(f"saved {args.save}")
+
+    if args.compare and _compare(runs, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Scriptable local MTA for end-to-end SMTP tests and benchmarks.
+
+MtaSimulator speaks just enough SMTP (EHLO/HELO, STARTTLS, MAIL, RCPT, RSET,
+NOOP, QUIT) to stand in for a real MX host. MtaProfile controls its
+behaviour:
+
+  latency          seconds before each batch of replies (one round trip;
+                   a pipelined group is answered in one batch)
+  banner_delay     seconds before the 220 banner (tarpit)
+  greylist         first RCPT for each address gets 451, later ones are judged
+  catch_all        every RCPT is accepted
+  rcpt_limit       RCPTs per transaction before 452 4.5.3
+  pipelining       advertise PIPELINING
+  starttls         advertise STARTTLS (upgrades with ``tls_context``, else 454)
+  require_tls      refuse MAIL with 530 until STARTTLS
+  disconnect_rate  probability of dropping the connection instead of replying
+                   to a MAIL/RCPT command
+
+Mailboxes are valid when ``valid(address)`` is true (default: local part
+starts with "user"). The simulator counts connections, peak concurrent
+connections, transactions and RCPTs.
+
+Run standalone: python benchmarks/mta_simulator.py --port 2525 --latency 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import ssl
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+
+def _default_valid(address: str) -> bool:
+    return address.startswith("user")
+
+
+@dataclass
+class MtaProfile:
+    latency: float = 0.0
+    banner_delay: float = 0.0
+    greylist: bool = False
+    catch_all: bool = False
+    rcpt_limit: int = 0
+    pipelining: bool = True
+    starttls: bool = False
+    require_tls: bool = False
+    disconnect_rate: float = 0.0
+    valid: Callable[[str], bool] = _default_valid
+    tls_context: Optional[ssl.SSLContext] = None
+    seed: Optional[int] = None
+
+
+@dataclass
+class MtaStats:
+    connections: int = 0
+    peak_connections: int = 0
+    transactions: int = 0
+    rcpts: int = 0
+    greylisted: int = 0
+    disconnects: int = 0
+    tls_upgrades: int = 0
+    helos: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "connections": self.connections,
+            "peak_connections": self.peak_connections,
+            "transactions": self.transactions,
+            "rcpts": self.rcpts,
+            "greylisted": self.greylisted,
+            "disconnects": self.disconnects,
+            "tls_upgrades": self.tls_upgrades,
+        }
+
+
+class _MtaConnection(asyncio.Protocol):
+    def __init__(self, sim: "MtaSimulator"):
+        self.sim = sim
+        self.profile = sim.profile
+        self.transport: Optional[asyncio.Transport] = None
+        self.buffer = bytearray()
+        self.outbox: list[bytes] = []
+        self.flush_handle: Optional[asyncio.Handle] = None
+        self.tls = False
+        self.rcpts = 0
+        self.closed = False
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        stats = self.sim.stats
+        stats.connections += 1
+        self.sim.active += 1
+        self.sim.connections.add(self)
+        stats.peak_connections = max(stats.peak_connections, self.sim.active)
+        loop = asyncio.get_running_loop()
+        loop.call_later(self.profile.banner_delay, self._reply, b"220 sim.mta ESMTP")
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.sim.connections.discard(self)
+        if not self.closed:
+            self.closed = True
+            self.sim.active -= 1
+
+    def data_received(self, data: bytes) -> None:
+        self.buffer += data
+        while not self.closed:
+            end = self.buffer.find(b"\n")
+            if end < 0:
+                break
+            line = bytes(self.buffer[:end]).decode("utf-8", errors="replace").strip()
+            del self.buffer[:end + 1]
+            self._command(line)
+
+    # -- replies ----------------------------------------------------------------
+
+    def _reply(self, line: bytes) -> None:
+        if self.closed:
+            return
+        self.outbox.append(line + b"\r\n")
+        if self.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.profile.latency:
+                self.flush_handle = loop.call_later(self.profile.latency, self._flush)
+            else:
+                self.flush_handle = loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self.flush_handle = None
+        if self.outbox and not self.closed:
+            self.transport.write(b"".join(self.outbox))
+        self.outbox.clear()
+
+    def _close(self) -> None:
+        if not self.closed:
+            self._flush()
+            self.closed = True
+            self.sim.active -= 1
+            self.transport.close()
+
+    # -- commands ---------------------------------------------------------------
+
+    def _command(self, line: str) -> None:
+        profile = self.profile
+        verb = line.split(" ", 1)[0].upper()
+        if verb in ("MAIL", "RCPT") and profile.disconnect_rate and self.sim.rng.random() < profile.disconnect_rate:
+            self.sim.stats.disconnects += 1
+            self.outbox.clear()
+            self._close()
+            return
+
+        if verb in ("EHLO", "HELO"):
+            self.sim.stats.helos.append(line.split(" ", 1)[-1])
+            self.rcpts = 0
+            if verb == "HELO":
+                self._reply(b"250 sim.mta")
+                return
+            extensions = ["sim.mta", "SIZE 52428800", "8BITMIME"]
+            if profile.pipelining:
+                extensions.append("PIPELINING")
+            if profile.starttls and not self.tls:
+                extensions.append("STARTTLS")
+            self._reply(b"\r\n".join(
+                f"250{' ' if i == len(extensions) - 1 else '-'}{ext}".encode()
+                for i, ext in enumerate(extensions)
+            ))
+        elif verb == "STARTTLS":
+            if not profile.starttls or self.tls or profile.tls_context is None:
+                self._reply(b"454 4.7.0 TLS not available due to local problem")
+                return
+            self._reply(b"220 2.0.0 Ready to start TLS")
+            self._flush()
+            asyncio.ensure_future(self._start_tls())
+        elif verb == "MAIL":
+            if profile.require_tls and not self.tls:
+                self._reply(b"530 5.7.0 Must issue a STARTTLS command first")
+                return
+            self.rcpts = 0
+            self.sim.stats.transactions += 1
+            self._reply(b"250 2.1.0 Ok")
+        elif verb == "RCPT":
+            self._reply(self._rcpt(line))
+        elif verb == "RSET":
+            self.rcpts = 0
+            self._reply(b"250 2.0.0 Ok")
+        elif verb == "NOOP":
+            self._reply(b"250 2.0.0 Ok")
+        elif verb == "QUIT":
+            self._reply(b"221 2.0.0 Bye")
+            self._close()
+        else:
+            self._reply(b"502 5.5.2 Error: command not recognized")
+
+    def _rcpt(self, line: str) -> bytes:
+        profile = self.profile
+        stats = self.sim.stats
+        address = line.split("<", 1)[-1].rstrip(">").lower()
+        self.rcpts += 1
+        stats.rcpts += 1
+        if profile.rcpt_limit and self.rcpts > profile.rcpt_limit:
+            return b"452 4.5.3 Error: too many recipients"
+        if profile.greylist and address not in self.sim.greylist_seen:
+            self.sim.greylist_seen.add(address)
+            stats.greylisted += 1
+            return b"451 4.7.1 Greylisted, please try again later"
+        if profile.catch_all or profile.valid(address):
+            return b"250 2.1.5 Ok"
+        return f"550 5.1.1 <{address}>: Recipient address rejected: User unknown".encode()
+
+    async def _start_tls(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            self.transport = await loop.start_tls(
+                self.transport, self, self.profile.tls_context, server_side=True
+            )
+        except (OSError, ssl.SSLError):
+            self._close()
+            return
+        self.tls = True
+        self.rcpts = 0
+        self.sim.stats.tls_upgrades += 1
+
+
+class MtaSimulator:
+    """In-process SMTP server driven by an MtaProfile."""
+
+    def __init__(self, profile: Optional[MtaProfile] = None, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile or MtaProfile()
+        self.host = host
+        self.port = port
+        self.stats = MtaStats()
+        self.active = 0
+        self.connections: set[_MtaConnection] = set()
+        self.greylist_seen: set[str] = set()
+        self.rng = random.Random(self.profile.seed)
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> int:
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(lambda: _MtaConnection(self), self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Server.wait_closed() waits for every client connection (3.12.1+),
+            # and pooled client sessions stay open until their owner closes them.
+            for conn in list(self.connections):
+                conn._close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MtaSimulator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+
+def self_signed_tls_context(directory: Optional[str] = None) -> ssl.SSLContext:
+    """Server-side TLS context with a throwaway self-signed certificate (needs the openssl CLI)."""
+    directory = directory or tempfile.mkdtemp(prefix="mta-sim-")
+    cert = Path(directory) / "cert.pem"
+    key = Path(directory) / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=sim.mta", "-keyout", str(key), "-out", str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(str(cert), str(key))
+    return context
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the local MTA simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--banner-delay", type=float, default=0.0)
+    parser.add_argument("--greylist", action="store_true")
+    parser.add_argument("--catch-all", action="store_true")
+    parser.add_argument("--rcpt-limit", type=int, default=0)
+    parser.add_argument("--no-pipelining", action="store_true")
+    parser.add_argument("--starttls", action="store_true")
+    parser.add_argument("--require-tls", action="store_true")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    profile = MtaProfile(
+        latency=args.latency,
+        banner_delay=args.banner_delay,
+        greylist=args.greylist,
+        catch_all=args.catch_all,
+        rcpt_limit=args.rcpt_limit,
+        pipelining=not args.no_pipelining,
+        starttls=args.starttls or args.require_tls,
+        require_tls=args.require_tls,
+        disconnect_rate=args.disconnect_rate,
+        tls_context=self_signed_tls_context() if args.starttls or args.require_tls else None,
+    )
+
+    async def serve() -> None:
+        sim = MtaSimulator(profile, args.host, args.port)
+        await sim.start()
+        print(f"MTA simulator listening on {args.host}:{sim.port}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await sim.stop()
+            print(sim.stats.as_dict())
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
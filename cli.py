@@ -19,8 +19,51 @@ from tqdm import tqdm
 # Ensure the project root is on the path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from engine.verifier import verify_email, verify_batch
-from engine.models import Reachability
+from engine.verifier import verify_email, verify_batch, verify_stream
+from engine.models import Reachability, VerificationResult
+from engine.bulk_dns import resolve_domains
+from engine.domain_intel import bind_domain_intel
+from engine.smtp import close_session_pool, mx_capabilities, rcpt_limits
+
+
+async def _run_engine(coro):
+    """Await an engine coroutine with the shared intel store attached.
+
+    The store supplies learned MX facts and domain intel (MX hosts, catch-all
+    verdicts) shared with the server and other runs. Pooled SMTP sessions are
+    closed before the event loop shuts down.
+    """
+    from store.cache import DomainCache
+    from store.intel_store import bind_mx_capabilities, bind_rcpt_limits, intel_store_from_env
+
+    store = intel_store_from_env()
+    if store is not None:
+        bind_rcpt_limits(rcpt_limits, store)
+        bind_mx_capabilities(mx_capabilities, store)
+        bind_domain_intel(DomainCache(backend=store))
+    try:
+        return await coro
+    finally:
+        await close_session_pool()
+        if store is not None:
+            bind_domain_intel(None)
+            store.close()
+
+
+def _triage_emails(emails: list[str], skip_disposable: bool) -> tuple[list[str], list[VerificationResult]]:
+    """Split emails into those that need the network and results settled by triage."""
+    from engine.triage import needs_network, settled_results, triage
+
+    try:
+        table = triage(emails)
+    except ImportError:
+        click.echo("pyarrow is not installed; skipping triage.")
+        return emails, []
+    settled = [result for _, result in settled_results(table, skip_disposable)]
+    pending = needs_network(table, skip_disposable).column("email").to_pylist()
+    counts = table.group_by("stage").aggregate([("index", "count")]).to_pylist()
+    click.echo("Triage: " + ", ".join(f"{row['stage']}={row['index_count']}" for row in counts))
+    return pending, settled
 
 
 def _setup_logging(verbose: bool) -> None:
@@ -46,7 +89,7 @@ def main(verbose: bool):
 @click.option("--json-output", is_flag=True, help="Output as JSON")
 def verify(email: str, helo: str, from_addr: str, json_output: bool):
     """Verify a single email address."""
-    result = asyncio.run(verify_email(email, helo_domain=helo, from_address=from_addr))
+    result = asyncio.run(_run_engine(verify_email(email, helo_domain=helo, from_address=from_addr)))
 
     if json_output:
         click.echo(json.dumps(result.to_omniverifier(), indent=2))
@@ -61,8 +104,17 @@ def verify(email: str, helo: str, from_addr: str, json_output: bool):
 @click.option("--concurrency", "-c", default=5, help="Max concurrent SMTP connections")
 @click.option("--helo", default="verify.kadenwood.com", help="EHLO domain")
 @click.option("--from-addr", default="verify@kadenwood.com", help="MAIL FROM address")
-def verify_file(filepath: str, output: str, fmt: str, concurrency: int, helo: str, from_addr: str):
+@click.option(
+    "--stream", is_flag=True,
+    help="Read the file lazily and write each result as it completes (flat memory; "
+         "completion order, json becomes JSON lines with an input index)",
+)
+def verify_file(filepath: str, output: str, fmt: str, concurrency: int, helo: str, from_addr: str, stream: bool):
     """Verify emails from a text file (one email per line)."""
+    if stream:
+        _verify_file_stream(filepath, output, fmt, concurrency, helo, from_addr)
+        return
+
     emails = _read_email_file(filepath)
     if not emails:
         click.echo("No emails found in file.")
@@ -76,12 +128,14 @@ def verify_file(filepath: str, output: str, fmt: str, concurrency: int, helo: st
         pbar.update(1)
 
     results = asyncio.run(
-        verify_batch(
-            emails,
-            concurrency=concurrency,
-            helo_domain=helo,
-            from_address=from_addr,
-            progress_callback=on_progress,
+        _run_engine(
+            verify_batch(
+                emails,
+                concurrency=concurrency,
+                helo_domain=helo,
+                from_address=from_addr,
+                progress_callback=on_progress,
+            )
         )
     )
     pbar.close()
@@ -100,6 +154,9 @@ def verify_file(filepath: str, output: str, fmt: str, concurrency: int, helo: st
 @click.option("--limit", type=int, help="Max emails to verify")
 @click.option("--helo", default="verify.kadenwood.com", help="EHLO domain")
 @click.option("--from-addr", default="verify@kadenwood.com", help="MAIL FROM address")
+@click.option("--triage/--no-triage", "triage_first", default=True,
+              help="Settle invalid-syntax and known no-MX rows before any network work")
+@click.option("--skip-disposable", is_flag=True, help="Record disposable addresses as risky without probing them")
 def pipeline(
     source: str,
     source_path: str,
@@ -110,11 +167,15 @@ def pipeline(
     limit: int,
     helo: str,
     from_addr: str,
+    triage_first: bool,
+    skip_disposable: bool,
 ):
     """Run batch verification against a DuckDB source.
 
     Reads emails from a people-warehouse DuckDB database, verifies them,
     and writes results to verified.duckdb. Incremental: skips already-verified emails.
+    Rows that triage can settle without the network are written first; the
+    rest are streamed and written in small batches as they complete.
     """
     from store.duckdb_io import (
         init_verified_db,
@@ -162,27 +223,45 @@ def pipeline(
 
     click.echo(f"Verifying {len(emails)} emails (concurrency={concurrency})...")
 
+    dns_pbar = tqdm(desc="Resolving", unit="domain")
     pbar = tqdm(total=len(emails), desc="Verifying", unit="email")
     batch_buffer: list = []
     WRITE_BATCH_SIZE = 100
 
-    def on_progress(result):
-        pbar.update(1)
-        batch_buffer.append(result)
-        # Write in batches for performance
-        if len(batch_buffer) >= WRITE_BATCH_SIZE:
-            write_results_batch(vconn, batch_buffer)
-            batch_buffer.clear()
-
-    results = asyncio.run(
-        verify_batch(
-            emails,
+    def on_dns_progress(done, total):
+        dns_pbar.total = total
+        dns_pbar.update(done - dns_pbar.n)
+        if done == total:
+            dns_pbar.close()
+
+    async def run() -> None:
+        # Triage runs with the intel store bound so known no-MX domains count
+        pending = emails
+        if triage_first:
+            pending, settled = _triage_emails(emails, skip_disposable)
+            write_results_batch(vconn, settled)
+            pbar.update(len(settled))
+
+        # Resolve every domain up front so the streamed chunks hit the DNS cache
+        domains = {email.rsplit("@", 1)[-1].lower() for email in pending if "@" in email}
+        await resolve_domains(domains, on_dns_progress)
+        dns_pbar.close()
+
+        async for _, result in verify_stream(
+            pending,
             concurrency=concurrency,
             helo_domain=helo,
             from_address=from_addr,
-            progress_callback=on_progress,
-        )
-    )
+        ):
+            pbar.update(1)
+            batch_buffer.append(result)
+            # Write in batches for performance
+            if len(batch_buffer) >= WRITE_BATCH_SIZE:
+                write_results_batch(vconn, batch_buffer)
+                batch_buffer.clear()
+
+    asyncio.run(_run_engine(run()))
+    dns_pbar.close()
     pbar.close()
 
     # Write remaining buffer
@@ -230,12 +309,77 @@ def stats(verified_db: str):
 
 def _read_email_file(filepath: str) -> list[str]:
     """Read emails from a text file (one per line)."""
+    return list(_iter_email_file(filepath))
+
+
+def _iter_email_file(filepath: str):
+    """Yield emails from a text file (one per line) without loading it."""
     with open(filepath) as f:
-        return [
-            line.strip()
-            for line in f
-            if line.strip() and not line.startswith("#") and "@" in line
-        ]
+        for line in f:
+            if line.strip() and not line.startswith("#") and "@" in line:
+                yield line.strip()
+
+
+_CSV_HEADER = [
+    "email", "status", "reachability", "deliverable", "catch_all",
+    "disposable", "role", "free", "provider", "mx_host", "smtp_code",
+]
+
+
+def _csv_row(r) -> list:
+    return [
+        r.email, r.to_omniverifier()["status"], r.reachability.value,
+        r.is_deliverable, r.is_catch_all, r.is_disposable,
+        r.is_role, r.is_free, r.provider.value, r.mx_host, r.smtp_code,
+    ]
+
+
+def _text_line(r) -> str:
+    icon = {"safe": "✓", "risky": "~", "invalid": "✗", "unknown": "?"}.get(r.reachability.value, "?")
+    return f"{icon} {r.email} [{r.reachability.value}]"
+
+
+def _verify_file_stream(filepath: str, output: str, fmt: str, concurrency: int, helo: str, from_addr: str):
+    """verify-file --stream: results are written as they complete."""
+    import csv
+
+    out = open(output, "w", newline="") if output else sys.stdout
+    writer = csv.writer(out) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(_CSV_HEADER)
+    counts: dict[str, int] = {}
+    pbar = tqdm(desc="Verifying", unit="email", disable=out is sys.stdout)
+
+    async def consume() -> None:
+        async for idx, r in verify_stream(
+            _iter_email_file(filepath),
+            concurrency=concurrency,
+            helo_domain=helo,
+            from_address=from_addr,
+        ):
+            counts[r.reachability.value] = counts.get(r.reachability.value, 0) + 1
+            pbar.update(1)
+            if writer is not None:
+                writer.writerow(_csv_row(r))
+            elif fmt == "json":
+                out.write(json.dumps({"index": idx, **r.to_omniverifier()}) + "\n")
+            else:
+                out.write(_text_line(r) + "\n")
+
+    try:
+        asyncio.run(_run_engine(consume()))
+    finally:
+        pbar.close()
+        if out is not sys.stdout:
+            out.close()
+            click.echo(f"Results written to {output}")
+
+    total = sum(counts.values())
+    click.echo(f"\nSummary ({total} emails):")
+    for reach in ["safe", "risky", "invalid", "unknown"]:
+        count = counts.get(reach, 0)
+        pct = (count / total * 100) if total > 0 else 0
+        click.echo(f"  {reach}: {count} ({pct:.1f}%)")
 
 
 def _print_result(result):
@@ -279,25 +423,12 @@ def _output_results(results, output_path, fmt):
         import io
         buf = io.StringIO()
         writer = csv.writer(buf)
-        writer.writerow([
-            "email", "status", "reachability", "deliverable", "catch_all",
-            "disposable", "role", "free", "provider", "mx_host", "smtp_code",
-        ])
+        writer.writerow(_CSV_HEADER)
         for r in results:
-            writer.writerow([
-                r.email, r.to_omniverifier()["status"], r.reachability.value,
-                r.is_deliverable, r.is_catch_all, r.is_disposable,
-                r.is_role, r.is_free, r.provider.value, r.mx_host, r.smtp_code,
-            ])
+            writer.writerow(_csv_row(r))
         text = buf.getvalue()
     else:
-        lines = []
-        for r in results:
-            icon = {"safe": "✓", "risky": "~", "invalid": "✗", "unknown": "?"}.get(
-                r.reachability.value, "?"
-            )
-            lines.append(f"{icon} {r.email} [{r.reachability.value}]")
-        text = "\n".join(lines)
+        text = "\n".join(_text_line(r) for r in results)
 
     if output_path:
         with open(output_path, "w") as f:
@@ -0,0 +1,211 @@
+"""Bulk MX resolution for large batches.
+
+Resolving every domain of a 50k-address batch at once floods the resolver:
+queries time out, and a timed-out lookup used to read as "no MX". The bulk
+resolver instead runs at most ``concurrency`` domain lookups at a time,
+spreads them over the upstream nameservers, and holds each upstream to
+``qps`` queries per second with a token bucket. A lookup that fails (as
+opposed to coming back empty) is retried on the next upstream, up to
+``attempts`` times; what still fails keeps DnsInfo.error set so callers can
+report it as unknown.
+
+Answers land in the shared engine.dns cache, so the per-email lookups that
+follow are cache hits. Upstreams come from KADENVERIFY_DNS_NAMESERVERS
+(comma-separated) or else the system resolver's nameservers.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+import dns.asyncresolver
+
+from .dns import get_resolver, lookup_mx
+from .models import DnsInfo
+
+logger = logging.getLogger("kadenverify.dns")
+
+DNS_NAMESERVERS = os.environ.get("KADENVERIFY_DNS_NAMESERVERS", "")
+DNS_BULK_CONCURRENCY = int(os.environ.get("KADENVERIFY_DNS_BULK_CONCURRENCY", "256"))
+DNS_QPS = float(os.environ.get("KADENVERIFY_DNS_QPS", "300"))
+DNS_ATTEMPTS = int(os.environ.get("KADENVERIFY_DNS_ATTEMPTS", "3"))
+DNS_BULK_TIMEOUT = float(os.environ.get("KADENVERIFY_DNS_BULK_TIMEOUT", "5"))
+
+
+class _TokenBucket:
+    """Allows ``rate`` acquisitions per second with bursts up to ``rate``."""
+
+    def __init__(self, rate: float):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.throttled = 0
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+            self.throttled += 1
+            await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class _Upstream:
+    """One nameserver: its resolver, rate limiter and counters.
+
+    Quacks like a dnspython resolver so it can be handed to engine.dns.
+    """
+
+    def __init__(self, name: str, resolver, qps: float):
+        self.name = name
+        self.resolver = resolver
+        self.bucket = _TokenBucket(qps)
+        self.queries = 0
+        self.failed_lookups = 0
+
+    async def resolve(self, qname: str, rdtype: str, lifetime: Optional[float] = None):
+        await self.bucket.acquire()
+        self.queries += 1
+        return await self.resolver.resolve(qname, rdtype, lifetime=lifetime)
+
+
+def _nameserver_resolver(nameserver: str) -> dns.asyncresolver.Resolver:
+    resolver = dns.asyncresolver.Resolver(configure=False)
+    resolver.nameservers = [nameserver]
+    return resolver
+
+
+class BulkResolver:
+    """Resolves many domains with bounded concurrency and per-upstream rate limits.
+
+    ``upstreams`` maps a label to a resolver object and defaults to one
+    resolver per nameserver (``nameservers``, else DNS_NAMESERVERS, else the
+    system resolver's list).
+    """
+
+    def __init__(
+        self,
+        nameservers: Optional[list[str]] = None,
+        upstreams: Optional[dict] = None,
+        concurrency: int = DNS_BULK_CONCURRENCY,
+        qps: float = DNS_QPS,
+        attempts: int = DNS_ATTEMPTS,
+        timeout: float = DNS_BULK_TIMEOUT,
+    ):
+        if upstreams is None:
+            if nameservers is None:
+                nameservers = [ns.strip() for ns in DNS_NAMESERVERS.split(",") if ns.strip()]
+            if not nameservers:
+                nameservers = [str(ns) for ns in getattr(get_resolver(), "nameservers", [])]
+            if nameservers:
+                upstreams = {ns: _nameserver_resolver(ns) for ns in nameservers}
+            else:
+                upstreams = {"system": get_resolver()}
+        self.upstreams = [_Upstream(name, resolver, qps) for name, resolver in upstreams.items()]
+        self.concurrency = max(1, concurrency)
+        self.attempts = max(1, attempts)
+        self.timeout = timeout
+        self.resolved = 0
+        self.failed = 0
+        self.retried = 0
+        self._next = 0
+
+    async def lookup(self, domain: str) -> DnsInfo:
+        """lookup_mx for one domain, retrying failed lookups on other upstreams."""
+        start = self._next
+        self._next = (self._next + 1) % len(self.upstreams)
+        dns_info = DnsInfo(domain=domain)
+        for attempt in range(self.attempts):
+            upstream = self.upstreams[(start + attempt) % len(self.upstreams)]
+            if attempt:
+                self.retried += 1
+            dns_info = await lookup_mx(domain, self.timeout, resolver=upstream)
+            if not dns_info.error:
+                break
+            upstream.failed_lookups += 1
+        if dns_info.error:
+            self.failed += 1
+        else:
+            self.resolved += 1
+        return dns_info
+
+    async def resolve(
+        self,
+        domains,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> dict[str, DnsInfo]:
+        """Resolve every distinct domain; returns {domain: DnsInfo}.
+
+        ``progress_callback(done, total)`` is called after each domain.
+        """
+        unique = list(dict.fromkeys(d.lower().strip() for d in domains if d and d.strip()))
+        total = len(unique)
+        results: dict[str, DnsInfo] = {}
+        if not total:
+            return results
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        log_every = max(1, total // 10)
+        started = time.monotonic()
+        done = 0
+
+        async def _resolve(domain: str) -> None:
+            nonlocal done
+            async with semaphore:
+                try:
+                    results[domain] = await self.lookup(domain)
+                except Exception as e:
+                    logger.warning(f"Bulk DNS lookup crashed for {domain}: {e}")
+                    results[domain] = DnsInfo(domain=domain, error="lookup crashed")
+            done += 1
+            if progress_callback:
+                progress_callback(done, total)
+            if done % log_every == 0 or done == total:
+                logger.info(f"Resolved {done}/{total} domains in {time.monotonic() - started:.1f}s")
+
+        await asyncio.gather(*(_resolve(d) for d in unique))
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "resolved": self.resolved,
+            "failed": self.failed,
+            "retried": self.retried,
+            "upstreams": {
+                u.name: {
+                    "queries": u.queries,
+                    "failed_lookups": u.failed_lookups,
+                    "throttled": u.bucket.throttled,
+                }
+                for u in self.upstreams
+            },
+        }
+
+
+_bulk_resolver: Optional[BulkResolver] = None
+
+
+def get_bulk_resolver() -> BulkResolver:
+    """The shared bulk resolver (created on first use)."""
+    global _bulk_resolver
+    if _bulk_resolver is None:
+        _bulk_resolver = BulkResolver()
+    return _bulk_resolver
+
+
+async def resolve_domains(
+    domains,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> dict[str, DnsInfo]:
+    """Resolve many domains through the shared bulk resolver."""
+    return await get_bulk_resolver().resolve(domains, progress_callback)
+
+
+def bulk_dns_stats() -> dict:
+    return _bulk_resolver.stats() if _bulk_resolver is not None else {}
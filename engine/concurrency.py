@@ -0,0 +1,143 @@
+"""Adaptive per-MX concurrency control (AIMD).
+
+Each MX host gets its own limit on parallel SMTP sessions. The limit grows by
+one after every window of healthy transactions (2xx/5xx replies at normal
+latency) and is cut multiplicatively on congestion signals: 421 replies,
+timeouts, connection failures and blacklist rejections. A big provider that
+keeps answering quickly climbs to the configured maximum, while a slow or
+throttling host settles at a few sessions.
+"""
+
+import asyncio
+import collections
+import time
+from typing import Optional
+
+
+class AimdLimiter:
+    """Counting semaphore whose capacity follows additive-increase / multiplicative-decrease."""
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 16,
+        backoff: float = 0.5,
+        latency_tolerance: float = 3.0,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.increases = 0
+        self.decreases = 0
+        self.congestion: dict[str, int] = collections.Counter()
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._waiters: collections.deque[asyncio.Future] = collections.deque()
+        self._woken = 0
+
+    async def acquire(self) -> None:
+        """Wait for a session slot; waiters are admitted in arrival order."""
+        # Slots handed to woken waiters stay reserved until they run, so a
+        # newcomer cannot take one and push an older waiter back.
+        if self._waiters or self.in_flight + self._woken >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            while True:
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    elif not waiter.cancelled():
+                        # We were woken but give up: pass the turn on
+                        self._woken -= 1
+                        self._wake()
+                    raise
+                self._woken -= 1
+                if self.in_flight < int(self.limit):
+                    break
+                # The limit was cut before we ran: wait again at the head
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.appendleft(waiter)
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight - self._woken
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._woken += 1
+                free -= 1
+
+    def on_success(self, latency: float) -> None:
+        """A transaction completed normally in ``latency`` seconds."""
+        healthy = self.latency_ewma is None or latency <= self.latency_ewma * self.latency_tolerance
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+        if not healthy:
+            return
+        self._successes += 1
+        if self._successes >= int(self.limit) and self.limit < self.maximum:
+            self._successes = 0
+            self.limit += 1
+            self.increases += 1
+            self._wake()
+
+    def on_congestion(self, reason: str) -> None:
+        """The host pushed back (421, timeout, blacklist...): cut the limit."""
+        self.congestion[reason] += 1
+        self._successes = 0
+        now = time.monotonic()
+        # One cut per round trip: a burst of failures from sessions that were
+        # already in flight is a single congestion event.
+        if now - self._last_decrease < max(1.0, self.latency_ewma or 0.0):
+            return
+        self._last_decrease = now
+        new_limit = max(float(self.minimum), int(self.limit * self.backoff))
+        if new_limit < self.limit:
+            self.limit = new_limit
+            self.decreases += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "latency_ewma_ms": round(self.latency_ewma * 1000.0, 1) if self.latency_ewma is not None else None,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "congestion": dict(self.congestion),
+        }
+
+
+class MxConcurrencyController:
+    """One AimdLimiter per MX host, created on first use."""
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._limiters: dict[str, AimdLimiter] = {}
+
+    def limiter(self, mx_host: str) -> AimdLimiter:
+        mx_host = mx_host.lower()
+        limiter = self._limiters.get(mx_host)
+        if limiter is None:
+            limiter = AimdLimiter(self.initial, self.minimum, self.maximum)
+            self._limiters[mx_host] = limiter
+        return limiter
+
+    def __len__(self) -> int:
+        return len(self._limiters)
+
+    def snapshot(self) -> dict[str, dict]:
+        return {mx_host: limiter.snapshot() for mx_host, limiter in self._limiters.items()}
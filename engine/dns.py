@@ -1,7 +1,20 @@
-"""Async DNS MX/A/AAAA lookup with provider detection."""
+"""Async DNS MX/A/AAAA lookup with provider detection.
+
+All lookups go through one process-wide resolver (resolv.conf is read once)
+and a bounded LRU cache. Answers are kept for their record TTL (clamped to
+[DNS_MIN_TTL, DNS_MAX_TTL]); NXDOMAIN and empty answers are kept for
+DNS_NEGATIVE_TTL. Timeouts and server failures are never cached.
+
+MX host addresses (A/AAAA) are resolved here too, so SMTP connects by IP
+instead of going through getaddrinfo in the default thread-pool executor.
+"""
 
 import asyncio
+import collections
+import ipaddress
 import logging
+import os
+import time
 from typing import Optional
 
 import dns.asyncresolver
@@ -11,12 +24,150 @@ import dns.rdatatype
 import dns.exception
 
 from .models import DnsInfo, Provider
+from .singleflight import SingleFlight
+from .timing import stage_timings
 
 logger = logging.getLogger("kadenverify.dns")
 
 # DNS timeout in seconds
 DNS_TIMEOUT = 10.0
 
+# MX hosts (best first) whose A/AAAA records lookup_mx prefetches
+MX_ADDRESS_PREFETCH = 1
+
+DNS_CACHE_SIZE = int(os.environ.get("KADENVERIFY_DNS_CACHE_SIZE", "50000"))
+DNS_NEGATIVE_TTL = float(os.environ.get("KADENVERIFY_DNS_NEGATIVE_TTL", "300"))
+DNS_MIN_TTL = float(os.environ.get("KADENVERIFY_DNS_MIN_TTL", "30"))
+DNS_MAX_TTL = float(os.environ.get("KADENVERIFY_DNS_MAX_TTL", "86400"))
+
+
+class DnsCacheEntry:
+    """Cached answer for one (name, rdtype): records, or a negative answer."""
+
+    __slots__ = ("records", "nxdomain", "expires_at")
+
+    def __init__(self, records: tuple[str, ...], nxdomain: bool, expires_at: float):
+        self.records = records
+        self.nxdomain = nxdomain
+        self.expires_at = expires_at
+
+
+class DnsCache:
+    """Bounded LRU of DNS answers that expire with their TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = DNS_CACHE_SIZE,
+        negative_ttl: float = DNS_NEGATIVE_TTL,
+        min_ttl: float = DNS_MIN_TTL,
+        max_ttl: float = DNS_MAX_TTL,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max(min_ttl, max_ttl)
+        self._entries: collections.OrderedDict[tuple[str, str], DnsCacheEntry] = collections.OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name: str, rdtype: str) -> Optional[DnsCacheEntry]:
+        key = (name, rdtype)
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if entry.records:
+            self.hits += 1
+        else:
+            self.negative_hits += 1
+        return entry
+
+    def put(self, name: str, rdtype: str, records: tuple[str, ...], ttl: float) -> DnsCacheEntry:
+        ttl = min(self.max_ttl, max(self.min_ttl, ttl))
+        return self._store(name, rdtype, DnsCacheEntry(records, False, time.monotonic() + ttl))
+
+    def put_negative(self, name: str, rdtype: str, nxdomain: bool) -> DnsCacheEntry:
+        return self._store(name, rdtype, DnsCacheEntry((), nxdomain, time.monotonic() + self.negative_ttl))
+
+    def _store(self, name: str, rdtype: str, entry: DnsCacheEntry) -> DnsCacheEntry:
+        key = (name, rdtype)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+dns_cache = DnsCache()
+_queries = SingleFlight()
+_resolver: Optional[dns.asyncresolver.Resolver] = None
+
+
+def get_resolver() -> dns.asyncresolver.Resolver:
+    """The shared resolver (reads resolv.conf on first use only)."""
+    global _resolver
+    if _resolver is None:
+        _resolver = dns.asyncresolver.Resolver()
+    return _resolver
+
+
+def dns_cache_stats() -> dict:
+    return dns_cache.stats()
+
+
+async def _query(name: str, rdtype: str, timeout: float, resolver=None) -> DnsCacheEntry:
+    """Resolve (name, rdtype) through the cache; concurrent misses share one query.
+
+    ``resolver`` overrides the shared resolver for a miss (the bulk resolver
+    passes one per upstream nameserver). Raises dns.exception.DNSException
+    for failures that are not cached (timeouts, SERVFAIL, no reachable
+    nameserver).
+    """
+    name = name.lower().rstrip(".")
+    entry = dns_cache.get(name, rdtype)
+    if entry is not None:
+        return entry
+
+    async def _fetch() -> DnsCacheEntry:
+        try:
+            answer = await (resolver or get_resolver()).resolve(name, rdtype, lifetime=timeout)
+        except dns.resolver.NXDOMAIN:
+            return dns_cache.put_negative(name, rdtype, nxdomain=True)
+        except dns.resolver.NoAnswer:
+            return dns_cache.put_negative(name, rdtype, nxdomain=False)
+        if rdtype == "MX":
+            # Sort by priority (lower = higher priority)
+            records = tuple(str(r.exchange).rstrip(".") for r in sorted(answer, key=lambda r: r.preference))
+        else:
+            records = tuple(str(rdata) for rdata in answer)
+        if not records:
+            return dns_cache.put_negative(name, rdtype, nxdomain=False)
+        return dns_cache.put(name, rdtype, records, answer.rrset.ttl)
+
+    return await _queries.do((name, rdtype), _fetch)
+
 
 def _detect_provider(mx_hosts: list[str]) -> Provider:
     """Detect email provider from MX hostnames.
@@ -51,48 +202,75 @@ def _detect_provider(mx_hosts: list[str]) -> Provider:
     return Provider.generic
 
 
-async def lookup_mx(domain: str, timeout: float = DNS_TIMEOUT) -> DnsInfo:
+async def resolve_host_addresses(host: str, timeout: float = DNS_TIMEOUT, resolver=None) -> list[str]:
+    """IPv4 then IPv6 addresses of an MX host, from the shared cache when fresh.
+
+    IP literals are returned as-is. IPv4 comes first because large providers
+    hold IPv6 senders to stricter reputation rules; IPv6 addresses are the
+    Happy Eyeballs fallback. Returns [] when nothing could be resolved.
+    """
+    try:
+        ipaddress.ip_address(host)
+        return [host]
+    except ValueError:
+        pass
+    answers = await asyncio.gather(
+        _query(host, "A", timeout, resolver), _query(host, "AAAA", timeout, resolver), return_exceptions=True
+    )
+    addresses: list[str] = []
+    for answer in answers:
+        if isinstance(answer, DnsCacheEntry):
+            addresses.extend(answer.records)
+        elif isinstance(answer, BaseException) and not isinstance(answer, dns.exception.DNSException):
+            raise answer
+    return addresses
+
+
+async def lookup_mx(domain: str, timeout: float = DNS_TIMEOUT, resolver=None) -> DnsInfo:
     """Look up MX records for a domain, falling back to A/AAAA.
 
     Returns DnsInfo with mx_hosts sorted by priority (lowest priority number first).
-    """
-    resolver = dns.asyncresolver.Resolver()
-    resolver.timeout = timeout
-    resolver.lifetime = timeout
+    Answers come from the shared TTL cache when fresh.
 
+    When no records were found but a query failed (timeout, SERVFAIL) rather
+    than coming back empty, DnsInfo.error says so: the domain's mail setup is
+    unknown, not missing.
+    """
+    started = time.perf_counter()
     mx_hosts: list[str] = []
+    error = ""
+    nxdomain = False
 
-    # Try MX records first
-    try:
-        mx_response = await resolver.resolve(domain, "MX")
-        # Sort by priority (lower = higher priority)
-        records = sorted(mx_response, key=lambda r: r.preference)
-        mx_hosts = [str(r.exchange).rstrip(".") for r in records]
-    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.DNSException) as e:
-        logger.debug(f"MX lookup failed for {domain}: {e}")
-
-    # Fall back to A record if no MX
-    if not mx_hosts:
-        try:
-            a_response = await resolver.resolve(domain, "A")
-            mx_hosts = [str(rdata) for rdata in a_response]
-        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.DNSException) as e:
-            logger.debug(f"A record lookup failed for {domain}: {e}")
-
-    # Fall back to AAAA if no A record either
-    if not mx_hosts:
+    # Try MX records first, then fall back to A, then AAAA. A domain that
+    # does not exist (NXDOMAIN) has no A/AAAA records either.
+    for rdtype in ("MX", "A", "AAAA"):
         try:
-            aaaa_response = await resolver.resolve(domain, "AAAA")
-            mx_hosts = [str(rdata) for rdata in aaaa_response]
-        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.DNSException) as e:
-            logger.debug(f"AAAA lookup failed for {domain}: {e}")
+            entry = await _query(domain, rdtype, timeout, resolver)
+        except dns.exception.DNSException as e:
+            logger.debug(f"{rdtype} lookup failed for {domain}: {e}")
+            error = error or f"{rdtype} lookup failed ({e.__class__.__name__})"
+            continue
+        if entry.records:
+            mx_hosts = list(entry.records)
+            if rdtype == "MX":
+                # Warm the address cache so connecting does not wait on DNS
+                await asyncio.gather(*(
+                    resolve_host_addresses(host, timeout, resolver) for host in mx_hosts[:MX_ADDRESS_PREFETCH]
+                ))
+            break
+        if entry.nxdomain:
+            logger.debug(f"{domain} does not exist (NXDOMAIN)")
+            nxdomain = True
+            break
 
     has_mx = len(mx_hosts) > 0
     provider = _detect_provider(mx_hosts) if has_mx else Provider.generic
+    stage_timings.record("dns", time.perf_counter() - started, provider.value)
 
     return DnsInfo(
         mx_hosts=mx_hosts,
         has_mx=has_mx,
         provider=provider,
         domain=domain,
+        error="" if has_mx or nxdomain else error,
     )
@@ -0,0 +1,41 @@
+"""Process-wide hook for shared per-domain intelligence.
+
+The verifier and the email finder keep per-call dicts of MX answers and
+catch-all verdicts. A process can also bind a shared cache here (the server
+and CLI bind store.cache.DomainCache backed by the intel store), so verdicts
+outlive the process and are shared with every other process using the same
+store. The engine only needs these methods from it:
+
+  get_dns(domain) -> Optional[DnsInfo]
+  set_dns(domain, dns_info)
+  has_catch_all(domain) -> bool
+  get_catch_all(domain) -> Optional[bool]
+  set_catch_all(domain, is_catch_all)
+
+and optionally ``async prefetch(domains)``, which async callers await first
+(through prefetch_domain_intel) so the getters above don't block the event
+loop on the backing store.
+
+Nothing is bound by default.
+"""
+
+from typing import Optional
+
+_shared = None
+
+
+def bind_domain_intel(cache) -> None:
+    """Use ``cache`` as the shared domain intelligence (None unbinds)."""
+    global _shared
+    _shared = cache
+
+
+def shared_domain_intel() -> Optional[object]:
+    return _shared
+
+
+async def prefetch_domain_intel(domains) -> None:
+    """Let the shared cache load ``domains`` from its store before they are read."""
+    prefetch = getattr(_shared, "prefetch", None)
+    if prefetch is not None:
+        await prefetch(domains)
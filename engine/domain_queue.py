@@ -0,0 +1,160 @@
+"""Fixed worker pool fed from per-domain queues.
+
+A batch used to start one task per address, each parked first on the batch
+semaphore and then on its domain's semaphore. A hot domain then filled the
+batch slots with tasks that could only wait on the domain limit, while work
+for other domains sat behind them in FIFO order, and 100k addresses meant
+100k parked tasks.
+
+DomainWorkQueue keeps one FIFO per key (domain) and a ring of keys that are
+ready, meaning they have queued work and are below their in-flight limit. A
+fixed set of workers takes keys from the ring in round-robin order. A key
+that is at its limit leaves the ring until one of its items finishes, so
+workers only pick up work that can start right away. Every item costs one
+slot, so round-robin is also deficit order here.
+
+A queue's per-key limit only counts its own items. KeyLimiter carries the
+limit across several queues running at once (verify_stream's chunks).
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+logger = logging.getLogger("kadenverify.domain_queue")
+
+
+class DomainWorkQueue:
+    """Runs ``handler(item)`` on ``workers`` workers, at most ``per_key_limit`` per key.
+
+    put() queues an item and returns a future that resolves once its handler
+    has finished (handler errors are logged, not raised). join() waits until
+    every queued item has been handled. Call start() before join() and
+    close() when done.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        workers: int,
+        per_key_limit: int = 1,
+    ):
+        self._handler = handler
+        self._worker_count = max(1, workers)
+        self._limit = max(1, per_key_limit)
+        self._queues: dict[str, deque] = {}
+        self._active: dict[str, int] = {}
+        self._ready: deque[str] = deque()
+        self._in_ring: set[str] = set()
+        self._workers: list[asyncio.Task] = []
+        self._changed = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._unfinished = 0
+        self.dispatched = 0
+
+    def __len__(self) -> int:
+        """Items queued or being handled."""
+        return self._unfinished
+
+    def _schedule(self, key: str) -> None:
+        queue = self._queues.get(key)
+        if queue and self._active.get(key, 0) < self._limit and key not in self._in_ring:
+            self._ready.append(key)
+            self._in_ring.add(key)
+            self._changed.set()
+
+    def put(self, key: str, item: Any) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append((item, future))
+        self._unfinished += 1
+        self._idle.clear()
+        self._schedule(key)
+        return future
+
+    async def _worker(self) -> None:
+        while True:
+            while not self._ready:
+                self._changed.clear()
+                await self._changed.wait()
+            key = self._ready.popleft()
+            self._in_ring.discard(key)
+            item, future = self._queues[key].popleft()
+            self._active[key] = self._active.get(key, 0) + 1
+            self.dispatched += 1
+            # Back to the tail of the ring if the key can take another worker
+            self._schedule(key)
+            try:
+                await self._handler(item)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Queued work for {key} failed: {e}")
+            finally:
+                self._active[key] -= 1
+                if not self._active[key] and not self._queues[key]:
+                    del self._active[key]
+                    del self._queues[key]
+                else:
+                    self._schedule(key)
+                self._unfinished -= 1
+                if not self._unfinished:
+                    self._idle.set()
+            if not future.done():
+                future.set_result(None)
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self._worker_count)]
+
+    async def join(self) -> None:
+        await self._idle.wait()
+
+    async def close(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for queue in self._queues.values():
+            for _, future in queue:
+                future.cancel()
+
+    async def __aenter__(self) -> "DomainWorkQueue":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc: Optional[BaseException]) -> None:
+        await self.close()
+
+
+class KeyLimiter:
+    """At most ``limit`` concurrent holders per key, shared between queues.
+
+    A key's semaphore only exists while the key has holders or waiters, so
+    a long stream over many domains does not accumulate them.
+    """
+
+    def __init__(self, limit: int):
+        self._limit = max(1, limit)
+        self._slots: dict[str, tuple[asyncio.Semaphore, int]] = {}
+
+    def __len__(self) -> int:
+        """Keys currently held or waited on."""
+        return len(self._slots)
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        semaphore, users = self._slots.get(key) or (asyncio.Semaphore(self._limit), 0)
+        self._slots[key] = (semaphore, users + 1)
+        try:
+            async with semaphore:
+                yield
+        finally:
+            semaphore, users = self._slots[key]
+            if users == 1:
+                del self._slots[key]
+            else:
+                self._slots[key] = (semaphore, users - 1)
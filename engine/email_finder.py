@@ -10,11 +10,15 @@ Waterfall:
 import asyncio
 import logging
 import os
+import time
+from collections import OrderedDict
 from typing import Callable, Optional
 
 import aiohttp
 
+from .bulk_dns import resolve_domains
 from .dns import lookup_mx
+from .domain_intel import prefetch_domain_intel, shared_domain_intel
 from .models import (
     CandidateResult,
     DnsInfo,
@@ -22,7 +26,8 @@ from .models import (
     Provider,
     Reachability,
 )
-from .smtp import check_catch_all, smtp_check_batch
+from .singleflight import SingleFlight
+from .smtp import check_catch_all, is_unreachable, smtp_check_batch, with_mx_failover
 
 logger = logging.getLogger("kadenverify.finder")
 
@@ -64,21 +69,64 @@ def generate_candidates(first_name: str, last_name: str, domain: str) -> list[Ca
 # Domain intelligence cache
 # ---------------------------------------------------------------------------
 
-_domain_cache: dict[str, tuple[DnsInfo, Optional[bool]]] = {}
+# Bounded LRU of (expires_at, dns_info, is_catchall); DNS answers themselves
+# are cached (TTL-aware) in engine.dns.
+_DOMAIN_CACHE_SIZE = 10_000
+_DOMAIN_CACHE_TTL = 3600.0
+_domain_cache: "OrderedDict[str, tuple[float, DnsInfo, Optional[bool]]]" = OrderedDict()
+_domain_flights = SingleFlight()
 
 
-async def _get_domain_intel(domain: str) -> tuple[DnsInfo, Optional[bool]]:
-    """Return (dns_info, is_catchall) for a domain, cached."""
-    if domain in _domain_cache:
-        return _domain_cache[domain]
+async def _get_domain_intel(
+    domain: str, dns_info: Optional[DnsInfo] = None
+) -> tuple[DnsInfo, Optional[bool]]:
+    """Return (dns_info, is_catchall) for a domain, cached.
 
-    dns_info = await lookup_mx(domain)
-    is_catchall: Optional[bool] = None
-    if dns_info.has_mx:
-        is_catchall = await check_catch_all(domain, dns_info.mx_hosts[0])
+    Concurrent callers for an uncached domain share one lookup and probe.
+    ``dns_info`` (from the bulk resolver) skips the MX lookup, and so does an
+    answer from the shared domain intel, which also supplies known catch-all
+    verdicts. Failed lookups are not cached.
+    """
+    cached = _domain_cache.get(domain)
+    if cached is not None and cached[0] > time.monotonic():
+        _domain_cache.move_to_end(domain)
+        return cached[1], cached[2]
+
+    async def _fetch() -> tuple[DnsInfo, Optional[bool]]:
+        shared = shared_domain_intel()
+        info = dns_info
+        stored = False
+        if shared is not None:
+            await prefetch_domain_intel([domain])
+        if info is None and shared is not None:
+            info = shared.get_dns(domain)
+            stored = info is not None
+        if info is None:
+            info = await lookup_mx(domain)
+        if shared is not None and not stored and not info.error:
+            shared.set_dns(domain, info)
+        is_catchall: Optional[bool] = None
+        if info.has_mx:
+            if shared is not None and shared.has_catch_all(domain):
+                is_catchall = shared.get_catch_all(domain)
+            else:
+                _, is_catchall = await with_mx_failover(
+                    info.mx_hosts,
+                    lambda mx: check_catch_all(domain, mx),
+                    lambda verdict: verdict is None,
+                )
+                if shared is not None and is_catchall is not None:
+                    shared.set_catch_all(domain, is_catchall)
+        if info.error:
+            return info, is_catchall
+
+        _domain_cache[domain] = (time.monotonic() + _DOMAIN_CACHE_TTL, info, is_catchall)
+        _domain_cache.move_to_end(domain)
+        while len(_domain_cache) > _DOMAIN_CACHE_SIZE:
+            _domain_cache.popitem(last=False)
+        return info, is_catchall
 
-    _domain_cache[domain] = (dns_info, is_catchall)
-    return dns_info, is_catchall
+    return await _domain_flights.do(domain, _fetch)
 
 
 # ---------------------------------------------------------------------------
@@ -232,22 +280,30 @@ async def find_email(
     # --- Phase 1: Domain intelligence ---
     dns_info, is_catchall = await _get_domain_intel(domain)
 
+    if not dns_info.has_mx and dns_info.error:
+        return FinderResult(
+            error=f"DNS lookup failed for {domain}: {dns_info.error}",
+            provider=dns_info.provider,
+        )
+
     if not dns_info.has_mx:
         return FinderResult(
             error=f"No MX records for {domain}",
             provider=dns_info.provider,
         )
 
-    mx_host = dns_info.mx_hosts[0]
-
     # --- Phase 2: Generate candidates ---
     candidates = generate_candidates(first_name, last_name, domain)
 
     # --- Phase 3: SMTP batch verification (non-catch-all) ---
     if is_catchall is False:
         emails = [c.email for c in candidates]
-        responses = await smtp_check_batch(
-            emails, mx_host, helo_domain=helo_domain, from_address=from_address
+        _, responses = await with_mx_failover(
+            dns_info.mx_hosts,
+            lambda mx: smtp_check_batch(
+                emails, mx, helo_domain=helo_domain, from_address=from_address, greylist_retries=0
+            ),
+            lambda replies: all(is_unreachable(r) for r in replies),
         )
 
         for candidate, resp in zip(candidates, responses):
@@ -407,9 +463,17 @@ async def find_emails_batch(
     results: list[Optional[FinderResult]] = [None] * len(contacts)
     sem = asyncio.Semaphore(concurrency)
 
+    # Resolve every domain up front through the bounded bulk resolver
+    shared = shared_domain_intel()
+    if shared is not None:
+        await prefetch_domain_intel(domain_groups)
+    resolved = await resolve_domains(
+        d for d in domain_groups if shared is None or shared.get_dns(d) is None
+    )
+
     async def process_domain(domain: str, group: list[tuple[int, dict]]):
         # Pre-warm domain intelligence (cached)
-        await _get_domain_intel(domain)
+        await _get_domain_intel(domain, resolved.get(domain))
 
         # Process contacts within same domain sequentially (SMTP connection reuse)
         for idx, contact in group:
@@ -1,11 +1,18 @@
 """SMTP error response parser.
 
 Detects invalid mailboxes, greylisting, IP blacklists, full inboxes,
-and disabled accounts from SMTP response codes and messages.
+disabled accounts and per-transaction recipient limits from SMTP response
+codes and messages.
 Supports patterns across English, French, German, Spanish, Italian, Polish, and Czech.
+
+Each pattern list is compiled into a single alternation, and verdicts are
+memoized per (code, normalized message) because MTAs repeat the same reply
+texts.
 """
 
+import functools
 import re
+
 from .models import SmtpResponse
 
 
@@ -127,6 +134,17 @@ _GREYLIST_PATTERNS: list[re.Pattern] = [
     re.compile(r"service temporarily unavailable", re.I),
 ]
 
+# --- Recipient limit patterns (too many RCPT TO in one transaction/session) ---
+_RCPT_LIMIT_PATTERNS: list[re.Pattern] = [
+    re.compile(r"\b[45]\.5\.3\b"),
+    re.compile(r"too many recipients", re.I),
+    re.compile(r"too many rcpt", re.I),
+    re.compile(r"recipient limit", re.I),
+    re.compile(r"recipients limit", re.I),
+    re.compile(r"max(imum)? (number of )?recipients", re.I),
+    re.compile(r"recipients per (message|transaction|session)", re.I),
+]
+
 # --- Full inbox patterns ---
 _FULL_INBOX_PATTERNS: list[re.Pattern] = [
     re.compile(r"mailbox full", re.I),
@@ -156,9 +174,76 @@ _DISABLED_PATTERNS: list[re.Pattern] = [
 ]
 
 
-def _match_any(message: str, patterns: list[re.Pattern]) -> bool:
-    """Check if message matches any pattern in the list."""
-    return any(p.search(message) for p in patterns)
+def _compile_category(patterns: list[re.Pattern]) -> re.Pattern:
+    """Fold a category's patterns into one alternation, scanned once per reply.
+
+    Compiled without re.I: messages are lowercased before classification,
+    which keeps the regex engine on its fast literal paths.
+    """
+    return re.compile("|".join(f"(?:{p.pattern})" for p in patterns))
+
+
+_INVALID_RE = _compile_category(_INVALID_PATTERNS)
+_BLACKLIST_RE = _compile_category(_BLACKLIST_PATTERNS)
+_GREYLIST_RE = _compile_category(_GREYLIST_PATTERNS)
+_RCPT_LIMIT_RE = _compile_category(_RCPT_LIMIT_PATTERNS)
+_FULL_INBOX_RE = _compile_category(_FULL_INBOX_PATTERNS)
+_DISABLED_RE = _compile_category(_DISABLED_PATTERNS)
+
+# Mail addresses in replies differ per recipient but never decide the verdict
+_ADDRESS_RE = re.compile(r"[\w.+'-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+def _normalize_message(message: str) -> str:
+    """Lowercase a reply and blank out mail addresses so repeats share a memo entry."""
+    return _ADDRESS_RE.sub("<>", message.lower())
+
+
+@functools.lru_cache(maxsize=4096)
+def _classify(code: int, normalized: str) -> tuple[bool, bool, bool, bool, bool, bool]:
+    """Detection flags for one reply: (blacklisted, rcpt_limit, greylisted,
+    full_inbox, disabled, invalid).
+
+    Memoized on (code, normalized message): the same MTAs send the same
+    handful of strings over and over.
+    """
+    blacklisted = rcpt_limit = greylisted = full_inbox = disabled = invalid = False
+
+    # Check for blacklisting (any code)
+    if _BLACKLIST_RE.search(normalized):
+        blacklisted = True
+
+    # Recipient limit hit (452 4.5.3, 421/552 "too many recipients") -- says
+    # nothing about the mailbox, the address must be retried in a new transaction
+    elif code in (421, 451, 452, 550, 552) and _RCPT_LIMIT_RE.search(normalized):
+        rcpt_limit = True
+
+    # 4xx = temporary failures
+    elif 400 <= code < 500:
+        if _GREYLIST_RE.search(normalized):
+            greylisted = True
+        elif _FULL_INBOX_RE.search(normalized):
+            full_inbox = True
+        else:
+            # Generic 4xx — treat as greylist by default
+            greylisted = True
+
+    # 5xx = permanent failures
+    elif 500 <= code < 600:
+        # Check disabled first (more specific)
+        if _DISABLED_RE.search(normalized):
+            disabled = invalid = True
+        # Check full inbox (user exists but can't receive)
+        elif _FULL_INBOX_RE.search(normalized):
+            full_inbox = True
+        # Check invalid mailbox
+        elif _INVALID_RE.search(normalized):
+            invalid = True
+        # Generic 550 without recognized pattern — still likely invalid
+        elif code in (550, 551, 552, 553):
+            invalid = True
+
+    return (blacklisted, rcpt_limit, greylisted, full_inbox, disabled, invalid)
 
 
 def parse_smtp_response(code: int, message: str) -> SmtpResponse:
@@ -177,43 +262,18 @@ def parse_smtp_response(code: int, message: str) -> SmtpResponse:
     if 200 <= code < 300:
         return result
 
-    # Check for blacklisting (any code)
-    if _match_any(message, _BLACKLIST_PATTERNS):
-        result.is_blacklisted = True
-        return result
-
-    # 4xx = temporary failures
-    if 400 <= code < 500:
-        if _match_any(message, _GREYLIST_PATTERNS):
-            result.is_greylisted = True
-        elif _match_any(message, _FULL_INBOX_PATTERNS):
-            result.is_full_inbox = True
-        else:
-            # Generic 4xx — treat as greylist by default
-            result.is_greylisted = True
-        return result
-
-    # 5xx = permanent failures
-    if 500 <= code < 600:
-        # Check disabled first (more specific)
-        if _match_any(message, _DISABLED_PATTERNS):
-            result.is_disabled = True
-            result.is_invalid = True
-            return result
-
-        # Check full inbox (user exists but can't receive)
-        if _match_any(message, _FULL_INBOX_PATTERNS):
-            result.is_full_inbox = True
-            return result
+    (
+        result.is_blacklisted,
+        result.is_rcpt_limit,
+        result.is_greylisted,
+        result.is_full_inbox,
+        result.is_disabled,
+        result.is_invalid,
+    ) = _classify(code, _normalize_message(message))
+    return result
 
-        # Check invalid mailbox
-        if _match_any(message, _INVALID_PATTERNS):
-            result.is_invalid = True
-            return result
 
-        # Generic 550 without recognized pattern — still likely invalid
-        if code in (550, 551, 552, 553):
-            result.is_invalid = True
-            return result
-
-    return result
+def classifier_cache_info() -> dict:
+    """Hit/miss counters of the reply classifier memo (for /metrics)."""
+    info = _classify.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
@@ -0,0 +1,72 @@
+"""Deferred retry scheduling for greylisted addresses.
+
+Greylisting MTAs answer 4xx until the same triplet is retried after a delay.
+Sleeping through that delay inside a verification task keeps its batch and
+per-domain concurrency slots busy, so batches instead hand greylisted items
+to a RetryScheduler: each item waits in a heap keyed by its due time and is
+dispatched to the handler only once due, holding no slots while it waits.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger("kadenverify.greylist")
+
+
+class RetryScheduler:
+    """Min-heap of items waiting for a retry, dispatched when due.
+
+    The handler may defer() the same item again (e.g. still greylisted);
+    join() returns once nothing is waiting and no handler is running.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[None]]):
+        self._handler = handler
+        self._heap: list[tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+        self._running: set[asyncio.Task] = set()
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def pending(self) -> int:
+        """Items waiting plus items currently being retried."""
+        return len(self._heap) + len(self._running)
+
+    def defer(self, item: Any, delay: float) -> None:
+        """Schedule ``item`` to be handled ``delay`` seconds from now."""
+        heapq.heappush(self._heap, (time.monotonic() + max(0.0, delay), next(self._seq), item))
+        self._changed.set()
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Deferred retry failed: {task.exception()}")
+        self._changed.set()
+
+    async def join(self) -> None:
+        """Dispatch due items until the heap is empty and all handlers finished."""
+        try:
+            while self._heap or self._running:
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, item = heapq.heappop(self._heap)
+                    task = asyncio.create_task(self._handler(item))
+                    self._running.add(task)
+                    task.add_done_callback(self._on_done)
+
+                self._changed.clear()
+                timeout = self._heap[0][0] - now if self._heap else None
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._running):
+                task.cancel()
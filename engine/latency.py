@@ -0,0 +1,179 @@
+"""Per-MX latency tracking and adaptive timeouts.
+
+Every dial, banner and command reply time is fed into a small streaming
+quantile sketch per MX host. Once a host has enough samples its timeouts are
+set from the recent p99 (times a headroom factor), clamped between a floor and
+the configured KADENVERIFY_SMTP_*_TIMEOUT values, so a fast MX fails in a
+couple of seconds instead of burning the full 10/10/45s budget.
+
+Tarpits delay the banner on purpose while answering commands quickly. They
+get a banner timeout sized from their observed banner delay, and their
+adaptive command timeouts do not cut the banner wait short. (Hosts that do
+not answer at all are circuit-broken by engine.mx_health.)
+"""
+
+import math
+from typing import NamedTuple, Optional
+
+
+class LatencySketch:
+    """Log-bucketed streaming quantile sketch with periodic decay.
+
+    Bucket boundaries grow geometrically by ``gamma``, so any quantile is
+    reported within about (gamma - 1) relative error using a few dozen
+    buckets. Counts are halved every ``decay_every`` samples so the sketch
+    follows the host's recent behaviour.
+    """
+
+    def __init__(self, gamma: float = 1.15, min_value: float = 0.001, decay_every: int = 256):
+        self.gamma = gamma
+        self.min_value = min_value
+        self.decay_every = decay_every
+        self.count = 0.0
+        self._log_gamma = math.log(gamma)
+        self._buckets: dict[int, float] = {}
+        self._since_decay = 0
+
+    def add(self, value: float) -> None:
+        index = max(0, math.ceil(math.log(max(value, self.min_value) / self.min_value) / self._log_gamma))
+        self._buckets[index] = self._buckets.get(index, 0.0) + 1.0
+        self.count += 1.0
+        self._since_decay += 1
+        if self._since_decay >= self.decay_every:
+            self._since_decay = 0
+            self._buckets = {i: c / 2 for i, c in self._buckets.items() if c >= 0.5}
+            self.count = sum(self._buckets.values())
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile, or None when empty."""
+        if not self._buckets:
+            return None
+        rank = q * self.count
+        cumulative = 0.0
+        for index in sorted(self._buckets):
+            cumulative += self._buckets[index]
+            if cumulative >= rank:
+                return self.min_value * self.gamma ** index
+        return self.min_value * self.gamma ** max(self._buckets)
+
+
+class SmtpTimeouts(NamedTuple):
+    connect: float
+    command: float
+    total: float
+
+
+class HostLatency:
+    """Latency sketches for one MX host."""
+
+    __slots__ = ("connect", "banner", "command")
+
+    def __init__(self):
+        self.connect = LatencySketch()
+        self.banner = LatencySketch()
+        self.command = LatencySketch()
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+class MxLatencyTracker:
+    """Adaptive timeouts and tarpit detection per MX host."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        min_timeout: float = 2.0,
+        headroom: float = 2.0,
+        min_samples: int = 8,
+        tarpit_banner: float = 5.0,
+    ):
+        self.enabled = enabled
+        self.min_timeout = min_timeout
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.tarpit_banner = tarpit_banner
+        self._hosts: dict[str, HostLatency] = {}
+
+    def _host(self, mx_host: str) -> HostLatency:
+        mx_host = mx_host.lower()
+        host = self._hosts.get(mx_host)
+        if host is None:
+            host = HostLatency()
+            self._hosts[mx_host] = host
+        return host
+
+    def observe_connect(self, mx_host: str, seconds: float) -> None:
+        self._host(mx_host).connect.add(seconds)
+
+    def observe_banner(self, mx_host: str, seconds: float) -> None:
+        self._host(mx_host).banner.add(seconds)
+
+    def observe_command(self, mx_host: str, seconds: float) -> None:
+        self._host(mx_host).command.add(seconds)
+
+    def is_tarpit(self, mx_host: str) -> bool:
+        """Banner consistently slow while commands are answered quickly."""
+        host = self._hosts.get(mx_host.lower())
+        if host is None or host.banner.count < 2:
+            return False
+        banner = host.banner.quantile(0.5)
+        command = host.command.quantile(0.5)
+        return banner >= self.tarpit_banner and (command is None or banner >= 4 * command)
+
+    def banner_timeout(self, mx_host: str, command_timeout: float, cap: float) -> float:
+        """How long to wait for the 220 banner.
+
+        Never shorter than ``command_timeout``; hosts with slow banners
+        (tarpits) get their observed p99 delay plus headroom, up to ``cap``.
+        """
+        host = self._hosts.get(mx_host.lower()) if self.enabled else None
+        if host is None or not host.banner.count:
+            return command_timeout
+        return max(command_timeout, min(cap, host.banner.quantile(0.99) * self.headroom))
+
+    def timeouts(
+        self,
+        mx_host: str,
+        connect: Optional[float],
+        command: Optional[float],
+        total: Optional[float],
+        connect_default: float,
+        command_default: float,
+        total_default: float,
+    ) -> SmtpTimeouts:
+        """Timeouts for the next probe against ``mx_host``.
+
+        Explicitly passed values are kept; missing ones come from the host's
+        p99 latency when enough samples exist, else from the defaults.
+        """
+        host = self._hosts.get(mx_host.lower()) if self.enabled else None
+        if host is not None:
+            if connect is None and host.connect.count >= self.min_samples:
+                connect = _clamp(host.connect.quantile(0.99) * self.headroom, self.min_timeout, connect_default)
+            if command is None and host.command.count >= self.min_samples:
+                command = _clamp(host.command.quantile(0.99) * self.headroom, self.min_timeout, command_default)
+            if total is None and host.command.count >= self.min_samples:
+                c = connect if connect is not None else connect_default
+                m = command if command is not None else command_default
+                banner = self.banner_timeout(mx_host, m, total_default / 2)
+                # Dial + banner + EHLO + MAIL/RCPT, and one stale-session redial
+                total = _clamp(2 * (c + banner + 3 * m), self.min_timeout, total_default)
+        return SmtpTimeouts(
+            connect if connect is not None else connect_default,
+            command if command is not None else command_default,
+            total if total is not None else total_default,
+        )
+
+    def snapshot(self) -> dict[str, dict]:
+        out: dict[str, dict] = {}
+        for mx_host, host in self._hosts.items():
+            p99 = host.command.quantile(0.99)
+            banner = host.banner.quantile(0.5)
+            out[mx_host] = {
+                "command_p99_ms": round(p99 * 1000.0, 1) if p99 is not None else None,
+                "banner_p50_ms": round(banner * 1000.0, 1) if banner is not None else None,
+                "tarpit": self.is_tarpit(mx_host),
+            }
+        return out
@@ -7,7 +7,7 @@ from pathlib import Path
 _LISTS_DIR = Path(__file__).parent.parent / "lists"
 
 
-@lru_cache(maxsize=1)
+@lru_cache(maxsize=None)
 def _load_set(filename: str) -> frozenset[str]:
     """Load a newline-delimited text file into a frozenset."""
     filepath = _LISTS_DIR / filename
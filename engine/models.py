@@ -34,6 +34,7 @@ class SmtpResponse(BaseModel):
     is_blacklisted: bool = False
     is_full_inbox: bool = False
     is_disabled: bool = False
+    is_rcpt_limit: bool = False
 
 
 class DnsInfo(BaseModel):
@@ -42,6 +43,7 @@ class DnsInfo(BaseModel):
     has_mx: bool = False
     provider: Provider = Provider.generic
     domain: str = ""
+    error: str = ""  # set when lookups failed, so "no MX" is not known
 
 
 class EmailMetadata(BaseModel):
@@ -0,0 +1,148 @@
+"""MX host health scoring, circuit breaking and failover ordering.
+
+Every SMTP transaction reports whether the host answered (any SMTP verdict,
+including 5xx) or failed at the connection level (timeout, refused, dropped,
+421). Per host we keep an EWMA success rate, an EWMA latency and the run of
+consecutive failures:
+
+  - After ``failure_threshold`` consecutive failures the host's circuit opens
+    and probes against it fail immediately for ``open_seconds``. After that
+    one trial probe is let through (half-open); success closes the circuit,
+    failure opens it again.
+  - order() returns a domain's MX hosts in DNS preference order, but moves
+    hosts with an open circuit or a poor success rate behind healthy ones,
+    so verification falls over to secondary MX hosts instead of returning
+    unknown. Among the rest, a host whose score (success rate discounted by
+    latency) is at least twice as bad as another's goes behind it, so a slow
+    primary does not win over a fast backup on preference alone.
+"""
+
+import math
+import time
+from typing import Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class MxHealth:
+    """Health state for one MX host."""
+
+    __slots__ = (
+        "success_rate", "latency_ewma", "consecutive_failures", "state",
+        "open_until", "trial_in_flight", "successes", "failures",
+    )
+
+    def __init__(self):
+        self.success_rate = 1.0
+        self.latency_ewma: Optional[float] = None
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.trial_in_flight = False
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def score(self) -> float:
+        """Higher is better: success rate discounted by latency."""
+        return self.success_rate / (1.0 + (self.latency_ewma or 0.0))
+
+
+class MxHealthTable:
+    """Health of every MX host seen by this process."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        open_seconds: float = 300.0,
+        alpha: float = 0.2,
+        poor_success_rate: float = 0.5,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.alpha = alpha
+        self.poor_success_rate = poor_success_rate
+        self._hosts: dict[str, MxHealth] = {}
+
+    def _host(self, mx_host: str) -> MxHealth:
+        mx_host = mx_host.lower()
+        health = self._hosts.get(mx_host)
+        if health is None:
+            health = MxHealth()
+            self._hosts[mx_host] = health
+        return health
+
+    def allow(self, mx_host: str) -> bool:
+        """Whether a probe may be sent to ``mx_host`` now (claims the half-open trial)."""
+        health = self._hosts.get(mx_host.lower())
+        if health is None or health.state == CLOSED:
+            return True
+        if health.state == OPEN:
+            if time.monotonic() < health.open_until:
+                return False
+            health.state = HALF_OPEN
+            health.trial_in_flight = False
+        if health.trial_in_flight:
+            return False
+        health.trial_in_flight = True
+        return True
+
+    def is_open(self, mx_host: str) -> bool:
+        health = self._hosts.get(mx_host.lower())
+        return health is not None and health.state == OPEN and time.monotonic() < health.open_until
+
+    def record(self, mx_host: str, answered: Optional[bool], latency: float = 0.0) -> None:
+        """Report one transaction: True = host answered, False = connection-level
+        failure, None = abandoned (cancelled) without a verdict."""
+        health = self._host(mx_host)
+        if answered is None:
+            health.trial_in_flight = False
+            return
+        sample = 1.0 if answered else 0.0
+        health.success_rate += self.alpha * (sample - health.success_rate)
+        if answered:
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.state = CLOSED
+            health.trial_in_flight = False
+            health.latency_ewma = latency if health.latency_ewma is None else (
+                health.latency_ewma + self.alpha * (latency - health.latency_ewma)
+            )
+            return
+        health.failures += 1
+        health.consecutive_failures += 1
+        if health.state == HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+            health.state = OPEN
+            health.open_until = time.monotonic() + self.open_seconds
+            health.trial_in_flight = False
+
+    def order(self, mx_hosts: list[str]) -> list[str]:
+        """MX hosts in preference order, with open-circuit and failing hosts
+        last and much slower hosts behind faster ones."""
+        def _rank(item: tuple[int, str]) -> tuple[bool, bool, int, int]:
+            index, mx_host = item
+            health = self._hosts.get(mx_host.lower())
+            poor = health is not None and health.success_rate < self.poor_success_rate
+            # Score bands a factor of two wide (unseen hosts score 1.0), so
+            # small differences keep DNS preference order
+            score = health.score if health is not None else 1.0
+            band = int(math.log2(1.0 / score)) if score > 0 else 64
+            return (self.is_open(mx_host), poor, band, index)
+
+        return [mx_host for _, mx_host in sorted(enumerate(mx_hosts), key=_rank)]
+
+    def snapshot(self) -> dict[str, dict]:
+        out: dict[str, dict] = {}
+        for mx_host, health in self._hosts.items():
+            out[mx_host] = {
+                "state": HALF_OPEN if health.state == OPEN and not self.is_open(mx_host) else health.state,
+                "score": round(health.score, 3),
+                "success_rate": round(health.success_rate, 3),
+                "latency_ewma_ms": round(health.latency_ewma * 1000.0, 1) if health.latency_ewma is not None else None,
+                "consecutive_failures": health.consecutive_failures,
+                "successes": health.successes,
+                "failures": health.failures,
+            }
+        return out
@@ -0,0 +1,59 @@
+"""Single-flight de-duplication of concurrent async operations.
+
+When several tasks need the same expensive result at the same time (a
+catch-all probe or MX lookup for one domain), only the first one runs the
+operation; the others await its outcome instead of repeating it. Nothing is
+cached once the operation finishes -- callers keep their own caches.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one in-flight call."""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+
+    def pending(self, key: Hashable) -> bool:
+        """Whether an operation for ``key`` is currently running."""
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn()`` unless a call for ``key`` is already in flight; share its result.
+
+        Exceptions propagate to every waiter. A waiter being cancelled does not
+        cancel the leader's operation. When the leader is cancelled, the key
+        is dropped and its waiters retry: one of them runs ``fn()`` afresh.
+        """
+        while (future := self._inflight.get(key)) is not None:
+            self.shared += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Re-raise our own cancellation; retry only the leader's
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved even when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
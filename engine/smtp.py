@@ -3,6 +3,15 @@
 Connects to MX host on port 25, performs:
   EHLO -> MAIL FROM -> RCPT TO -> QUIT
 Never sends DATA. Includes catch-all detection and greylisting retry.
+
+Connections are kept in a per-MX session pool: once a session has done the
+banner/EHLO/STARTTLS handshake it is parked idle and the next check against
+the same MX host reuses it after an RSET, so each address costs MAIL FROM +
+RCPT TO instead of a full dial.
+
+Sessions talk to the server through engine.smtp_protocol, which parses
+replies straight out of the receive buffer and bounds each command (or
+pipelined group) with a single deadline.
 """
 
 import asyncio
@@ -10,13 +19,25 @@ import logging
 import os
 import random
 import string
-from typing import Optional
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
 
+from .concurrency import MxConcurrencyController
+from .dns import resolve_host_addresses
 from .errors import parse_smtp_response
+from .latency import MxLatencyTracker
+from .mx_health import MxHealthTable
 from .models import SmtpResponse
+from .smtp_protocol import SmtpClientProtocol, open_smtp_connection
+from .source_ip import SourceIpPool, parse_source_addresses
+from .timing import stage_timings
 
 logger = logging.getLogger("kadenverify.smtp")
 
+T = TypeVar("T")
+
 
 def _env_float(name: str, default: float) -> float:
     raw = os.getenv(name)
@@ -38,6 +59,13 @@ def _env_int(name: str, default: int) -> int:
         return int(default)
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes"}
+
+
 # Defaults
 DEFAULT_HELO_DOMAIN = "198-23-249-137-host.colocrossing.com"
 DEFAULT_FROM_ADDRESS = "postmaster@198-23-249-137-host.colocrossing.com"
@@ -46,236 +74,1115 @@ COMMAND_TIMEOUT = _env_float("KADENVERIFY_SMTP_COMMAND_TIMEOUT", 10)
 TOTAL_TIMEOUT = _env_float("KADENVERIFY_SMTP_TOTAL_TIMEOUT", 45)
 GREYLIST_DELAY = max(0, _env_int("KADENVERIFY_SMTP_GREYLIST_DELAY", 35))
 GREYLIST_RETRIES = max(0, _env_int("KADENVERIFY_SMTP_GREYLIST_RETRIES", 2))
-SMTP_PORT = 25
-
-
-def _random_address(domain: str, length: int = 15) -> str:
+# Overridable so end-to-end runs can target a local MTA (benchmarks/mta_simulator.py)
+SMTP_PORT = _env_int("KADENVERIFY_SMTP_PORT", 25)
+
+# SmtpResponse.message for probes cut short by the caller's deadline
+DEADLINE_EXCEEDED = "deadline exceeded"
+
+# Session pool
+POOL_ENABLED = _env_bool("KADENVERIFY_SMTP_POOL", True)
+POOL_MAX_PER_HOST = max(1, _env_int("KADENVERIFY_SMTP_POOL_MAX_PER_HOST", 16))
+# Per-MX session limit starts here and adapts (AIMD) between 1 and POOL_MAX_PER_HOST
+POOL_INITIAL_PER_HOST = max(1, _env_int("KADENVERIFY_SMTP_POOL_INITIAL_PER_HOST", 4))
+POOL_IDLE_TIMEOUT = max(0.0, _env_float("KADENVERIFY_SMTP_POOL_IDLE_TIMEOUT", 20))
+# Postfix counts every rejected RCPT against smtpd_soft_error_limit (10) and
+# starts sleeping before each reply past it, so sessions are retired early.
+POOL_MAX_TRANSACTIONS = max(1, _env_int("KADENVERIFY_SMTP_POOL_MAX_TRANSACTIONS", 10))
+POOL_MAX_REJECTIONS = max(1, _env_int("KADENVERIFY_SMTP_POOL_MAX_REJECTIONS", 8))
+RSET_TIMEOUT = 5.0
+
+# Recipients packed into one multi-RCPT transaction by batch planners.
+MAX_RCPT_PER_SESSION = max(1, _env_int("KADENVERIFY_SMTP_MAX_RCPT_PER_SESSION", 10))
+
+# STARTTLS policy: "auto" only negotiates TLS with hosts known to refuse
+# plaintext transactions; "always" negotiates whenever it is advertised.
+STARTTLS_MODE = os.getenv("KADENVERIFY_SMTP_STARTTLS", "auto").strip().lower()
+CAPABILITY_TTL = max(0.0, _env_float("KADENVERIFY_SMTP_CAPABILITY_TTL", 6 * 3600))
+
+# Per-MX adaptive timeouts: p99 latency x2, between MIN_ADAPTIVE_TIMEOUT and
+# the fixed timeouts above.
+ADAPTIVE_TIMEOUTS = _env_bool("KADENVERIFY_SMTP_ADAPTIVE_TIMEOUTS", True)
+MIN_ADAPTIVE_TIMEOUT = max(0.5, _env_float("KADENVERIFY_SMTP_MIN_TIMEOUT", 2))
+TARPIT_BANNER_DELAY = _env_float("KADENVERIFY_SMTP_TARPIT_BANNER_DELAY", 5)
+
+# MX health: DEAD_HOST_FAILURES connection-level failures in a row open a
+# host's circuit for DEAD_HOST_SECONDS; probes fail over to the next
+# MX_FAILOVER_ATTEMPTS - 1 MX hosts of the domain.
+DEAD_HOST_FAILURES = max(1, _env_int("KADENVERIFY_SMTP_DEAD_HOST_FAILURES", 3))
+DEAD_HOST_SECONDS = max(0.0, _env_float("KADENVERIFY_SMTP_DEAD_HOST_SECONDS", 300))
+MX_FAILOVER_ATTEMPTS = max(1, _env_int("KADENVERIFY_SMTP_MX_FAILOVER_ATTEMPTS", 3))
+
+# Outbound source addresses: "ip[=helo],ip[=helo],..." (empty = OS default
+# address with the caller's HELO). An address whose 421/blacklist rate
+# reaches SOURCE_IP_BAD_RATE is benched for SOURCE_IP_COOLDOWN seconds.
+SOURCE_IPS = os.getenv("KADENVERIFY_SMTP_SOURCE_IPS", "")
+SOURCE_IP_BAD_RATE = _env_float("KADENVERIFY_SMTP_SOURCE_IP_BAD_RATE", 0.3)
+SOURCE_IP_COOLDOWN = max(0.0, _env_float("KADENVERIFY_SMTP_SOURCE_IP_COOLDOWN", 600))
+
+
+def random_address(domain: str, length: int = 15) -> str:
     """Generate a random email address for catch-all detection."""
     chars = string.ascii_lowercase + string.digits
     local = "".join(random.choices(chars, k=length))
     return f"{local}@{domain}"
 
 
-async def _read_response(reader: asyncio.StreamReader, timeout: float = COMMAND_TIMEOUT) -> tuple[int, str]:
-    """Read a complete SMTP response (may be multi-line).
+def _ehlo_features(message: str) -> set[str]:
+    """Extract upper-cased ESMTP keywords from a multi-line EHLO reply."""
+    features: set[str] = set()
+    for line in message.split("\n")[1:]:
+        keyword = line[4:].strip().split(" ", 1)[0].upper()
+        if keyword:
+            features.add(keyword)
+    return features
+
+
+def _requires_tls(reply: tuple[int, str]) -> bool:
+    """Whether a MAIL/RCPT reply refuses the command until STARTTLS is done.
 
-    Returns (code, full_message).
+    A bare 530 is not enough: 530 5.7.0 is also "Authentication required"
+    (RFC 4954), which TLS does nothing for.
     """
-    lines = []
-    while True:
-        try:
-            line = await asyncio.wait_for(reader.readline(), timeout=timeout)
-        except asyncio.TimeoutError:
-            if lines:
-                break
-            return 0, "read timeout"
+    code, message = reply
+    if not 500 <= code < 600:
+        return False
+    text = message.upper()
+    return "STARTTLS" in text or ("5.7.0" in text and "TLS" in text)
 
-        if not line:
-            break
 
-        decoded = line.decode("utf-8", errors="replace").rstrip("\r\n")
-        lines.append(decoded)
+class MxCapabilities:
+    """ESMTP capabilities of one MX host and how it treats plaintext sessions."""
 
-        # SMTP multi-line: "250-..." continues, "250 ..." is final
-        if len(decoded) >= 4 and decoded[3] == " ":
-            break
-        if len(decoded) < 4:
-            break
+    __slots__ = ("features", "requires_tls", "tls_broken", "observed_at")
 
-    if not lines:
-        return 0, "no response"
+    def __init__(self, features: set[str]):
+        self.features = features
+        self.requires_tls = False
+        # The TLS handshake failed after STARTTLS; stay in plaintext
+        self.tls_broken = False
+        self.observed_at = time.monotonic()
 
-    full_message = "\n".join(lines)
-    try:
-        code = int(lines[-1][:3])
-    except (ValueError, IndexError):
-        code = 0
+    @property
+    def pipelining(self) -> bool:
+        return "PIPELINING" in self.features
 
-    return code, full_message
+    @property
+    def starttls(self) -> bool:
+        return "STARTTLS" in self.features
 
+    @property
+    def size(self) -> bool:
+        return "SIZE" in self.features
 
-async def _send_command(
-    writer: asyncio.StreamWriter,
-    reader: asyncio.StreamReader,
-    command: str,
-    timeout: float = COMMAND_TIMEOUT,
-) -> tuple[int, str]:
-    """Send an SMTP command and read the response."""
-    logger.debug(f">>> {command}")
-    writer.write(f"{command}\r\n".encode())
-    await writer.drain()
-    code, message = await _read_response(reader, timeout)
-    logger.debug(f"<<< {code} {message}")
-    return code, message
+    @property
+    def chunking(self) -> bool:
+        return "CHUNKING" in self.features
 
+    def as_dict(self) -> dict:
+        return {
+            "pipelining": self.pipelining,
+            "starttls": self.starttls,
+            "size": self.size,
+            "chunking": self.chunking,
+            "requires_tls": self.requires_tls,
+            "tls_broken": self.tls_broken,
+        }
 
-async def smtp_check(
-    email: str,
-    mx_host: str,
-    helo_domain: str = DEFAULT_HELO_DOMAIN,
-    from_address: str = DEFAULT_FROM_ADDRESS,
-    port: int = SMTP_PORT,
-    connect_timeout: float = CONNECT_TIMEOUT,
-    command_timeout: float = COMMAND_TIMEOUT,
-    total_timeout: float = TOTAL_TIMEOUT,
-) -> SmtpResponse:
-    """Perform SMTP handshake to verify an email address.
 
-    Flow: connect -> read banner -> EHLO -> MAIL FROM -> RCPT TO -> QUIT
+class MxCapabilityCache:
+    """Per-MX capability entries that expire ``ttl`` seconds after first seen.
 
-    Does NOT send DATA (we're only checking if the mailbox exists).
-    Handles greylisting with retries.
+    Entries are refreshed from every plaintext EHLO; the TLS verdicts learned
+    from MAIL/RCPT replies are kept until the entry expires. Listeners (e.g.
+    a persistent store) are called with (mx_host, entry) when an entry's
+    features or TLS requirement change.
     """
 
-    async def _attempt() -> SmtpResponse:
-        reader: Optional[asyncio.StreamReader] = None
-        writer: Optional[asyncio.StreamWriter] = None
+    def __init__(self, ttl: float = CAPABILITY_TTL):
+        self.ttl = ttl
+        self._entries: dict[str, MxCapabilities] = {}
+        self._listeners: list[Callable[[str, MxCapabilities], None]] = []
+
+    def get(self, mx_host: str) -> Optional[MxCapabilities]:
+        mx_host = mx_host.lower()
+        entry = self._entries.get(mx_host)
+        if entry is not None and time.monotonic() - entry.observed_at > self.ttl:
+            del self._entries[mx_host]
+            return None
+        return entry
+
+    def _entry(self, mx_host: str) -> MxCapabilities:
+        entry = self.get(mx_host)
+        if entry is None:
+            entry = MxCapabilities(set())
+            self._entries[mx_host.lower()] = entry
+        return entry
+
+    def record_features(self, mx_host: str, features: set[str]) -> None:
+        entry = self._entry(mx_host)
+        if entry.features != features:
+            entry.features = set(features)
+            self._notify(mx_host, entry)
+
+    def mark_requires_tls(self, mx_host: str) -> None:
+        entry = self._entry(mx_host)
+        if not entry.requires_tls:
+            logger.info(f"{mx_host} refuses plaintext transactions, using STARTTLS from now on")
+            entry.requires_tls = True
+            self._notify(mx_host, entry)
+
+    def mark_tls_broken(self, mx_host: str) -> None:
+        entry = self._entry(mx_host)
+        if not entry.tls_broken:
+            logger.info(f"TLS handshake with {mx_host} failed, using plaintext sessions")
+            entry.tls_broken = True
+
+    def wants_tls(self, mx_host: str) -> bool:
+        """Whether a new session to this host should negotiate STARTTLS."""
+        entry = self.get(mx_host)
+        if entry is not None and entry.tls_broken:
+            return False
+        if STARTTLS_MODE == "always":
+            return True
+        return entry is not None and entry.requires_tls
+
+    def _notify(self, mx_host: str, entry: MxCapabilities) -> None:
+        for listener in self._listeners:
+            try:
+                listener(mx_host.lower(), entry)
+            except Exception as e:
+                logger.warning(f"Capability listener failed for {mx_host}: {e}")
 
-        try:
-            # Connect
-            reader, writer = await asyncio.wait_for(
-                asyncio.open_connection(mx_host, port),
-                timeout=connect_timeout,
-            )
+    def load(self, entries: dict[str, tuple[set[str], bool, float]]) -> None:
+        """Seed {mx_host: (features, requires_tls, observed_at)} without notifying listeners.
+
+        ``observed_at`` is wall-clock time.time(); entries keep their age, so
+        one already older than ``ttl`` is skipped instead of being renewed.
+        """
+        now = time.time()
+        for mx_host, (features, requires_tls, observed_at) in entries.items():
+            age = max(0.0, now - observed_at)
+            if age > self.ttl:
+                continue
+            entry = MxCapabilities(set(features))
+            entry.requires_tls = bool(requires_tls)
+            entry.observed_at = time.monotonic() - age
+            self._entries[mx_host.lower()] = entry
+
+    def subscribe(self, listener: Callable[[str, MxCapabilities], None]) -> None:
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> dict[str, dict]:
+        return {mx_host: entry.as_dict() for mx_host, entry in self._entries.items()}
+
+
+mx_capabilities = MxCapabilityCache()
+
+mx_latency = MxLatencyTracker(
+    enabled=ADAPTIVE_TIMEOUTS,
+    min_timeout=MIN_ADAPTIVE_TIMEOUT,
+    tarpit_banner=TARPIT_BANNER_DELAY,
+)
+
+mx_health = MxHealthTable(
+    failure_threshold=DEAD_HOST_FAILURES,
+    open_seconds=DEAD_HOST_SECONDS,
+)
+
+source_ips = SourceIpPool(
+    parse_source_addresses(SOURCE_IPS, DEFAULT_HELO_DOMAIN),
+    bad_rate=SOURCE_IP_BAD_RATE,
+    cooldown_seconds=SOURCE_IP_COOLDOWN,
+)
 
-            # Read banner
-            code, message = await _read_response(reader, command_timeout)
-            if code != 220:
-                return parse_smtp_response(code, message)
 
-            # EHLO
-            code, message = await _send_command(writer, reader, f"EHLO {helo_domain}", command_timeout)
+class _StartTlsFailed(Exception):
+    """The TLS handshake after a 220 reply to STARTTLS failed."""
+
+
+class SmtpSessionError(Exception):
+    """Raised when a session cannot be established; carries the server reply."""
+
+    def __init__(self, response: SmtpResponse, source_ip: Optional[str] = None):
+        super().__init__(f"smtp session failed: {response.code} {response.message}")
+        self.response = response
+        self.source_ip = source_ip
+
+
+class SmtpSession:
+    """One live SMTP connection that can carry several MAIL/RCPT transactions.
+
+    Sessions are created by SmtpSessionPool; callers run transaction() and
+    hand the session back to the pool, which resets it with RSET before
+    the next transaction.
+    """
+
+    def __init__(
+        self,
+        mx_host: str,
+        port: int,
+        helo_domain: str,
+        protocol: SmtpClientProtocol,
+        source_ip: Optional[str] = None,
+    ):
+        self.mx_host = mx_host
+        self.port = port
+        self.helo_domain = helo_domain
+        self.protocol = protocol
+        self.source_ip = source_ip
+        self.features: set[str] = set()
+        self.tls = False
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.transactions = 0
+        self.rejections = 0
+        self.broken = False
+
+    @property
+    def key(self) -> tuple[str, int, str, Optional[str]]:
+        return (self.mx_host, self.port, self.helo_domain, self.source_ip)
+
+    @property
+    def is_alive(self) -> bool:
+        return not self.broken and self.protocol.is_connected
+
+    @classmethod
+    async def open(
+        cls,
+        mx_host: str,
+        helo_domain: str = DEFAULT_HELO_DOMAIN,
+        port: int = SMTP_PORT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        command_timeout: float = COMMAND_TIMEOUT,
+        source_ip: Optional[str] = None,
+    ) -> "SmtpSession":
+        """Dial the MX host and run banner -> EHLO (HELO fallback) -> STARTTLS.
+
+        The MX host's addresses come from engine.dns (cached, resolved
+        without the thread-pool executor) and are dialed with Happy Eyeballs
+        fallback. With ``source_ip`` the connection is bound to that local
+        address.
+
+        STARTTLS is only negotiated when mx_capabilities says the host needs
+        it (or KADENVERIFY_SMTP_STARTTLS=always): certificates are not checked
+        and the RCPT verdict is the same either way, so the TLS handshake and
+        second EHLO are pure overhead for hosts that accept plaintext.
+
+        A failed TLS handshake leaves the connection unusable: the host is
+        marked in mx_capabilities and redialed once in plaintext.
+
+        Raises SmtpSessionError (carrying ``source_ip``) if the server answers
+        with an unusable reply; socket-level failures propagate as OSError /
+        asyncio.TimeoutError. Dial and banner times are reported to mx_latency.
+        """
+        started = time.monotonic()
+        addresses = await resolve_host_addresses(mx_host, connect_timeout)
+        remaining = max(0.1, connect_timeout - (time.monotonic() - started))
+        protocol = await open_smtp_connection(mx_host, port, remaining, source_ip, addresses)
+        elapsed = time.monotonic() - started
+        mx_latency.observe_connect(mx_host, elapsed)
+        stage_timings.record("connect", elapsed, mx=mx_host)
+        session = cls(mx_host, port, helo_domain, protocol, source_ip)
+        try:
+            await session._handshake(command_timeout)
+        except _StartTlsFailed as e:
+            session.close(quit=False)
+            logger.debug(f"STARTTLS with {mx_host} failed ({e}), redialing in plaintext")
+            mx_capabilities.mark_tls_broken(mx_host)
+            return await cls.open(mx_host, helo_domain, port, connect_timeout, command_timeout, source_ip)
+        except SmtpSessionError as e:
+            session.close(quit=False)
+            e.source_ip = source_ip
+            raise
+        except BaseException:
+            session.close(quit=False)
+            raise
+        return session
+
+    async def _handshake(self, command_timeout: float) -> None:
+        # Read banner (tarpits delay it on purpose, so it may get longer)
+        started = time.monotonic()
+        banner_timeout = mx_latency.banner_timeout(self.mx_host, command_timeout, TOTAL_TIMEOUT / 2)
+        (code, message), = await self.protocol.read_replies(1, banner_timeout)
+        if code != 0:
+            elapsed = time.monotonic() - started
+            mx_latency.observe_banner(self.mx_host, elapsed)
+            stage_timings.record("banner", elapsed, mx=self.mx_host)
+        if code != 220:
+            raise SmtpSessionError(parse_smtp_response(code, message))
+
+        # EHLO
+        with stage_timings.span("ehlo", mx=self.mx_host):
+            code, message = await self.command(f"EHLO {self.helo_domain}", command_timeout)
             if code != 250:
                 # Try HELO as fallback
-                code, message = await _send_command(writer, reader, f"HELO {helo_domain}", command_timeout)
+                code, message = await self.command(f"HELO {self.helo_domain}", command_timeout)
                 if code != 250:
-                    return parse_smtp_response(code, message)
-
-            # Try STARTTLS if available (best effort, don't fail if unavailable)
-            if "STARTTLS" in message.upper():
-                try:
-                    tls_code, tls_msg = await _send_command(writer, reader, "STARTTLS", command_timeout)
-                    if tls_code == 220:
-                        import ssl
-                        ssl_context = ssl.create_default_context()
-                        ssl_context.check_hostname = False
-                        ssl_context.verify_mode = ssl.CERT_NONE
-
-                        transport = writer.transport
-                        protocol = transport.get_protocol()
-                        loop = asyncio.get_event_loop()
-                        new_transport = await loop.start_tls(
-                            transport, protocol, ssl_context,
-                            server_hostname=mx_host,
-                        )
-                        writer._transport = new_transport
-
-                        # Re-EHLO after STARTTLS
-                        code, message = await _send_command(writer, reader, f"EHLO {helo_domain}", command_timeout)
-                except Exception as e:
-                    logger.debug(f"STARTTLS failed (continuing without): {e}")
-
-            # MAIL FROM
-            code, message = await _send_command(
-                writer, reader, f"MAIL FROM:<{from_address}>", command_timeout
-            )
-            if code != 250:
-                return parse_smtp_response(code, message)
+                    raise SmtpSessionError(parse_smtp_response(code, message))
+        self.features = _ehlo_features(message)
+        mx_capabilities.record_features(self.mx_host, self.features)
+
+        # STARTTLS when advertised and needed; a refusal continues in plaintext
+        if "STARTTLS" in self.features and mx_capabilities.wants_tls(self.mx_host):
+            with stage_timings.span("starttls", mx=self.mx_host):
+                await self._starttls(command_timeout)
+
+    async def _starttls(self, command_timeout: float) -> None:
+        tls_code, _ = await self.command("STARTTLS", command_timeout)
+        if tls_code == 220:
+            import ssl
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+            loop = asyncio.get_running_loop()
+            try:
+                new_transport = await loop.start_tls(
+                    self.protocol.transport, self.protocol, ssl_context,
+                    server_hostname=self.mx_host,
+                    ssl_handshake_timeout=command_timeout,
+                )
+            except (ssl.SSLError, OSError) as e:
+                raise _StartTlsFailed(str(e) or type(e).__name__) from e
+            self.protocol.transport = new_transport
+            self.tls = True
+
+            # Re-EHLO after STARTTLS
+            code, message = await self.command(f"EHLO {self.helo_domain}", command_timeout)
+            if code == 250:
+                self.features = _ehlo_features(message)
+        else:
+            logger.debug(f"STARTTLS refused by {self.mx_host} (continuing without)")
+
+    async def command(self, command: str, timeout: float = COMMAND_TIMEOUT) -> tuple[int, str]:
+        """Send one command; marks the session broken on 421 or a dead socket."""
+        started = time.monotonic()
+        try:
+            await self.protocol.send([command])
+        except OSError as e:
+            self.broken = True
+            return 0, f"connection lost: {e}"
+        (code, message), = await self.protocol.read_replies(1, timeout)
+        self.last_used = time.monotonic()
+        if code == 0 or code == 421:
+            self.broken = True
+        else:
+            mx_latency.observe_command(self.mx_host, self.last_used - started)
+        return code, message
+
+    async def pipeline(self, commands: list[str], timeout: float = COMMAND_TIMEOUT) -> list[tuple[int, str]]:
+        """Send several commands in one write and read their replies in order (RFC 2920).
+
+        The whole group shares one read deadline of ``timeout``.
+        """
+        started = time.monotonic()
+        try:
+            await self.protocol.send(commands)
+        except OSError as e:
+            self.broken = True
+            return [(0, f"connection lost: {e}")] * len(commands)
+        replies = await self.protocol.read_replies(len(commands), timeout)
+        self.last_used = time.monotonic()
+        if replies[0][0] != 0:
+            # First reply of the group = one round trip
+            mx_latency.observe_command(self.mx_host, self.last_used - started)
+        for index, (code, message) in enumerate(replies):
+            if code == 0:
+                # Lost the connection mid-group: every outstanding reply is gone.
+                self.broken = True
+                replies[index:] = [(code, message)] * (len(replies) - index)
+                break
+            if code == 421:
+                self.broken = True
+        return replies
+
+    async def transaction(
+        self,
+        from_address: str,
+        recipients: list[str],
+        timeout: float = COMMAND_TIMEOUT,
+    ) -> tuple[tuple[int, str], list[tuple[int, str]]]:
+        """Run MAIL FROM + one RCPT TO per recipient (never DATA).
+
+        When EHLO advertised PIPELINING the whole group goes out in one write
+        and the replies are matched back to recipients in order; otherwise the
+        commands are sent one at a time. Returns (mail_reply, rcpt_replies);
+        rcpt_replies is empty when MAIL FROM is rejected.
+        """
+        self.transactions += 1
+        started = time.perf_counter()
+        mail_from = f"MAIL FROM:<{from_address}>"
+        rcpt_commands = [f"RCPT TO:<{email}>" for email in recipients]
+
+        if "PIPELINING" in self.features and rcpt_commands:
+            replies = await self.pipeline([mail_from] + rcpt_commands, timeout)
+            mail_reply, rcpt_replies = replies[0], replies[1:]
+            if mail_reply[0] != 250:
+                rcpt_replies = []
+        else:
+            mail_reply = await self.command(mail_from, timeout)
+            rcpt_replies = []
+            if mail_reply[0] == 250:
+                for command in rcpt_commands:
+                    reply = await self.command(command, timeout)
+                    rcpt_replies.append(reply)
+                    if reply[0] == 0:
+                        rcpt_replies.extend([reply] * (len(rcpt_commands) - len(rcpt_replies)))
+                        break
+
+        self.rejections += sum(1 for code, _ in rcpt_replies if 500 <= code < 600)
+        stage_timings.record("rcpt", time.perf_counter() - started, mx=self.mx_host)
+        return mail_reply, rcpt_replies
+
+    async def reset(self, timeout: float = RSET_TIMEOUT) -> bool:
+        """RSET the session between transactions; doubles as a liveness check."""
+        try:
+            code, _ = await self.command("RSET", timeout)
+        except (asyncio.TimeoutError, OSError):
+            self.broken = True
+            return False
+        return code == 250
+
+    def close(self, quit: bool = True) -> None:
+        """Close the connection without waiting; sends QUIT when still healthy."""
+        if quit and self.is_alive:
+            try:
+                self.protocol.transport.write(b"QUIT\r\n")
+            except Exception:
+                pass
+        self.broken = True
+        try:
+            self.protocol.close()
+        except Exception:
+            pass
 
-            # RCPT TO (the actual verification)
-            code, message = await _send_command(
-                writer, reader, f"RCPT TO:<{email}>", command_timeout
+
+class SmtpSessionPool:
+    """Warm SMTP sessions keyed by (mx_host, port, helo_domain, source_ip).
+
+    - Sessions checked out per MX host are capped by an adaptive (AIMD) limit
+      that starts at ``initial_per_host`` and moves between 1 and
+      ``max_per_host`` with the host's replies (see engine.concurrency).
+    - Idle sessions older than ``idle_timeout`` are closed instead of reused.
+    - Reused sessions get an RSET first; a failed RSET evicts the session.
+    - Sessions are retired after ``max_transactions`` transactions or
+      ``max_rejections`` rejected recipients, and immediately on 421/EOF.
+    - With a source-address pool configured, new sessions are bound to the
+      address picked by ``sources`` and announce that address's HELO name;
+      idle sessions on benched addresses are not reused.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = POOL_MAX_PER_HOST,
+        initial_per_host: int = POOL_INITIAL_PER_HOST,
+        idle_timeout: float = POOL_IDLE_TIMEOUT,
+        max_transactions: int = POOL_MAX_TRANSACTIONS,
+        max_rejections: int = POOL_MAX_REJECTIONS,
+        enabled: bool = POOL_ENABLED,
+        sources: Optional[SourceIpPool] = None,
+    ):
+        self.max_per_host = max(1, max_per_host)
+        self.idle_timeout = idle_timeout
+        self.max_transactions = max_transactions
+        self.max_rejections = max_rejections
+        self.enabled = enabled
+        self.concurrency = MxConcurrencyController(
+            initial=min(initial_per_host, self.max_per_host),
+            maximum=self.max_per_host,
+        )
+        self.sources = sources if sources is not None else source_ips
+        self._idle: dict[tuple[str, int, str, Optional[str]], list[SmtpSession]] = {}
+        self._counters = {"dialed": 0, "reused": 0, "evicted": 0, "tls": 0}
+
+    async def _checkout_idle(self, key: tuple[str, int, str, Optional[str]]) -> Optional[SmtpSession]:
+        idle = self._idle.get(key)
+        now = time.monotonic()
+        while idle:
+            session = idle.pop()
+            if not session.is_alive or now - session.last_used > self.idle_timeout:
+                self._counters["evicted"] += 1
+                session.close()
+                continue
+            if await session.reset():
+                self._counters["reused"] += 1
+                return session
+            self._counters["evicted"] += 1
+            session.close(quit=False)
+        return None
+
+    async def acquire(
+        self,
+        mx_host: str,
+        helo_domain: str = DEFAULT_HELO_DOMAIN,
+        port: int = SMTP_PORT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        command_timeout: float = COMMAND_TIMEOUT,
+        fresh: bool = False,
+    ) -> SmtpSession:
+        """Check out a session, reusing an idle one unless ``fresh`` is set."""
+        slot = self.concurrency.limiter(mx_host)
+        await slot.acquire()
+        try:
+            if self.enabled and not fresh:
+                if self.sources:
+                    keys = [(mx_host, port, a.helo, a.ip) for a in self.sources.usable()]
+                else:
+                    keys = [(mx_host, port, helo_domain, None)]
+                for key in keys:
+                    session = await self._checkout_idle(key)
+                    if session is not None:
+                        return session
+            source = self.sources.pick()
+            session = await SmtpSession.open(
+                mx_host,
+                source.helo if source else helo_domain,
+                port,
+                connect_timeout,
+                command_timeout,
+                source.ip if source else None,
             )
+            self._counters["dialed"] += 1
+            if session.tls:
+                self._counters["tls"] += 1
+            return session
+        except BaseException:
+            slot.release()
+            raise
+
+    def release(self, session: SmtpSession, reusable: bool = True) -> None:
+        """Return a session; it is parked idle only if it is still healthy."""
+        self.concurrency.limiter(session.mx_host).release()
+        keep = (
+            self.enabled
+            and reusable
+            and session.is_alive
+            and session.transactions < self.max_transactions
+            and session.rejections < self.max_rejections
+        )
+        if not keep:
+            session.close()
+            return
+        session.last_used = time.monotonic()
+        self._idle.setdefault(session.key, []).append(session)
+
+    @asynccontextmanager
+    async def session(
+        self,
+        mx_host: str,
+        helo_domain: str = DEFAULT_HELO_DOMAIN,
+        port: int = SMTP_PORT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        command_timeout: float = COMMAND_TIMEOUT,
+    ) -> AsyncIterator[SmtpSession]:
+        session = await self.acquire(mx_host, helo_domain, port, connect_timeout, command_timeout)
+        reusable = False
+        try:
+            yield session
+            reusable = True
+        finally:
+            self.release(session, reusable=reusable)
+
+    def close(self) -> None:
+        """Close every idle session (checked-out sessions close on release)."""
+        for sessions in self._idle.values():
+            for session in sessions:
+                session.close()
+        self._idle.clear()
+
+    def stats(self) -> dict:
+        return {
+            "idle_sessions": sum(len(s) for s in self._idle.values()),
+            "hosts": len(self.concurrency),
+            **self._counters,
+        }
+
 
-            # QUIT (always, regardless of result)
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SmtpSessionPool]" = weakref.WeakKeyDictionary()
+
+
+def get_session_pool() -> SmtpSessionPool:
+    """Return the session pool bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = SmtpSessionPool()
+        _pools[loop] = pool
+    return pool
+
+
+async def close_session_pool() -> None:
+    """Close idle sessions of the running loop's pool (e.g. before asyncio.run exits)."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        pool.close()
+
+
+class RcptLimitTable:
+    """Recipient limits observed per MX host (452 4.5.3 "too many recipients").
+
+    Only ever lowers a host's limit. Listeners (e.g. a persistent store) are
+    called with (mx_host, limit) whenever a new, lower limit is learned.
+    """
+
+    def __init__(self):
+        self._limits: dict[str, int] = {}
+        self._listeners: list[Callable[[str, int], None]] = []
+
+    def get(self, mx_host: str) -> Optional[int]:
+        return self._limits.get(mx_host.lower())
+
+    def observe(self, mx_host: str, accepted: int) -> None:
+        """Record that the host accepted ``accepted`` RCPTs before refusing more."""
+        if accepted < 1:
+            return
+        mx_host = mx_host.lower()
+        current = self._limits.get(mx_host)
+        if current is not None and current <= accepted:
+            return
+        self._limits[mx_host] = accepted
+        logger.info(f"Learned RCPT limit {accepted} for {mx_host}")
+        for listener in self._listeners:
             try:
-                await _send_command(writer, reader, "QUIT", 5)
-            except Exception:
-                pass
+                listener(mx_host, accepted)
+            except Exception as e:
+                logger.warning(f"RCPT limit listener failed for {mx_host}: {e}")
+
+    def load(self, limits: dict[str, int]) -> None:
+        """Seed limits (e.g. from the persistent store) without notifying listeners."""
+        for mx_host, limit in limits.items():
+            if limit >= 1:
+                self._limits[mx_host.lower()] = int(limit)
+
+    def subscribe(self, listener: Callable[[str, int], None]) -> None:
+        self._listeners.append(listener)
+
+    def snapshot(self) -> dict[str, int]:
+        return dict(self._limits)
+
+
+rcpt_limits = RcptLimitTable()
+
+
+def rcpt_limit_for(mx_host: str) -> int:
+    """Max recipients to pack into one transaction against this MX host."""
+    learned = rcpt_limits.get(mx_host)
+    if learned is None:
+        return MAX_RCPT_PER_SESSION
+    return min(MAX_RCPT_PER_SESSION, learned)
+
+
+def _congestion_reason(replies: list[tuple[int, str]]) -> Optional[str]:
+    """Name the first reply that means the host wants us to slow down, if any."""
+    for code, message in replies:
+        if code == 421:
+            return "421"
+        if code == 0:
+            return "connection"
+        if code >= 400 and parse_smtp_response(code, message).is_blacklisted:
+            return "blacklist"
+    return None
+
+
+def _timeouts_for(
+    mx_host: str,
+    connect_timeout: Optional[float],
+    command_timeout: Optional[float],
+    total_timeout: Optional[float],
+) -> tuple[float, float, float]:
+    """Fill in timeouts the caller left as None from mx_latency (or the fixed defaults)."""
+    return mx_latency.timeouts(
+        mx_host, connect_timeout, command_timeout, total_timeout,
+        CONNECT_TIMEOUT, COMMAND_TIMEOUT, TOTAL_TIMEOUT,
+    )
 
-            return parse_smtp_response(code, message)
 
+async def _transact(
+    pool: SmtpSessionPool,
+    mx_host: str,
+    helo_domain: str,
+    from_address: str,
+    recipients: list[str],
+    port: int,
+    connect_timeout: float,
+    command_timeout: float,
+    fresh: bool = False,
+) -> tuple[SmtpSession, tuple[int, str], list[tuple[int, str]]]:
+    """Run _transact_once() and feed its outcome to the AIMD limiter, mx_health
+    and the pool's source-address reputation.
+
+    Hosts whose circuit is open fail immediately without dialing.
+    """
+    if not mx_health.allow(mx_host):
+        raise SmtpSessionError(SmtpResponse(code=0, message="mx host unreachable (circuit open after recent failures)"))
+    limiter = pool.concurrency.limiter(mx_host)
+    started = time.monotonic()
+    answered: Optional[bool] = None
+    try:
+        try:
+            session, mail_reply, rcpt_replies = await _transact_once(
+                pool, mx_host, helo_domain, from_address, recipients, port,
+                connect_timeout, command_timeout, fresh=fresh,
+            )
+        except asyncio.TimeoutError:
+            limiter.on_congestion("timeout")
+            answered = False
+            raise
+        except OSError:
+            limiter.on_congestion("connection")
+            answered = False
+            raise
+        except SmtpSessionError as e:
+            reason = _congestion_reason([(e.response.code, e.response.message)])
+            if reason:
+                limiter.on_congestion(reason)
+            pool.sources.record(e.source_ip, reason)
+            answered = e.response.code not in (0, 421)
+            raise
+
+        reason = _congestion_reason([mail_reply] + rcpt_replies)
+        if reason:
+            limiter.on_congestion(reason)
+        else:
+            limiter.on_success(time.monotonic() - started)
+        pool.sources.record(session.source_ip, reason)
+        answered = mail_reply[0] not in (0, 421)
+        return session, mail_reply, rcpt_replies
+    finally:
+        mx_health.record(mx_host, answered, time.monotonic() - started)
+
+
+async def _transact_once(
+    pool: SmtpSessionPool,
+    mx_host: str,
+    helo_domain: str,
+    from_address: str,
+    recipients: list[str],
+    port: int,
+    connect_timeout: float,
+    command_timeout: float,
+    fresh: bool = False,
+) -> tuple[SmtpSession, tuple[int, str], list[tuple[int, str]]]:
+    """Check out a session and run one MAIL FROM/RCPT TO transaction on it.
+
+    A pooled session the server silently dropped only shows up when we talk
+    to it, so a dead reply on a reused session is retried once on a fresh dial.
+    A plaintext session refused with "530 Must issue a STARTTLS command first"
+    marks the host in mx_capabilities and is retried once on a TLS session.
+    The caller owns the returned session and must release it.
+    """
+
+    async def _redial(stale: SmtpSession):
+        pool.release(stale, reusable=False)
+        session = await pool.acquire(
+            mx_host, helo_domain, port, connect_timeout, command_timeout, fresh=True
+        )
+        try:
+            mail_reply, rcpt_replies = await session.transaction(from_address, recipients, command_timeout)
+        except BaseException:
+            pool.release(session, reusable=False)
+            raise
+        return session, mail_reply, rcpt_replies
+
+    session = await pool.acquire(mx_host, helo_domain, port, connect_timeout, command_timeout, fresh=fresh)
+    reused = session.transactions > 0
+    try:
+        mail_reply, rcpt_replies = await session.transaction(from_address, recipients, command_timeout)
+    except OSError:
+        if not reused:
+            pool.release(session, reusable=False)
+            raise
+        session.broken = True
+        mail_reply, rcpt_replies = (0, "connection lost"), []
+    except BaseException:
+        pool.release(session, reusable=False)
+        raise
+    if reused and session.broken and mail_reply[0] in (0, 421):
+        session, mail_reply, rcpt_replies = await _redial(session)
+
+    if not session.tls:
+        if _requires_tls(mail_reply) or any(_requires_tls(reply) for reply in rcpt_replies):
+            mx_capabilities.mark_requires_tls(mx_host)
+            if "STARTTLS" in session.features:
+                session, mail_reply, rcpt_replies = await _redial(session)
+    return session, mail_reply, rcpt_replies
+
+
+def mx_candidates(mx_hosts: list[str]) -> list[str]:
+    """MX hosts to try for a domain, best first (see MxHealthTable.order)."""
+    return mx_health.order(mx_hosts)[:MX_FAILOVER_ATTEMPTS]
+
+
+def is_unreachable(result: SmtpResponse) -> bool:
+    """Whether a probe never got a verdict from the host (worth another MX)."""
+    return result.code in (0, 421)
+
+
+async def with_mx_failover(
+    mx_hosts: list[str],
+    probe: Callable[[str], Awaitable[T]],
+    failed: Callable[[T], bool],
+) -> tuple[str, T]:
+    """Run ``probe(mx_host)`` on the domain's MX hosts until one answers.
+
+    Hosts are tried in mx_candidates() order. Returns (mx_host, result) for
+    the first result ``failed`` does not reject, or for the last host tried.
+    """
+    candidates = mx_candidates(mx_hosts)
+    for mx_host in candidates:
+        result = await probe(mx_host)
+        if not failed(result):
+            break
+        if mx_host != candidates[-1]:
+            logger.info(f"{mx_host} unreachable, failing over to next MX")
+    return mx_host, result
+
+
+async def _probe(
+    recipients: list[str],
+    mx_host: str,
+    helo_domain: str,
+    from_address: str,
+    port: int,
+    connect_timeout: Optional[float],
+    command_timeout: Optional[float],
+    total_timeout: Optional[float],
+    greylist_retries: int,
+    deadline: Optional[float] = None,
+) -> list[SmtpResponse]:
+    """Run one MAIL FROM + RCPT TO transaction for a few recipients.
+
+    Returns one SmtpResponse per recipient (all equal to the MAIL FROM or
+    connection failure when the transaction never reached RCPT). Retries in
+    place while the first recipient is greylisted. Timeouts left as None
+    are set per host by mx_latency.
+
+    ``deadline`` (a time.monotonic() value) caps every attempt. A greylist
+    retry that could not finish before it is skipped and the greylisted
+    reply returned; an attempt cut short answers code 0 DEADLINE_EXCEEDED.
+    """
+    connect_timeout, command_timeout, total_timeout = _timeouts_for(
+        mx_host, connect_timeout, command_timeout, total_timeout
+    )
+
+    def _all(response: SmtpResponse) -> list[SmtpResponse]:
+        return [response] * len(recipients)
+
+    async def _attempt(fresh: bool = False) -> list[SmtpResponse]:
+        pool = get_session_pool()
+        session: Optional[SmtpSession] = None
+        reusable = False
+
+        try:
+            session, (code, message), rcpt_replies = await _transact(
+                pool, mx_host, helo_domain, from_address, recipients, port,
+                connect_timeout, command_timeout, fresh=fresh,
+            )
+            if code != 250:
+                reusable = 200 <= code < 600
+                return _all(parse_smtp_response(code, message))
+
+            # RCPT TO (the actual verification)
+            results = [parse_smtp_response(code, message) for code, message in rcpt_replies]
+            if results[0].is_rcpt_limit and not fresh:
+                # Some MTAs count recipients per connection, not per transaction.
+                # A cut after the first recipient still leaves it a verdict.
+                pool.release(session, reusable=False)
+                session = None
+                return await _attempt(fresh=True)
+            reusable = True
+            return results
+
+        except SmtpSessionError as e:
+            return _all(e.response)
         except asyncio.TimeoutError:
-            return SmtpResponse(code=0, message="connection timeout")
+            return _all(SmtpResponse(code=0, message="connection timeout"))
         except ConnectionRefusedError:
-            return SmtpResponse(code=0, message="connection refused")
+            return _all(SmtpResponse(code=0, message="connection refused"))
         except OSError as e:
-            return SmtpResponse(code=0, message=f"connection error: {e}")
+            return _all(SmtpResponse(code=0, message=f"connection error: {e}"))
         finally:
-            if writer:
-                try:
-                    writer.close()
-                    await writer.wait_closed()
-                except Exception:
-                    pass
+            if session is not None:
+                pool.release(session, reusable=reusable)
 
     # Execute with total timeout and greylisting retries
-    for attempt in range(GREYLIST_RETRIES + 1):
+    for attempt in range(greylist_retries + 1):
+        timeout = total_timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return _all(SmtpResponse(code=0, message=DEADLINE_EXCEEDED))
+            timeout = min(timeout, remaining)
+        attempt_started = time.monotonic()
         try:
-            result = await asyncio.wait_for(_attempt(), timeout=total_timeout)
+            results = await asyncio.wait_for(_attempt(), timeout=timeout)
         except asyncio.TimeoutError:
-            return SmtpResponse(code=0, message="total timeout exceeded")
+            if deadline is not None and time.monotonic() >= deadline:
+                return _all(SmtpResponse(code=0, message=DEADLINE_EXCEEDED))
+            # _transact only saw a cancellation and recorded no verdict; a host
+            # that keeps blowing the total timeout (tarpit) is a failure
+            get_session_pool().concurrency.limiter(mx_host).on_congestion("timeout")
+            mx_health.record(mx_host, False, time.monotonic() - attempt_started)
+            return _all(SmtpResponse(code=0, message="total timeout exceeded"))
 
         # If greylisted and we have retries left, wait and retry
-        if result.is_greylisted and attempt < GREYLIST_RETRIES:
+        if results[0].is_greylisted and attempt < greylist_retries:
+            if deadline is not None and time.monotonic() + GREYLIST_DELAY >= deadline:
+                logger.info(f"Greylisted on attempt {attempt + 1}, no time left before the deadline to retry")
+                return results
             logger.info(f"Greylisted on attempt {attempt + 1}, retrying in {GREYLIST_DELAY}s...")
             await asyncio.sleep(GREYLIST_DELAY)
             continue
 
-        return result
+        return results
 
-    return SmtpResponse(code=0, message="max retries exceeded")
+    return _all(SmtpResponse(code=0, message="max retries exceeded"))
 
 
-async def check_catch_all(
-    domain: str,
+async def smtp_check(
+    email: str,
     mx_host: str,
     helo_domain: str = DEFAULT_HELO_DOMAIN,
     from_address: str = DEFAULT_FROM_ADDRESS,
     port: int = SMTP_PORT,
-) -> Optional[bool]:
-    """Check if a domain is catch-all by sending RCPT TO with a random address.
+    connect_timeout: Optional[float] = None,
+    command_timeout: Optional[float] = None,
+    total_timeout: Optional[float] = None,
+    greylist_retries: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> SmtpResponse:
+    """Perform SMTP handshake to verify an email address.
 
-    Returns:
-        True: Domain is catch-all (accepts everything)
-        False: Domain is NOT catch-all (rejects unknown addresses)
-        None: Could not determine (connection failed, timeout, etc.)
+    Flow: (pooled session) -> MAIL FROM -> RCPT TO -> session back to pool
+    (MAIL FROM and RCPT TO share one write when the server supports PIPELINING).
+
+    Does NOT send DATA (we're only checking if the mailbox exists).
+    Handles greylisting by sleeping and retrying up to greylist_retries times
+    (default GREYLIST_RETRIES); batch callers pass 0 and schedule the retry
+    themselves so the sleep does not hold their concurrency slots.
+    ``deadline`` (time.monotonic()) bounds the whole call, retries included.
     """
-    random_email = _random_address(domain)
-
-    result = await smtp_check(
-        email=random_email,
-        mx_host=mx_host,
-        helo_domain=helo_domain,
-        from_address=from_address,
-        port=port,
-    )
+    if greylist_retries is None:
+        greylist_retries = GREYLIST_RETRIES
+    with stage_timings.span("smtp_check", mx=mx_host):
+        results = await _probe(
+            [email], mx_host, helo_domain, from_address, port,
+            connect_timeout, command_timeout, total_timeout, greylist_retries, deadline,
+        )
+    return results[0]
+
 
+def catch_all_verdict(result: SmtpResponse) -> Optional[bool]:
+    """Interpret the reply to a random-address RCPT as a catch-all verdict."""
     # 250 on random address = catch-all
     if result.code == 250:
         return True
 
     # 550 family on random address = NOT catch-all (rejects unknowns)
-    if 500 <= result.code < 600:
+    if 500 <= result.code < 600 and not result.is_rcpt_limit:
         return False
 
     # Anything else = indeterminate
     return None
 
 
+async def check_catch_all(
+    domain: str,
+    mx_host: str,
+    helo_domain: str = DEFAULT_HELO_DOMAIN,
+    from_address: str = DEFAULT_FROM_ADDRESS,
+    port: int = SMTP_PORT,
+    greylist_retries: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> Optional[bool]:
+    """Check if a domain is catch-all by sending RCPT TO with a random address.
+
+    Returns:
+        True: Domain is catch-all (accepts everything)
+        False: Domain is NOT catch-all (rejects unknown addresses)
+        None: Could not determine (connection failed, timeout, etc.)
+    """
+    random_email = random_address(domain)
+
+    with stage_timings.span("catch_all", mx=mx_host):
+        result = await smtp_check(
+            email=random_email,
+            mx_host=mx_host,
+            helo_domain=helo_domain,
+            from_address=from_address,
+            port=port,
+            greylist_retries=greylist_retries,
+            deadline=deadline,
+        )
+    return catch_all_verdict(result)
+
+
+async def smtp_check_with_catch_all(
+    email: str,
+    mx_host: str,
+    helo_domain: str = DEFAULT_HELO_DOMAIN,
+    from_address: str = DEFAULT_FROM_ADDRESS,
+    port: int = SMTP_PORT,
+    connect_timeout: Optional[float] = None,
+    command_timeout: Optional[float] = None,
+    total_timeout: Optional[float] = None,
+    greylist_retries: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> tuple[SmtpResponse, Optional[bool]]:
+    """Verify an address and probe its domain for catch-all in one transaction.
+
+    The random-local-part RCPT rides along after the real one, so a cold
+    domain costs one session instead of two. Hosts that only take one RCPT
+    per transaction fall back to a separate check_catch_all().
+
+    Returns (smtp_result, is_catch_all) with is_catch_all as in check_catch_all.
+    """
+    if greylist_retries is None:
+        greylist_retries = GREYLIST_RETRIES
+    domain = email.rsplit("@", 1)[-1]
+    result, probe = await _probe(
+        [email, random_address(domain)], mx_host, helo_domain, from_address, port,
+        connect_timeout, command_timeout, total_timeout, greylist_retries, deadline,
+    )
+    if probe.is_rcpt_limit and not result.is_rcpt_limit:
+        # Only the probe was refused: the host takes one RCPT per transaction
+        rcpt_limits.observe(mx_host, 1)
+        return result, await check_catch_all(
+            domain, mx_host, helo_domain, from_address, port,
+            greylist_retries=greylist_retries, deadline=deadline,
+        )
+    return result, catch_all_verdict(probe)
+
+
 async def smtp_check_batch(
     emails: list[str],
     mx_host: str,
     helo_domain: str = DEFAULT_HELO_DOMAIN,
     from_address: str = DEFAULT_FROM_ADDRESS,
     port: int = SMTP_PORT,
-    connect_timeout: float = CONNECT_TIMEOUT,
-    command_timeout: float = COMMAND_TIMEOUT,
+    connect_timeout: Optional[float] = None,
+    command_timeout: Optional[float] = None,
+    fallback_individual: bool = True,
+    greylist_retries: Optional[int] = None,
+    deadline: Optional[float] = None,
 ) -> list[SmtpResponse]:
     """Batch verify multiple emails to the same MX host using one connection.
 
-    Opens one SMTP connection and sends multiple RCPT TO commands.
-    This is 3-5x faster than opening separate connections per email.
+    Checks out one pooled session and sends multiple RCPT TO commands.
+    This is 3-5x faster than opening separate connections per email. When the
+    server advertises PIPELINING, MAIL FROM and every RCPT TO go out in a
+    single write, so the whole batch costs about one round trip.
+
+    Transactions start at rcpt_limit_for(mx_host) recipients. If the server
+    refuses further recipients (452 4.5.3 / "too many recipients"), the
+    accepted count is recorded in ``rcpt_limits`` and the remaining
+    addresses continue in new transactions of that size.
+    If the connection drops mid-transaction, the recipients that got no
+    reply continue on a new session.
 
     Args:
         emails: List of email addresses (should all be same domain)
@@ -283,91 +1190,95 @@ async def smtp_check_batch(
         helo_domain: Domain for EHLO command
         from_address: Address for MAIL FROM
         port: SMTP port (default 25)
-        connect_timeout: Connection timeout in seconds
-        command_timeout: Command timeout in seconds
+        connect_timeout: Connection timeout in seconds (None: adaptive per host)
+        command_timeout: Command timeout in seconds (None: adaptive per host)
+        fallback_individual: On session failure, re-check each email with
+            smtp_check; when False, failures come back as code-0 responses
+        greylist_retries: In-call greylist retries for that fallback (None
+            uses GREYLIST_RETRIES; batch callers that defer retries pass 0)
+        deadline: Optional time.monotonic() value bounding the whole batch,
+            fallback included; addresses not reached answer DEADLINE_EXCEEDED
 
     Returns:
         List of SmtpResponse objects in same order as emails
     """
-    reader: Optional[asyncio.StreamReader] = None
-    writer: Optional[asyncio.StreamWriter] = None
-
-    try:
-        # Connect
-        reader, writer = await asyncio.wait_for(
-            asyncio.open_connection(mx_host, port),
-            timeout=connect_timeout,
-        )
-
-        # Read banner
-        code, message = await _read_response(reader, command_timeout)
-        if code != 220:
-            # Connection failed - fall back to individual checks
-            return [await smtp_check(email, mx_host, helo_domain, from_address, port) for email in emails]
-
-        # EHLO
-        code, message = await _send_command(writer, reader, f"EHLO {helo_domain}", command_timeout)
-        if code != 250:
-            # Try HELO as fallback
-            code, message = await _send_command(writer, reader, f"HELO {helo_domain}", command_timeout)
-            if code != 250:
-                return [await smtp_check(email, mx_host, helo_domain, from_address, port) for email in emails]
-
-        # STARTTLS (best effort, skip if fails)
-        if "STARTTLS" in message.upper():
-            try:
-                tls_code, tls_msg = await _send_command(writer, reader, "STARTTLS", command_timeout)
-                if tls_code == 220:
-                    import ssl
-                    ssl_context = ssl.create_default_context()
-                    ssl_context.check_hostname = False
-                    ssl_context.verify_mode = ssl.CERT_NONE
-
-                    transport = writer.transport
-                    protocol = transport.get_protocol()
-                    loop = asyncio.get_event_loop()
-                    new_transport = await loop.start_tls(
-                        transport, protocol, ssl_context,
-                        server_hostname=mx_host,
-                    )
-                    writer._transport = new_transport
-
-                    # Re-EHLO after STARTTLS
-                    code, message = await _send_command(writer, reader, f"EHLO {helo_domain}", command_timeout)
-            except Exception as e:
-                logger.debug(f"STARTTLS failed (continuing): {e}")
-
-        # MAIL FROM (one per batch)
-        code, message = await _send_command(
-            writer, reader, f"MAIL FROM:<{from_address}>", command_timeout
-        )
-        if code != 250:
-            return [await smtp_check(email, mx_host, helo_domain, from_address, port) for email in emails]
-
-        # RCPT TO for each email (reusing connection)
-        results = []
-        for email in emails:
-            code, message = await _send_command(
-                writer, reader, f"RCPT TO:<{email}>", command_timeout
+    requested_timeouts = (connect_timeout, command_timeout)
+    connect_timeout, command_timeout, _ = _timeouts_for(mx_host, connect_timeout, command_timeout, None)
+    pool = get_session_pool()
+    results: list[SmtpResponse] = []
+    per_transaction = min(len(emails), rcpt_limit_for(mx_host))
+    fresh = False
+
+    async def _individually(pending: list[str], failure: SmtpResponse) -> list[SmtpResponse]:
+        if not fallback_individual:
+            return [failure.model_copy() for _ in pending]
+        return [
+            await smtp_check(
+                email, mx_host, helo_domain, from_address, port, *requested_timeouts,
+                greylist_retries=greylist_retries, deadline=deadline,
             )
-            results.append(parse_smtp_response(code, message))
-
-        # QUIT
+            for email in pending
+        ]
+
+    failure: Optional[SmtpResponse] = None
+    while failure is None and len(results) < len(emails):
+        chunk = emails[len(results):][:per_transaction]
+        session: Optional[SmtpSession] = None
+        reusable = False
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                results.extend(SmtpResponse(code=0, message=DEADLINE_EXCEEDED) for _ in emails[len(results):])
+                break
+            connect_timeout, command_timeout = min(connect_timeout, remaining), min(command_timeout, remaining)
         try:
-            await _send_command(writer, reader, "QUIT", 5)
-        except Exception:
-            pass
-
-        return results
+            # MAIL FROM (one per transaction) + RCPT TO for each email
+            session, (code, message), rcpt_replies = await _transact(
+                pool, mx_host, helo_domain, from_address, chunk, port,
+                connect_timeout, command_timeout, fresh=fresh,
+            )
+            if code != 250:
+                failure = parse_smtp_response(code, message)
+                continue
+
+            answered = next((i for i, (code, _) in enumerate(rcpt_replies) if code in (0, 421)), len(rcpt_replies))
+            parsed = [parse_smtp_response(code, message) for code, message in rcpt_replies[:answered]]
+            cut = next((i for i, r in enumerate(parsed) if r.is_rcpt_limit), len(parsed))
+            results.extend(parsed[:cut])
+            if cut == len(parsed) and answered < len(rcpt_replies):
+                # Connection lost mid-transaction: the unanswered recipients
+                # go again on a new session, unless a fresh one answered none.
+                if answered == 0 and fresh:
+                    failure = parse_smtp_response(*rcpt_replies[0])
+                fresh = True
+                continue
+            reusable = True
+            if cut == len(parsed):
+                fresh = False
+            elif cut > 0:
+                # Recipient limit hit: remember it and carry on in a new
+                # transaction (the pool RSETs the session before reuse).
+                rcpt_limits.observe(mx_host, cut)
+                per_transaction = cut
+                fresh = False
+            elif not fresh:
+                # Limit counted per connection: continue on a new session
+                reusable = False
+                fresh = True
+            else:
+                failure = parsed[0]
+
+        except SmtpSessionError as e:
+            logger.debug(f"Batch session failed, falling back to individual: {e}")
+            failure = e.response
+        except (asyncio.TimeoutError, ConnectionRefusedError, OSError) as e:
+            # Connection failed - fall back to individual checks
+            logger.debug(f"Batch connection failed, falling back to individual: {e}")
+            failure = SmtpResponse(code=0, message=f"connection error: {e}")
+        finally:
+            if session is not None:
+                pool.release(session, reusable=reusable)
 
-    except (asyncio.TimeoutError, ConnectionRefusedError, OSError) as e:
-        # Connection failed - fall back to individual checks
-        logger.debug(f"Batch connection failed, falling back to individual: {e}")
-        return [await smtp_check(email, mx_host, helo_domain, from_address, port) for email in emails]
-    finally:
-        if writer:
-            try:
-                writer.close()
-                await writer.wait_closed()
-            except Exception:
-                pass
+    if failure is not None:
+        results.extend(await _individually(emails[len(results):], failure))
+    return results
@@ -0,0 +1,234 @@
+"""Low-level asyncio.Protocol SMTP client transport.
+
+Replaces StreamReader.readline() + asyncio.wait_for() per line: incoming bytes
+are split into replies straight from the receive buffer in data_received(),
+each reply is decoded once, and a read of N replies (one command, or a whole
+PIPELINING group) is bounded by a single call_later() deadline instead of a
+timer per line. Commands handed to send() in one call go out in one write.
+"""
+
+import asyncio
+import collections
+import ipaddress
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger("kadenverify.smtp")
+
+# Head start each address gets before the next one is tried (RFC 8305 default)
+HAPPY_EYEBALLS_DELAY = 0.25
+
+
+def _finish_reply(lines: list[bytes]) -> tuple[int, str]:
+    """Turn the raw lines of one reply into (code, message)."""
+    message = b"\n".join(lines).decode("utf-8", errors="replace")
+    try:
+        code = int(lines[-1][:3])
+    except ValueError:
+        code = 0
+    return code, message
+
+
+class SmtpClientProtocol(asyncio.Protocol):
+    """Buffers server replies and hands them to one pending reader at a time."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self.transport: Optional[asyncio.Transport] = None
+        self._buffer = bytearray()
+        self._lines: list[bytes] = []
+        self._replies: collections.deque[tuple[int, str]] = collections.deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._wanted = 0
+        self._closed = False
+        self._paused = False
+        self._drain_waiter: Optional[asyncio.Future] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return not self._closed and self.transport is not None and not self.transport.is_closing()
+
+    # -- asyncio.Protocol callbacks -------------------------------------------
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+
+    def data_received(self, data: bytes) -> None:
+        buffer = self._buffer
+        buffer += data
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line = bytes(buffer[start:end]).rstrip(b"\r")
+            start = end + 1
+            self._lines.append(line)
+            # SMTP multi-line: "250-..." continues, "250 ..." is final
+            if len(line) < 4 or line[3:4] == b" ":
+                self._replies.append(_finish_reply(self._lines))
+                self._lines = []
+        if start:
+            del buffer[:start]
+        self._wake()
+
+    def _flush_partial_line(self) -> None:
+        if self._buffer:
+            self._lines.append(bytes(self._buffer).rstrip(b"\r"))
+            self._buffer.clear()
+
+    def eof_received(self) -> bool:
+        self._closed = True
+        self._flush_partial_line()
+        self._wake()
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._closed = True
+        self._flush_partial_line()
+        self._wake()
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    # -- client API -------------------------------------------------------------
+
+    def _wake(self) -> None:
+        waiter = self._waiter
+        if waiter is not None and not waiter.done() and (len(self._replies) >= self._wanted or self._closed):
+            waiter.set_result(None)
+
+    async def send(self, commands: list[str]) -> None:
+        """Write every command in one transport write (CRLF-terminated)."""
+        if logger.isEnabledFor(logging.DEBUG):
+            for command in commands:
+                logger.debug(f">>> {command}")
+        if not self.is_connected:
+            raise ConnectionResetError("smtp connection closed")
+        self.transport.write("".join(f"{command}\r\n" for command in commands).encode())
+        if self._paused:
+            self._drain_waiter = self._loop.create_future()
+            await self._drain_waiter
+            self._drain_waiter = None
+
+    async def read_replies(self, count: int, timeout: float) -> list[tuple[int, str]]:
+        """Return the next ``count`` replies, waiting at most ``timeout`` for all of them.
+
+        Replies that did not arrive come back as code 0, mirroring the
+        previous reader: (0, "read timeout") on timeout, (0, "no response")
+        once the server closed the connection. A reply cut off mid-way by
+        the deadline or EOF is returned with the lines received so far.
+        """
+        if len(self._replies) < count and not self._closed:
+            waiter = self._loop.create_future()
+            self._waiter, self._wanted = waiter, count
+            timer = self._loop.call_later(timeout, lambda: waiter.done() or waiter.set_result(None))
+            try:
+                await waiter
+            finally:
+                timer.cancel()
+                self._waiter = None
+
+        replies: list[tuple[int, str]] = []
+        for _ in range(count):
+            if self._replies:
+                replies.append(self._replies.popleft())
+            elif self._lines:
+                replies.append(_finish_reply(self._lines))
+                self._lines = []
+            else:
+                replies.append((0, "no response" if self._closed else "read timeout"))
+        if logger.isEnabledFor(logging.DEBUG):
+            for code, message in replies:
+                logger.debug(f"<<< {code} {message}")
+        return replies
+
+    def close(self) -> None:
+        self._closed = True
+        if self.transport is not None:
+            self.transport.close()
+
+
+async def _connect_first(
+    loop: asyncio.AbstractEventLoop,
+    factory: Callable[[], SmtpClientProtocol],
+    addresses: list[str],
+    port: int,
+    local_ip: Optional[str],
+    delay: float,
+) -> tuple[asyncio.BaseTransport, SmtpClientProtocol]:
+    """Happy Eyeballs (RFC 8305): start the next address after ``delay`` or as
+    soon as an attempt fails; the first connection to succeed wins."""
+    if local_ip:
+        family = ipaddress.ip_address(local_ip).version
+        addresses = [a for a in addresses if ipaddress.ip_address(a).version == family]
+        if not addresses:
+            raise OSError(f"no address of the same family as source {local_ip}")
+    local_addr = (local_ip, 0) if local_ip else None
+
+    remaining = list(addresses)
+    pending: set[asyncio.Future] = set()
+    errors: list[OSError] = []
+    winner = None
+    try:
+        while remaining or pending:
+            if remaining:
+                pending.add(asyncio.ensure_future(
+                    loop.create_connection(factory, remaining.pop(0), port, local_addr=local_addr)
+                ))
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                try:
+                    connection = task.result()
+                except OSError as e:
+                    errors.append(e)
+                    continue
+                if winner is None:
+                    winner = connection
+                else:
+                    connection[0].close()
+            if winner is not None:
+                return winner
+    finally:
+        for task in pending:
+            task.cancel()
+    if len(errors) == 1:
+        raise errors[0]
+    raise OSError(f"all {len(addresses)} addresses failed: {'; '.join(str(e) for e in errors)}")
+
+
+async def open_smtp_connection(
+    host: str,
+    port: int,
+    timeout: float,
+    local_ip: Optional[str] = None,
+    addresses: Optional[list[str]] = None,
+) -> SmtpClientProtocol:
+    """Dial ``host:port`` (from ``local_ip`` when given) and return the connected protocol.
+
+    With ``addresses`` (the host's resolved IPs, preferred first) the
+    connection is made by IP with Happy Eyeballs fallback, skipping
+    getaddrinfo; otherwise ``host`` is resolved by the event loop.
+    """
+    loop = asyncio.get_running_loop()
+
+    def factory() -> SmtpClientProtocol:
+        return SmtpClientProtocol(loop)
+
+    if addresses:
+        connect = _connect_first(loop, factory, addresses, port, local_ip, HAPPY_EYEBALLS_DELAY)
+    else:
+        connect = loop.create_connection(factory, host, port, local_addr=(local_ip, 0) if local_ip else None)
+    _, protocol = await asyncio.wait_for(connect, timeout=timeout)
+    return protocol
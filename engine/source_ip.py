@@ -0,0 +1,148 @@
+"""Outbound source-address pool for SMTP probes.
+
+Probes can leave from several local IP addresses, each announcing its own
+HELO name (which should match the address's PTR record). New connections are
+spread over the addresses with smooth weighted round-robin, so per-IP rate
+caps of the big providers apply to each address separately.
+
+Every transaction reports whether the MX pushed back on the address (421 or
+a blacklist rejection). Per address we keep an EWMA of that bad-reply rate:
+degrading addresses get a smaller share of new connections, and an address
+whose rate crosses ``bad_rate`` is benched for ``cooldown_seconds``. When
+every address is benched, the one whose bench ends first is used.
+"""
+
+import time
+from typing import Optional
+
+
+class SourceAddress:
+    """One local address with its HELO name and reputation."""
+
+    __slots__ = (
+        "ip", "helo", "bad_rate", "samples", "cooldown_until",
+        "transactions", "blacklisted", "deferred", "current_weight",
+    )
+
+    def __init__(self, ip: str, helo: str):
+        self.ip = ip
+        self.helo = helo
+        self.bad_rate = 0.0
+        self.samples = 0
+        self.cooldown_until = 0.0
+        self.transactions = 0
+        self.blacklisted = 0
+        self.deferred = 0
+        self.current_weight = 0.0
+
+    def benched(self, now: float) -> bool:
+        return now < self.cooldown_until
+
+    @property
+    def weight(self) -> float:
+        """Share of new connections; shrinks as the bad-reply rate grows."""
+        return max(0.05, 1.0 - self.bad_rate) ** 2
+
+
+def parse_source_addresses(spec: str, default_helo: str) -> list[tuple[str, str]]:
+    """Parse ``"ip[=helo],ip[=helo],..."`` into (ip, helo) pairs."""
+    addresses = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        ip, _, helo = item.partition("=")
+        addresses.append((ip.strip(), helo.strip() or default_helo))
+    return addresses
+
+
+class SourceIpPool:
+    """Local addresses to bind outbound SMTP connections to.
+
+    An empty pool means "let the OS pick": pick() returns None and callers
+    keep their own HELO name.
+    """
+
+    def __init__(
+        self,
+        addresses: Optional[list[tuple[str, str]]] = None,
+        bad_rate: float = 0.3,
+        min_samples: int = 10,
+        cooldown_seconds: float = 600.0,
+        alpha: float = 0.1,
+    ):
+        self.bad_rate = bad_rate
+        self.min_samples = min_samples
+        self.cooldown_seconds = cooldown_seconds
+        self.alpha = alpha
+        self._addresses: dict[str, SourceAddress] = {
+            ip: SourceAddress(ip, helo) for ip, helo in (addresses or [])
+        }
+
+    def __len__(self) -> int:
+        return len(self._addresses)
+
+    def get(self, ip: Optional[str]) -> Optional[SourceAddress]:
+        return self._addresses.get(ip) if ip else None
+
+    def usable(self) -> list[SourceAddress]:
+        """Addresses that are not benched, best reputation first."""
+        now = time.monotonic()
+        return sorted(
+            (a for a in self._addresses.values() if not a.benched(now)),
+            key=lambda a: a.bad_rate,
+        )
+
+    def pick(self) -> Optional[SourceAddress]:
+        """Address for the next new connection (smooth weighted round-robin)."""
+        if not self._addresses:
+            return None
+        candidates = self.usable()
+        if not candidates:
+            return min(self._addresses.values(), key=lambda a: a.cooldown_until)
+        total = 0.0
+        best = None
+        for address in candidates:
+            address.current_weight += address.weight
+            total += address.weight
+            if best is None or address.current_weight > best.current_weight:
+                best = address
+        best.current_weight -= total
+        return best
+
+    def record(self, ip: Optional[str], reason: Optional[str]) -> None:
+        """Report one transaction sent from ``ip``.
+
+        ``reason`` is the MX's congestion signal for it ("421", "blacklist",
+        anything else or None counts as a clean reply).
+        """
+        address = self.get(ip)
+        if address is None:
+            return
+        bad = reason in ("421", "blacklist")
+        address.transactions += 1
+        if reason == "blacklist":
+            address.blacklisted += 1
+        elif reason == "421":
+            address.deferred += 1
+        address.samples += 1
+        address.bad_rate += self.alpha * ((1.0 if bad else 0.0) - address.bad_rate)
+        if bad and address.samples >= self.min_samples and address.bad_rate >= self.bad_rate:
+            address.cooldown_until = time.monotonic() + self.cooldown_seconds
+            # Come back on probation: one more bad streak benches it again quickly
+            address.bad_rate = self.bad_rate / 2
+            address.samples = self.min_samples
+
+    def snapshot(self) -> dict[str, dict]:
+        now = time.monotonic()
+        return {
+            address.ip: {
+                "helo": address.helo,
+                "bad_rate": round(address.bad_rate, 3),
+                "benched": address.benched(now),
+                "transactions": address.transactions,
+                "blacklisted": address.blacklisted,
+                "deferred": address.deferred,
+            }
+            for address in self._addresses.values()
+        }
@@ -1,25 +1,31 @@
-<<<<<<< Updated upstream
-=======
 """Tiered email verification with enrichment (Tier 4-5).
 
 Tier 1: Cached results (instant, <50ms)
-Tier 2: Fast validation (100-500ms) 
+Tier 2: Fast validation (100-500ms)
 Tier 3: SMTP verification (2-5s)
 Tier 4-5: Enrichment for unknowns (1-3s, $0-0.10)
+
+Callers may pass a ``deadline`` (a time.monotonic() value). Once it passes,
+the best result reached so far is returned with a deadline reason and the
+full SMTP verification finishes on the background scheduler, which fills
+the cache for the next request.
 """
 
 import asyncio
+import inspect
 import json
 import logging
+import os
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 from .models import DnsInfo, Provider, Reachability, VerificationResult
 from .syntax import validate_syntax
 from .metadata import classify as classify_metadata
 from .dns import lookup_mx
-from .verifier import verify_email as full_verify_email
+from .verifier import DEADLINE_PARTIAL, verify_email as full_verify_email
 
 logger = logging.getLogger("kadenverify.tiered")
 
@@ -27,6 +33,13 @@ logger = logging.getLogger("kadenverify.tiered")
 CACHE_TTL_DAYS = 30
 FAST_TIER_CONFIDENCE = 0.85
 
+# Role accounts (info@, admin@, ...) are reported undeliverable after SMTP
+FILTER_ROLE_ACCOUNTS = os.environ.get("KADENVERIFY_FILTER_ROLE_ACCOUNTS", "true").lower() == "true"
+
+# Background SMTP verifications behind fast-tier and deadline-cut answers
+TIER3_QUEUE_SIZE = int(os.environ.get("KADENVERIFY_TIER3_QUEUE_SIZE", "1000"))
+TIER3_WORKERS = int(os.environ.get("KADENVERIFY_TIER3_WORKERS", "4"))
+
 # Load enrichment config
 try:
     config_path = Path(__file__).parent.parent / "config.json"
@@ -42,6 +55,10 @@ except Exception as e:
     APOLLO_API_KEY = None
 
 
+def _expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
 async def verify_email_tiered(
     email: str,
     cache_lookup_fn=None,
@@ -49,6 +66,7 @@ async def verify_email_tiered(
     force_tier: Optional[int] = None,
     helo_domain: str = "verify.kadenwood.com",
     from_address: str = "verify@kadenwood.com",
+    deadline: Optional[float] = None,
 ) -> tuple[VerificationResult, int, str]:
     """Verify email using tiered approach with enrichment."""
     email = email.strip().lower()
@@ -64,19 +82,24 @@ async def verify_email_tiered(
         fast_result = await _tier2_fast(email)
         if fast_result:
             result, confidence = fast_result
-            if confidence >= FAST_TIER_CONFIDENCE or force_tier == 2:
-                if cache_update_fn:
-                    asyncio.create_task(_tier3_background(email, helo_domain, from_address, cache_update_fn))
+            if confidence >= FAST_TIER_CONFIDENCE or force_tier == 2 or _expired(deadline):
+                if cache_update_fn and confidence < 1.0:
+                    await _tier3_background(email, helo_domain, from_address, cache_update_fn)
+                if confidence < FAST_TIER_CONFIDENCE and force_tier != 2:
+                    return result, 2, "deadline_exceeded_fast_validation"
                 return result, 2, f"fast_validation_confidence_{confidence:.2f}"
 
     # Tier 3: Full SMTP Verification
-    result = await full_verify_email(email, helo_domain, from_address)
+    result = await full_verify_email(email, helo_domain, from_address, deadline=deadline)
+
+    if result.error == DEADLINE_PARTIAL:
+        # Hand back what we have; the full run refreshes the cache later
+        if cache_update_fn:
+            await _tier3_background(email, helo_domain, from_address, cache_update_fn)
+        return result, 3, "deadline_exceeded_partial"
 
     # Filter out role accounts completely
-    if result.is_role:
-        result.reachability = Reachability.invalid
-        result.is_deliverable = False
-        result.error = "role account filtered"
+    if _filter_role(result):
         if cache_update_fn:
             cache_update_fn(result)
         return result, 3, "role_account_filtered"
@@ -85,6 +108,7 @@ async def verify_email_tiered(
     needs_enrichment = (
         (result.reachability == Reachability.unknown or result.is_catch_all)
         and ENRICHMENT_ENABLED
+        and not _expired(deadline)
     )
 
     if needs_enrichment:
@@ -120,101 +144,180 @@ async def verify_email_tiered(
             tier_num = 4 if 'tier4' in reason else 5
             return result, tier_num, reason
 
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
-=======
-    
->>>>>>> Stashed changes
+        except Exception as e:
+            logger.error(f"Enrichment failed for {email}: {e}")
+
+    if cache_update_fn:
+        try:
+            cache_update_fn(result)
+        except Exception as e:
+            logger.error(f"Cache update failed: {e}")
+
+    return result, 3, "full_smtp_verification"
+
+
+def _filter_role(result: VerificationResult) -> bool:
+    """Mark a role account undeliverable when FILTER_ROLE_ACCOUNTS is on."""
+    if not (FILTER_ROLE_ACCOUNTS and result.is_role):
+        return False
+    result.reachability = Reachability.invalid
+    result.is_deliverable = False
+    result.error = "role account filtered"
+    return True
+
+
+async def _tier1_cached(email: str, cache_lookup_fn) -> Optional[VerificationResult]:
+    """Tier 1: return a cached result verified within CACHE_TTL_DAYS."""
+    try:
+        cached = cache_lookup_fn(email)
+        if inspect.isawaitable(cached):
+            cached = await cached
+    except Exception as e:
+        logger.error(f"Cache lookup failed for {email}: {e}")
+        return None
+    if cached is None:
+        return None
+
+    verified_at = cached.verified_at
+    if verified_at.tzinfo is None:
+        # DuckDB hands back naive UTC timestamps
+        verified_at = verified_at.replace(tzinfo=timezone.utc)
+    if datetime.now(timezone.utc) - verified_at > timedelta(days=CACHE_TTL_DAYS):
+        return None
+    return cached
+
+
+async def _tier2_fast(email: str) -> Optional[tuple[VerificationResult, float]]:
+    """Tier 2: syntax, metadata and DNS only, with a confidence score.
+
+    Invalid syntax and domains without MX records are definitive
+    (confidence 1.0). Returns None when DNS could not be resolved.
+    """
+    syntax = validate_syntax(email)
+    if not syntax.is_valid:
+        return VerificationResult(
+            email=email,
+            normalized=email,
+            reachability=Reachability.invalid,
+            is_deliverable=False,
+            error=f"syntax: {syntax.reason}",
+        ), 1.0
+
+    meta = classify_metadata(syntax.local_part, syntax.domain)
+    dns_info: DnsInfo = await lookup_mx(syntax.domain)
+    if not dns_info.has_mx and dns_info.error:
+        return None
+    if not dns_info.has_mx:
+        return VerificationResult(
+            email=email,
+            normalized=syntax.normalized,
+            reachability=Reachability.invalid,
+            is_deliverable=False,
+            is_disposable=meta["is_disposable"],
+            is_role=meta["is_role"],
+            is_free=meta["is_free"],
+            provider=dns_info.provider,
+            domain=syntax.domain,
+            error="no MX or A records found",
+        ), 1.0
+
+    confidence = 0.5
+    provider = dns_info.provider
+    if provider in (Provider.gmail, Provider.google_workspace):
+        confidence += 0.3
+    elif provider == Provider.microsoft365:
+        confidence += 0.2
+    elif provider == Provider.yahoo or meta["is_free"]:
+        confidence += 0.1
+    elif provider == Provider.generic:
+        confidence -= 0.1
+    if meta["is_disposable"]:
+        confidence -= 0.2
+    elif not meta["is_role"]:
+        confidence += 0.1
+    confidence = round(min(max(confidence, 0.0), 1.0), 2)
+
+    likely = confidence >= FAST_TIER_CONFIDENCE and not meta["is_disposable"]
+    return VerificationResult(
+        email=email,
+        normalized=syntax.normalized,
+        reachability=Reachability.safe if likely else Reachability.risky,
+        is_deliverable=True if likely else None,
+        is_disposable=meta["is_disposable"],
+        is_role=meta["is_role"],
+        is_free=meta["is_free"],
+        mx_host=dns_info.mx_hosts[0] if dns_info.mx_hosts else "",
+        provider=provider,
+        domain=syntax.domain,
+    ), confidence
+
+
+class Tier3BackgroundScheduler:
+    """Bounded queue of full SMTP verifications run off the request path.
+
+    Jobs are (email, helo_domain, from_address, cache_update_fn) tuples.
+    enqueue() returns False instead of waiting when the queue is full, so a
+    burst of fast-tier answers cannot pile up unbounded work. Workers start
+    on the first enqueue, on the running event loop.
+    """
+
+    def __init__(self, max_queue_size: int = TIER3_QUEUE_SIZE, workers: int = TIER3_WORKERS):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queue_size))
+        self._worker_count = max(0, workers)
+        self._workers: list[asyncio.Task] = []
+        self.dropped = 0
+
+    def _start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self._worker_count)]
+
+    async def enqueue(self, job: tuple[str, str, str, Optional[Callable]]) -> bool:
+        self._start()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Tier 3 background queue full, dropping {job[0]}")
+            return False
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            email, helo_domain, from_address, cache_update_fn = await self._queue.get()
+            try:
+                result = await full_verify_email(email, helo_domain, from_address)
+                _filter_role(result)
+                if cache_update_fn:
+                    cache_update_fn(result)
+            except Exception as e:
+                logger.error(f"Background verification failed for {email}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    async def close(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+_scheduler: Optional[Tier3BackgroundScheduler] = None
+_scheduler_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def background_scheduler() -> Tier3BackgroundScheduler:
+    """The process-wide scheduler, rebuilt when the event loop changes."""
+    global _scheduler, _scheduler_loop
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or _scheduler_loop is not loop:
+        _scheduler = Tier3BackgroundScheduler()
+        _scheduler_loop = loop
+    return _scheduler
+
+
+async def _tier3_background(email: str, helo_domain: str, from_address: str, cache_update_fn) -> bool:
+    """Queue a full SMTP verification whose result goes to the cache."""
+    return await background_scheduler().enqueue((email, helo_domain, from_address, cache_update_fn))
@@ -0,0 +1,202 @@
+"""Per-stage latency histograms for the verification pipeline.
+
+One total latency per request says nothing about where the time went. When
+enabled, the pipeline records how long each stage takes:
+
+  dns           lookup_mx (cache hits included)
+  connect       MX address resolution + TCP dial
+  banner        waiting for the 220 greeting
+  ehlo          EHLO (or HELO fallback)
+  starttls      STARTTLS, the TLS handshake and the second EHLO
+  rcpt          MAIL FROM + RCPT TO transaction on an open session
+  smtp_check    one smtp_check call, pool checkout and retries included
+  catch_all     catch-all probe (standalone or riding with the RCPT)
+  verify        one verify_email call, end to end
+  cache_lookup  result cache read (server)
+  cache_update  result cache write (server)
+  intel_read    domain intel read-through to the intel store
+
+Each stage keeps a quantile sketch (engine.latency.LatencySketch) overall,
+per provider and per MX host where the caller knows them. The snapshot is
+served under "stage_timings" by /metrics. With a trace path every sample is
+also appended to a JSONL file.
+
+Enable with KADENVERIFY_TIMING=true; setting KADENVERIFY_TIMING_TRACE=<path>
+enables it too. When disabled, record() returns at once and span() hands
+back a shared no-op context manager.
+"""
+
+import atexit
+import json
+import os
+import time
+from typing import Optional
+
+from .latency import LatencySketch
+
+TIMING_ENABLED = os.environ.get("KADENVERIFY_TIMING", "false").lower() in ("1", "true", "yes")
+TIMING_TRACE = os.environ.get("KADENVERIFY_TIMING_TRACE", "")
+# MX hosts tracked individually per stage; the rest are folded into "other"
+TIMING_MAX_MX = int(os.environ.get("KADENVERIFY_TIMING_MAX_MX", "500"))
+
+
+def _sketch() -> LatencySketch:
+    # Cache reads finish well under a millisecond
+    return LatencySketch(min_value=0.0001)
+
+
+def _summary(sketch: LatencySketch, count: int, total: float) -> dict:
+    def ms(q: float) -> Optional[float]:
+        value = sketch.quantile(q)
+        return round(value * 1000.0, 2) if value is not None else None
+
+    return {
+        "count": count,
+        "mean_ms": round(total / count * 1000.0, 2) if count else None,
+        "p50_ms": ms(0.50),
+        "p95_ms": ms(0.95),
+        "p99_ms": ms(0.99),
+    }
+
+
+class _Series:
+    __slots__ = ("sketch", "count", "total")
+
+    def __init__(self):
+        self.sketch = _sketch()
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.sketch.add(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self) -> dict:
+        return _summary(self.sketch, self.count, self.total)
+
+
+class _NoopSpan:
+    __slots__ = ()
+    provider = ""
+    mx = ""
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def __setattr__(self, name, value) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    """Times a ``with`` block; provider/mx may be filled in before it exits."""
+
+    __slots__ = ("timings", "stage", "provider", "mx", "started")
+
+    def __init__(self, timings: "StageTimings", stage: str, provider: str, mx: str):
+        self.timings = timings
+        self.stage = stage
+        self.provider = provider
+        self.mx = mx
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.timings.record(self.stage, time.perf_counter() - self.started, self.provider, self.mx)
+
+
+class StageTimings:
+    """Latency sketches per stage, per (stage, provider) and per (stage, MX)."""
+
+    def __init__(
+        self,
+        enabled: bool = TIMING_ENABLED,
+        trace_path: str = TIMING_TRACE,
+        max_mx: int = TIMING_MAX_MX,
+    ):
+        self.enabled = enabled or bool(trace_path)
+        self.trace_path = trace_path
+        self.max_mx = max_mx
+        self._stages: dict[str, _Series] = {}
+        self._providers: dict[tuple[str, str], _Series] = {}
+        self._mx: dict[tuple[str, str], _Series] = {}
+        self._trace = None
+
+    def _series(self, table: dict, key) -> _Series:
+        series = table.get(key)
+        if series is None:
+            series = _Series()
+            table[key] = series
+        return series
+
+    def record(self, stage: str, seconds: float, provider: str = "", mx: str = "") -> None:
+        if not self.enabled:
+            return
+        self._series(self._stages, stage).add(seconds)
+        if provider:
+            self._series(self._providers, (stage, provider)).add(seconds)
+        if mx:
+            mx = mx.lower()
+            key = (stage, mx)
+            if key not in self._mx and len(self._mx) >= self.max_mx:
+                key = (stage, "other")
+            self._series(self._mx, key).add(seconds)
+        if self.trace_path:
+            self._write_trace(stage, seconds, provider, mx)
+
+    def span(self, stage: str, provider: str = "", mx: str = ""):
+        """Context manager recording the duration of its block under ``stage``."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, stage, provider, mx)
+
+    def _write_trace(self, stage: str, seconds: float, provider: str, mx: str) -> None:
+        if self._trace is None:
+            self._trace = open(self.trace_path, "a", buffering=1 << 16)
+        self._trace.write(json.dumps({
+            "ts": round(time.time(), 6),
+            "stage": stage,
+            "ms": round(seconds * 1000.0, 3),
+            "provider": provider,
+            "mx": mx,
+        }) + "\n")
+
+    def close(self) -> None:
+        """Flush and close the trace file, if any."""
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+
+    def reset(self) -> None:
+        self._stages.clear()
+        self._providers.clear()
+        self._mx.clear()
+
+    def snapshot(self, top_mx: int = 20) -> dict:
+        stages: dict[str, dict] = {}
+        for stage, series in sorted(self._stages.items()):
+            entry = series.summary()
+            entry["by_provider"] = {
+                provider: s.summary() for (st, provider), s in sorted(self._providers.items()) if st == stage
+            }
+            busiest = sorted(
+                ((mx, s) for (st, mx), s in self._mx.items() if st == stage),
+                key=lambda item: item[1].count,
+                reverse=True,
+            )[:top_mx]
+            entry["by_mx"] = {mx: s.summary() for mx, s in busiest}
+            stages[stage] = entry
+        return {"enabled": self.enabled, "trace": self.trace_path or None, "stages": stages}
+
+
+# Shared by the whole process
+stage_timings = StageTimings()
+atexit.register(stage_timings.close)
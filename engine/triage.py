@@ -0,0 +1,239 @@
+"""Columnar pre-network triage for large address lists.
+
+verify_email validates syntax, classifies metadata and looks at DNS one
+address at a time, so a multi-million-row import pays Python overhead per
+row before the first SMTP session opens. triage() runs the same checks over
+a whole column with pyarrow.compute:
+
+  - validate_syntax's rules (length limits, one @, local-part characters,
+    dot placement, domain labels, alphabetic TLD) and its normalization
+    (lowercase, googlemail -> gmail, Gmail dots and plus tags)
+  - engine.metadata set membership (disposable, role, free)
+  - a join of the distinct domains against a DNS cache and the shared
+    domain intel (engine.domain_intel), when bound
+
+and returns one row per input with a ``stage``:
+
+  invalid_syntax  settled: verify_email would answer invalid without I/O
+  no_mx           settled: the domain is known to have no MX or A record
+  disposable      disposable domain; callers may skip it before SMTP
+  no_smtp         the domain's provider is never probed over SMTP
+  smtp            needs DNS (when not known yet) and an SMTP probe
+
+settled_results() builds the VerificationResults for settled rows and
+needs_network() returns the rows that still have to go through
+verify_batch. pyarrow is imported lazily; callers treat ImportError as
+"no triage".
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from .domain_intel import shared_domain_intel
+from .metadata import disposable_domains, free_providers, role_prefixes
+from .models import Provider, Reachability, VerificationResult
+from .providers import get_config
+from .syntax import _LOCAL_PART_RE, validate_syntax
+
+STAGE_INVALID_SYNTAX = "invalid_syntax"
+STAGE_NO_MX = "no_mx"
+STAGE_DISPOSABLE = "disposable"
+STAGE_NO_SMTP = "no_smtp"
+STAGE_SMTP = "smtp"
+
+SETTLED_STAGES = (STAGE_INVALID_SYNTAX, STAGE_NO_MX)
+
+# Error recorded on disposable rows that were skipped rather than probed
+DISPOSABLE_SKIPPED = "disposable domain (not probed)"
+
+# validate_syntax's domain rules in one RE2 pattern: labels of 1-63
+# alphanumerics/hyphens without edge hyphens, then an alphabetic TLD
+_LABEL = r"[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?"
+_DOMAIN_RE = rf"^(?:{_LABEL}\.)+[a-zA-Z]{{2,63}}$"
+_ADDRESS_RE = r"(?s)^(?P<local>.*)@(?P<domain>[^@]*)$"
+
+
+@lru_cache(maxsize=None)
+def _value_set(name: str):
+    import pyarrow as pa
+
+    loaders = {"disposable": disposable_domains, "free": free_providers, "role": role_prefixes}
+    return pa.array(sorted(loaders[name]()), type=pa.string())
+
+
+def _as_string_array(emails):
+    import pyarrow as pa
+
+    if isinstance(emails, pa.ChunkedArray):
+        emails = emails.combine_chunks()
+    if not isinstance(emails, pa.Array):
+        emails = pa.array(emails, type=pa.string())
+    elif emails.type != pa.string():
+        emails = emails.cast(pa.string())
+    return emails
+
+
+def _domain_intel(domains: list[str], dns_cache: Optional[dict]) -> tuple[list, list, list]:
+    """has_mx / provider / do_smtp per distinct domain (None when unknown)."""
+    shared = shared_domain_intel()
+    has_mx: list[Optional[bool]] = []
+    providers: list[Optional[str]] = []
+    do_smtp: list[Optional[bool]] = []
+    for domain in domains:
+        dns_info = dns_cache.get(domain) if dns_cache else None
+        if dns_info is None and shared is not None:
+            dns_info = shared.get_dns(domain)
+        if dns_info is None or dns_info.error:
+            has_mx.append(None)
+            providers.append(None)
+            do_smtp.append(None)
+            continue
+        has_mx.append(dns_info.has_mx)
+        providers.append(dns_info.provider.value)
+        do_smtp.append(get_config(dns_info.provider).do_smtp)
+    return has_mx, providers, do_smtp
+
+
+def triage(emails, dns_cache: Optional[dict] = None):
+    """Triage a column of addresses without any network I/O.
+
+    Args:
+        emails: pyarrow string Array/ChunkedArray, NumPy string array or any
+            sequence of str (None counts as empty).
+        dns_cache: Optional {domain: DnsInfo} checked before the shared
+            domain intel.
+
+    Returns:
+        pyarrow.Table with columns index, email, normalized, local_part,
+        domain, is_disposable, is_role, is_free, has_mx
+        (null when unknown), provider (null when unknown) and stage.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    raw = pc.fill_null(_as_string_array(emails), "")
+    stripped = pc.utf8_trim_whitespace(raw)
+
+    parts = pc.extract_regex(stripped, _ADDRESS_RE)
+    local = pc.fill_null(pc.utf8_trim_whitespace(pc.struct_field(parts, "local")), "")
+    domain = pc.fill_null(pc.utf8_lower(pc.utf8_trim_whitespace(pc.struct_field(parts, "domain"))), "")
+    domain = pc.if_else(pc.equal(domain, "googlemail.com"), "gmail.com", domain)
+
+    local_len = pc.utf8_length(local)
+    domain_len = pc.utf8_length(domain)
+    syntax_ok = pc.and_(
+        pc.and_(
+            pc.less_equal(pc.utf8_length(stripped), 254),
+            pc.equal(pc.count_substring(stripped, "@"), 1),
+        ),
+        pc.and_(
+            pc.and_(pc.greater(local_len, 0), pc.less_equal(local_len, 64)),
+            pc.and_(pc.greater(domain_len, 0), pc.less_equal(domain_len, 255)),
+        ),
+    )
+    syntax_ok = pc.and_(syntax_ok, pc.invert(pc.match_substring(local, "..")))
+    syntax_ok = pc.and_(syntax_ok, pc.match_substring_regex(local, _LOCAL_PART_RE.pattern))
+    syntax_ok = pc.and_(syntax_ok, pc.match_substring_regex(domain, _DOMAIN_RE))
+
+    gmail_local = pc.replace_substring_regex(
+        pc.replace_substring(local, ".", ""), r"(?s)\+.*", ""
+    )
+    normalized_local = pc.utf8_lower(pc.if_else(pc.equal(domain, "gmail.com"), gmail_local, local))
+    normalized = pc.if_else(
+        syntax_ok,
+        pc.binary_join_element_wise(normalized_local, domain, "@"),
+        pc.utf8_lower(stripped),
+    )
+
+    base = pc.fill_null(
+        pc.struct_field(pc.extract_regex(domain, r"(?P<base>[^.]+\.[^.]+)$"), "base"), ""
+    )
+
+    def _member(values, name: str):
+        return pc.is_in(values, value_set=_value_set(name))
+
+    is_disposable = pc.and_(syntax_ok, pc.or_(_member(domain, "disposable"), _member(base, "disposable")))
+    is_free = pc.and_(syntax_ok, pc.or_(_member(domain, "free"), _member(base, "free")))
+    is_role = pc.and_(syntax_ok, _member(pc.utf8_lower(local), "role"))
+
+    # Join the distinct valid domains against the DNS cache / domain intel
+    unique_domains = pc.unique(pc.filter(domain, syntax_ok))
+    has_mx_u, provider_u, do_smtp_u = _domain_intel(unique_domains.to_pylist(), dns_cache)
+    positions = pc.index_in(domain, value_set=unique_domains)
+    has_mx = pc.if_else(syntax_ok, pc.take(pa.array(has_mx_u, type=pa.bool_()), positions), None)
+    provider = pc.if_else(syntax_ok, pc.take(pa.array(provider_u, type=pa.string()), positions), None)
+    do_smtp = pc.fill_null(pc.take(pa.array(do_smtp_u, type=pa.bool_()), positions), True)
+
+    stage = pc.if_else(do_smtp, STAGE_SMTP, STAGE_NO_SMTP)
+    stage = pc.if_else(is_disposable, STAGE_DISPOSABLE, stage)
+    stage = pc.if_else(pc.fill_null(pc.equal(has_mx, False), False), STAGE_NO_MX, stage)
+    stage = pc.if_else(syntax_ok, stage, STAGE_INVALID_SYNTAX)
+
+    return pa.table({
+        "index": pa.array(range(len(raw)), type=pa.int64()),
+        "email": raw,
+        "normalized": normalized,
+        "local_part": pc.if_else(syntax_ok, local, ""),
+        "domain": pc.if_else(syntax_ok, domain, ""),
+        "is_disposable": is_disposable,
+        "is_role": is_role,
+        "is_free": is_free,
+        "has_mx": has_mx,
+        "provider": provider,
+        "stage": stage,
+    })
+
+
+def _skipped_stages(skip_disposable: bool) -> list[str]:
+    return list(SETTLED_STAGES) + ([STAGE_DISPOSABLE] if skip_disposable else [])
+
+
+def needs_network(table, skip_disposable: bool = False):
+    """Rows of a triage table that still have to go through verify_batch."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    skipped = pa.array(_skipped_stages(skip_disposable), type=pa.string())
+    return table.filter(pc.invert(pc.is_in(table["stage"], value_set=skipped)))
+
+
+def settled_results(table, skip_disposable: bool = False) -> list[tuple[int, VerificationResult]]:
+    """(index, result) for every row triage can answer without the network.
+
+    Invalid-syntax and no-MX rows get the result verify_email would return.
+    With ``skip_disposable``, disposable rows are reported as risky and not
+    probed.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    skipped = pa.array(_skipped_stages(skip_disposable), type=pa.string())
+    rows = table.filter(pc.is_in(table["stage"], value_set=skipped)).to_pylist()
+    results: list[tuple[int, VerificationResult]] = []
+    for row in rows:
+        email = row["email"]
+        if row["stage"] == STAGE_INVALID_SYNTAX:
+            result = VerificationResult(
+                email=email,
+                normalized=email.strip().lower(),
+                reachability=Reachability.invalid,
+                is_deliverable=False,
+                # The scalar validator names the rule that failed
+                error=f"syntax: {validate_syntax(email).reason}",
+            )
+        else:
+            no_mx = row["stage"] == STAGE_NO_MX
+            result = VerificationResult(
+                email=email,
+                normalized=row["normalized"],
+                reachability=Reachability.invalid if no_mx else Reachability.risky,
+                is_deliverable=False if no_mx else None,
+                is_disposable=row["is_disposable"],
+                is_role=row["is_role"],
+                is_free=row["is_free"],
+                provider=Provider(row["provider"]) if row["provider"] else Provider.generic,
+                domain=row["domain"],
+                error="no MX or A records found" if no_mx else DISPOSABLE_SKIPPED,
+            )
+        results.append((row["index"], result))
+    return results
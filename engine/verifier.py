@@ -5,7 +5,10 @@ Pipeline: syntax -> metadata -> DNS -> provider_route -> SMTP -> score
 
 import asyncio
 import logging
-from typing import Optional
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
 
 from .models import (
     DnsInfo,
@@ -17,14 +20,47 @@ from .models import (
 from .syntax import validate_syntax
 from .metadata import classify as classify_metadata
 from .dns import lookup_mx
+from .bulk_dns import resolve_domains
+from .domain_intel import prefetch_domain_intel, shared_domain_intel
 from .providers import get_config
-from .smtp import smtp_check, check_catch_all
+from .errors import parse_smtp_response
+from .greylist import RetryScheduler
+from .domain_queue import DomainWorkQueue, KeyLimiter
+from .singleflight import SingleFlight
+from .timing import stage_timings
+from .smtp import (
+    DEADLINE_EXCEEDED,
+    GREYLIST_DELAY,
+    GREYLIST_RETRIES,
+    smtp_check,
+    smtp_check_batch,
+    check_catch_all,
+    is_unreachable,
+    mx_candidates,
+    smtp_check_with_catch_all,
+    with_mx_failover,
+    catch_all_verdict,
+    random_address,
+    rcpt_limit_for,
+)
 
 logger = logging.getLogger("kadenverify.verifier")
 
 # Default concurrency for batch operations
 DEFAULT_CONCURRENCY = 5
 
+# verify_stream: addresses per verify_batch chunk, and addresses whose
+# results may be in flight or waiting to be consumed at any time
+STREAM_CHUNK_SIZE = 1000
+STREAM_WINDOW = 5000
+
+# VerificationResult.error when the caller's deadline cut the SMTP stage
+# short; the verdict is the best one reached so far
+DEADLINE_PARTIAL = "deadline exceeded (partial result)"
+
+# Collapses concurrent DNS lookups and catch-all probes for the same domain
+_domain_flights = SingleFlight()
+
 
 def _score(
     smtp_result: Optional[SmtpResponse],
@@ -60,6 +96,10 @@ def _score(
     if smtp_result.code == 0:
         return Reachability.unknown, None
 
+    # Recipient limit -- the mailbox was never actually checked
+    if smtp_result.is_rcpt_limit:
+        return Reachability.unknown, None
+
     # Invalid mailbox (5xx with invalid pattern)
     if smtp_result.is_invalid:
         return Reachability.invalid, False
@@ -104,12 +144,23 @@ def _score(
     return Reachability.unknown, None
 
 
+def _is_greylisted(result: VerificationResult) -> bool:
+    """Whether a result's SMTP reply was a greylisting deferral."""
+    if not 400 <= result.smtp_code < 500:
+        return False
+    return parse_smtp_response(result.smtp_code, result.smtp_message).is_greylisted
+
+
 async def verify_email(
     email: str,
     helo_domain: str = "verify.kadenwood.com",
     from_address: str = "verify@kadenwood.com",
     dns_cache: Optional[dict] = None,
     catch_all_cache: Optional[dict] = None,
+    smtp_cache: Optional[dict] = None,
+    greylist_retries: Optional[int] = None,
+    deadline: Optional[float] = None,
+    mx_cache: Optional[dict] = None,
 ) -> VerificationResult:
     """Verify a single email address through the full pipeline.
 
@@ -119,10 +170,46 @@ async def verify_email(
         from_address: Address to use in MAIL FROM command.
         dns_cache: Optional dict to cache DNS results by domain.
         catch_all_cache: Optional dict to cache catch-all results by domain.
+        smtp_cache: Optional dict of RCPT results already collected by the
+            batch planner, keyed by normalized address.
+        greylist_retries: In-call greylist retries for the SMTP probes
+            (None uses GREYLIST_RETRIES, 0 returns the greylisted reply).
+        deadline: Optional time.monotonic() value bounding the SMTP stage.
+            When it passes, greylist retries and the catch-all check are
+            skipped or cut short and the result so far is returned with
+            ``error`` set to DEADLINE_PARTIAL.
+        mx_cache: Optional dict of the MX host the batch planner sent each
+            domain's addresses to; results taken from ``smtp_cache`` report it.
 
     Returns:
         VerificationResult with all verification data.
     """
+    started = time.perf_counter()
+    result = await _verify_email(
+        email, helo_domain, from_address, dns_cache, catch_all_cache, smtp_cache, greylist_retries,
+        deadline, mx_cache,
+    )
+    stage_timings.record(
+        "verify",
+        time.perf_counter() - started,
+        result.provider.value if result.domain else "",
+        result.mx_host,
+    )
+    return result
+
+
+async def _verify_email(
+    email: str,
+    helo_domain: str,
+    from_address: str,
+    dns_cache: Optional[dict],
+    catch_all_cache: Optional[dict],
+    smtp_cache: Optional[dict],
+    greylist_retries: Optional[int],
+    deadline: Optional[float],
+    mx_cache: Optional[dict] = None,
+) -> VerificationResult:
+    """verify_email's pipeline, without the stage timing."""
     # Step 1: Syntax validation
     syntax = validate_syntax(email)
     if not syntax.is_valid:
@@ -141,14 +228,35 @@ async def verify_email(
     # Step 2: Metadata classification
     meta = classify_metadata(local_part, domain)
 
-    # Step 3: DNS lookup (with optional cache)
+    # Step 3: DNS lookup (with optional cache, then the shared domain intel)
+    shared = shared_domain_intel()
+    if shared is not None:
+        await prefetch_domain_intel([domain])
     if dns_cache is not None and domain in dns_cache:
         dns_info = dns_cache[domain]
     else:
-        dns_info = await lookup_mx(domain)
-        if dns_cache is not None:
+        dns_info = shared.get_dns(domain) if shared is not None else None
+        if dns_info is None:
+            dns_info = await _domain_flights.do(("dns", domain), lambda: lookup_mx(domain))
+            if shared is not None and not dns_info.error:
+                shared.set_dns(domain, dns_info)
+        if dns_cache is not None and not dns_info.error:
             dns_cache[domain] = dns_info
 
+    if not dns_info.has_mx and dns_info.error:
+        # The lookup failed; that says nothing about the domain's mail setup
+        return VerificationResult(
+            email=email,
+            normalized=normalized,
+            reachability=Reachability.unknown,
+            is_deliverable=None,
+            is_disposable=meta["is_disposable"],
+            is_role=meta["is_role"],
+            is_free=meta["is_free"],
+            domain=domain,
+            error=f"dns: {dns_info.error}",
+        )
+
     if not dns_info.has_mx:
         return VerificationResult(
             email=email,
@@ -163,7 +271,7 @@ async def verify_email(
             error="no MX or A records found",
         )
 
-    mx_host = dns_info.mx_hosts[0]
+    mx_host = mx_candidates(dns_info.mx_hosts)[0]
     provider = dns_info.provider
 
     # Step 4: Provider-specific routing
@@ -171,29 +279,114 @@ async def verify_email(
 
     smtp_result: Optional[SmtpResponse] = None
     is_catch_all: Optional[bool] = None
+    partial = False
+
+    def _expired() -> bool:
+        return deadline is not None and time.monotonic() >= deadline
+
+    def _failed_over(response: SmtpResponse) -> bool:
+        # Past the deadline the other MX hosts would fail the same way
+        return is_unreachable(response) and response.message != DEADLINE_EXCEEDED
+
+    def _catch_all_flight(probe):
+        # A probe cut short by this caller's deadline must not hand its
+        # missing verdict to callers sharing the flight
+        return probe() if deadline is not None else _domain_flights.do(catch_all_key, probe)
 
-    # Step 5: SMTP handshake (if provider config allows)
+    # Step 5: SMTP handshake (if provider config allows). Probes fail over
+    # to the domain's other MX hosts when one does not answer.
     if config.do_smtp:
-        smtp_result = await smtp_check(
-            email=normalized,
-            mx_host=mx_host,
-            helo_domain=helo_domain,
-            from_address=from_address,
-        )
+        catch_all_key = ("catch_all", domain)
+        if shared is not None and (catch_all_cache is None or domain not in catch_all_cache):
+            if shared.has_catch_all(domain):
+                catch_all_cache = {} if catch_all_cache is None else catch_all_cache
+                catch_all_cache[domain] = shared.get_catch_all(domain)
+        catch_all_known = catch_all_cache is not None and domain in catch_all_cache
+        probed_catch_all = False
+        if smtp_cache is not None and normalized in smtp_cache:
+            smtp_result = smtp_cache[normalized]
+            if mx_cache is not None:
+                mx_host = mx_cache.get(domain, mx_host)
+        elif config.do_catch_all and not catch_all_known and not _domain_flights.pending(catch_all_key):
+            # Cold domain: the catch-all probe rides in the same transaction.
+            # Concurrent checks on the domain wait for this probe's verdict.
+            combined: dict[str, SmtpResponse] = {}
+
+            async def _combined_probe() -> Optional[bool]:
+                with stage_timings.span("catch_all", provider.value) as span:
+                    used_mx, (combined["result"], verdict) = await with_mx_failover(
+                        dns_info.mx_hosts,
+                        lambda mx: smtp_check_with_catch_all(
+                            email=normalized,
+                            mx_host=mx,
+                            helo_domain=helo_domain,
+                            from_address=from_address,
+                            greylist_retries=greylist_retries,
+                            deadline=deadline,
+                        ),
+                        lambda pair: _failed_over(pair[0]),
+                    )
+                    span.mx = used_mx
+                combined["mx_host"] = used_mx
+                return verdict
+
+            is_catch_all = await _catch_all_flight(_combined_probe)
+            smtp_result = combined["result"]
+            mx_host = combined["mx_host"]
+            probed_catch_all = True
+        else:
+            mx_host, smtp_result = await with_mx_failover(
+                dns_info.mx_hosts,
+                lambda mx: smtp_check(
+                    email=normalized,
+                    mx_host=mx,
+                    helo_domain=helo_domain,
+                    from_address=from_address,
+                    greylist_retries=greylist_retries,
+                    deadline=deadline,
+                ),
+                _failed_over,
+            )
+
+        # Greylisted under a deadline: the in-call retry was skipped or the
+        # time budget ran out before it could settle
+        if deadline is not None and (
+            smtp_result.message == DEADLINE_EXCEEDED or smtp_result.is_greylisted
+        ):
+            partial = True
 
         # Step 6: Catch-all check (if provider config allows and SMTP succeeded)
         if config.do_catch_all and smtp_result.code >= 200:
-            if catch_all_cache is not None and domain in catch_all_cache:
+            if probed_catch_all:
+                if is_catch_all is None and _expired():
+                    partial = True
+                elif catch_all_cache is not None and is_catch_all is not None:
+                    catch_all_cache[domain] = is_catch_all
+            elif catch_all_cache is not None and domain in catch_all_cache:
                 is_catch_all = catch_all_cache[domain]
+            elif _expired():
+                partial = True
             else:
-                is_catch_all = await check_catch_all(
-                    domain=domain,
-                    mx_host=mx_host,
-                    helo_domain=helo_domain,
-                    from_address=from_address,
+                is_catch_all = await _catch_all_flight(
+                    lambda: check_catch_all(
+                        domain=domain,
+                        mx_host=mx_host,
+                        helo_domain=helo_domain,
+                        from_address=from_address,
+                        greylist_retries=greylist_retries,
+                        deadline=deadline,
+                    ),
                 )
-                if catch_all_cache is not None:
-                    catch_all_cache[domain] = is_catch_all
+                if is_catch_all is None and _expired():
+                    partial = True
+                else:
+                    probed_catch_all = True
+                    if catch_all_cache is not None:
+                        catch_all_cache[domain] = is_catch_all
+            if probed_catch_all and shared is not None and is_catch_all is not None:
+                shared.set_catch_all(domain, is_catch_all)
+        else:
+            is_catch_all = None
 
     # Step 7: Score
     reachability, is_deliverable = _score(
@@ -204,6 +397,9 @@ async def verify_email(
         provider=provider,
         provider_mark_risky=config.mark_risky,
     )
+    if partial and is_catch_all is None and config.do_catch_all and reachability == Reachability.safe:
+        # Accepted, but the catch-all check never ran
+        reachability, is_deliverable = Reachability.risky, None
 
     return VerificationResult(
         email=email,
@@ -219,9 +415,72 @@ async def verify_email(
         smtp_message=smtp_result.message if smtp_result else "",
         provider=provider,
         domain=domain,
+        error=DEADLINE_PARTIAL if partial else None,
     )
 
 
+def _dedupe_key(email: str) -> str:
+    """Mailbox identity used to collapse duplicate batch entries."""
+    syntax = validate_syntax(email)
+    return syntax.normalized if syntax.is_valid else email.strip().lower()
+
+
+def _plan_mx_sessions(
+    emails: list[str],
+    dns_cache: dict[str, DnsInfo],
+    catch_all_probes: Optional[dict[str, str]] = None,
+    skip_catch_all: Optional[set[str]] = None,
+    planned_mx: Optional[dict[str, str]] = None,
+) -> list[tuple[str, list[str]]]:
+    """Group SMTP-checkable addresses by MX host and pack them into sessions.
+
+    Many unrelated domains share one MX (aspmx.l.google.com,
+    *.mail.protection.outlook.com), so grouping by MX rather than domain lets
+    one session carry recipients for all of them. Each domain is grouped under
+    its best MX by health (mx_candidates), and each group is split into
+    chunks of at most rcpt_limit_for(mx_host) recipients.
+
+    When ``catch_all_probes`` is given, one random-local-part address is
+    planned right after the first address of every domain whose provider
+    wants a catch-all check, and recorded there as {probe_address: domain}.
+    Domains in ``skip_catch_all`` (verdict already known) get no probe.
+    When ``planned_mx`` is given, each planned domain's MX is recorded there.
+
+    Returns a list of (mx_host, normalized_emails) sessions.
+    """
+    groups: dict[str, list[str]] = defaultdict(list)
+    seen: set[str] = set()
+    probed: set[str] = set(skip_catch_all or ())
+    domain_mx = planned_mx if planned_mx is not None else {}
+    for email in emails:
+        syntax = validate_syntax(email)
+        if not syntax.is_valid or syntax.normalized in seen:
+            continue
+        dns_info = dns_cache.get(syntax.domain)
+        if dns_info is None or not dns_info.has_mx:
+            continue
+        config = get_config(dns_info.provider)
+        if not config.do_smtp:
+            continue
+        seen.add(syntax.normalized)
+        if syntax.domain not in domain_mx:
+            domain_mx[syntax.domain] = mx_candidates(dns_info.mx_hosts)[0].lower()
+        group = groups[domain_mx[syntax.domain]]
+        group.append(syntax.normalized)
+        if catch_all_probes is not None and config.do_catch_all and syntax.domain not in probed:
+            probed.add(syntax.domain)
+            probe = random_address(syntax.domain)
+            catch_all_probes[probe] = syntax.domain
+            group.append(probe)
+
+    plan: list[tuple[str, list[str]]] = []
+    for mx_host, group in groups.items():
+        size = rcpt_limit_for(mx_host)
+        for i in range(0, len(group), size):
+            plan.append((mx_host, group[i:i + size]))
+    return plan
+
+
 async def verify_batch(
     emails: list[str],
     concurrency: int = DEFAULT_CONCURRENCY,
@@ -229,11 +488,28 @@ async def verify_batch(
     helo_domain: str = "verify.kadenwood.com",
     from_address: str = "verify@kadenwood.com",
     progress_callback=None,
+    dns_progress_callback=None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    domain_limiter: Optional[KeyLimiter] = None,
 ) -> list[VerificationResult]:
     """Verify a batch of emails with domain-first optimization.
 
-    Groups emails by domain to reuse DNS and catch-all results.
-    Uses a semaphore to limit concurrent SMTP connections.
+    Groups emails by domain to reuse DNS and catch-all results, then probes
+    every SMTP-checkable address in multi-RCPT sessions grouped by MX host
+    before scoring each email. Each domain's catch-all probe rides in the
+    same sessions, and its verdict is cached for the rest of the batch. Addresses whose session result is
+    inconclusive (connection failure, recipient limit) fall back to a
+    per-email smtp_check. Scoring runs on a fixed pool of ``concurrency``
+    workers fed from per-domain queues (see engine.domain_queue), at most
+    ``domain_concurrency`` per domain.
+
+    Greylisted addresses are not retried in place: they go to a deferred
+    retry queue and are re-verified once GREYLIST_DELAY has passed, up to
+    GREYLIST_RETRIES times, so waiting on them never holds a concurrency
+    slot. The batch returns after the last retry has finished.
+
+    Entries that normalize to the same mailbox are verified once and each
+    gets a copy of the result carrying its own ``email``.
 
     Args:
         emails: List of email addresses to verify.
@@ -241,78 +517,191 @@ async def verify_batch(
         domain_concurrency: Max concurrent checks per domain.
         helo_domain: Domain for EHLO command.
         from_address: Address for MAIL FROM.
-        progress_callback: Optional callable(result) called after each verification.
+        progress_callback: Optional callable(result) called once per email
+            with its final result.
+        dns_progress_callback: Optional callable(done, total) called as the
+            batch's domains are resolved.
+        semaphore: Optional semaphore shared with other batches running at
+            the same time; replaces the per-batch ``concurrency`` limit.
+        domain_limiter: Optional KeyLimiter shared with other batches running
+            at the same time, so ``domain_concurrency`` caps each domain
+            across all of them rather than per batch.
 
     Returns:
         List of VerificationResult in same order as input.
     """
-    semaphore = asyncio.Semaphore(concurrency)
+    semaphore = semaphore or asyncio.Semaphore(concurrency)
     dns_cache: dict[str, DnsInfo] = {}
     catch_all_cache: dict[str, Optional[bool]] = {}
+    smtp_cache: dict[str, SmtpResponse] = {}
 
-    # Pre-warm DNS cache: resolve all unique domains in parallel
+    # Pre-warm DNS cache through the bulk resolver (bounded and rate limited;
+    # lookups that still fail come back with DnsInfo.error and score unknown).
+    # Domains the shared domain intel already knows skip DNS and, when their
+    # catch-all verdict is known too, the catch-all probe.
     unique_domains = {email.split("@")[-1].lower() for email in emails if "@" in email}
-    logger.info(f"Pre-warming DNS cache for {len(unique_domains)} unique domains...")
-
-    async def _resolve_domain(domain: str):
-        dns_cache[domain] = await lookup_mx(domain)
-
-    await asyncio.gather(*[_resolve_domain(d) for d in unique_domains], return_exceptions=True)
-
-    # Domain-level limiter to prevent overloading single MX host while avoiding
-    # strict per-domain serialization that can cause batch timeouts.
-    domain_semaphores: dict[str, asyncio.Semaphore] = {}
-
-    async def _verify_with_limit(email: str) -> VerificationResult:
-        # Extract domain for domain-level locking
+    shared = shared_domain_intel()
+    if shared is not None:
+        await prefetch_domain_intel(unique_domains)
+        for domain in unique_domains:
+            known = shared.get_dns(domain)
+            if known is not None:
+                dns_cache[domain] = known
+            if shared.has_catch_all(domain):
+                catch_all_cache[domain] = shared.get_catch_all(domain)
+    unresolved = unique_domains - dns_cache.keys()
+    logger.info(
+        f"Pre-warming DNS cache for {len(unresolved)} of {len(unique_domains)} unique domains..."
+    )
+    resolved = await resolve_domains(unresolved, dns_progress_callback)
+    dns_cache.update(resolved)
+    if shared is not None:
+        for domain, dns_info in resolved.items():
+            if not dns_info.error:
+                shared.set_dns(domain, dns_info)
+    known_catch_all = set(catch_all_cache)
+
+    # Probe addresses in multi-RCPT sessions grouped by MX host
+    catch_all_probes: dict[str, str] = {}
+    mx_cache: dict[str, str] = {}
+    plan = _plan_mx_sessions(emails, dns_cache, catch_all_probes, skip_catch_all=known_catch_all,
+                             planned_mx=mx_cache)
+    logger.info(f"Planned {len(plan)} SMTP sessions across {len({mx for mx, _ in plan})} MX hosts")
+
+    async def _run_session(mx_host: str, recipients: list[str]):
+        try:
+            async with semaphore:
+                responses = await smtp_check_batch(
+                    recipients,
+                    mx_host,
+                    helo_domain=helo_domain,
+                    from_address=from_address,
+                    fallback_individual=False,
+                )
+            for email, response in zip(recipients, responses):
+                if email in catch_all_probes:
+                    verdict = catch_all_verdict(response)
+                    if verdict is not None:
+                        catch_all_cache[catch_all_probes[email]] = verdict
+                    continue
+                # Greylisted replies are kept: they count as the first attempt and
+                # send the address straight to the deferred retry queue.
+                if response.code != 0 and not response.is_rcpt_limit:
+                    smtp_cache[email] = response
+        except Exception as e:
+            # Its addresses are checked one by one below
+            logger.warning(f"Planned session of {len(recipients)} recipients failed on {mx_host}: {e}")
+
+    await asyncio.gather(*[_run_session(mx, rcpts) for mx, rcpts in plan])
+
+    # Entries that normalize to the same mailbox (case, whitespace, Gmail
+    # dots and plus tags, repeated rows) are verified once; the result is
+    # copied back to every duplicate with its own ``email``.
+    first_index: dict[str, int] = {}
+    duplicates: dict[int, list[int]] = defaultdict(list)
+    for idx, email in enumerate(emails):
+        key = _dedupe_key(email)
+        if key in first_index:
+            duplicates[first_index[key]].append(idx)
+        else:
+            first_index[key] = idx
+    if duplicates:
+        logger.info(f"Verifying {len(first_index)} unique mailboxes for {len(emails)} entries")
+
+    # A fixed pool of workers pulls addresses from per-domain queues in
+    # round-robin order; a domain already at domain_concurrency checks drops
+    # out of rotation, so slots go to domains that can take work right away.
+    ordered_results: list[Optional[VerificationResult]] = [None] * len(emails)
+
+    def _domain_key(email: str) -> str:
         parts = email.strip().split("@")
-        domain = parts[-1].lower() if len(parts) == 2 else ""
-
-        # Get or create per-domain semaphore
-        if domain not in domain_semaphores:
-            domain_semaphores[domain] = asyncio.Semaphore(max(1, domain_concurrency))
+        return parts[-1].lower() if len(parts) == 2 else ""
+
+    async def _verify_one(item: tuple[int, str, int]) -> None:
+        idx, email, attempt = item
+        domain = _domain_key(email)
+
+        # Other batches' checks on this domain count too (verify_stream)
+        domain_slot = domain_limiter.hold(domain) if domain_limiter is not None else nullcontext()
+        async with domain_slot, semaphore:
+            try:
+                result = await verify_email(
+                    email=email,
+                    helo_domain=helo_domain,
+                    from_address=from_address,
+                    dns_cache=dns_cache,
+                    catch_all_cache=catch_all_cache,
+                    smtp_cache=smtp_cache,
+                    greylist_retries=0,
+                    mx_cache=mx_cache,
+                )
+            except Exception as e:
+                logger.error(f"Batch verification failed for {email}: {e}")
+                result = VerificationResult(
+                    email=email,
+                    normalized=email.strip().lower(),
+                    reachability=Reachability.unknown,
+                    is_deliverable=None,
+                    domain=domain,
+                    error="internal verification error",
+                )
 
-        async with semaphore:
-            async with domain_semaphores[domain]:
-                try:
-                    result = await verify_email(
-                        email=email,
-                        helo_domain=helo_domain,
-                        from_address=from_address,
-                        dns_cache=dns_cache,
-                        catch_all_cache=catch_all_cache,
-                    )
-                except Exception as e:
-                    logger.error(f"Batch verification failed for {email}: {e}")
-                    result = VerificationResult(
-                        email=email,
-                        normalized=email.strip().lower(),
-                        reachability=Reachability.unknown,
-                        is_deliverable=None,
-                        domain=domain,
-                        error="internal verification error",
-                    )
-                if progress_callback:
-                    progress_callback(result)
-                return result
-
-    # Sort emails by domain for better cache utilization
-    indexed_emails = list(enumerate(emails))
-    indexed_emails.sort(key=lambda x: x[1].split("@")[-1] if "@" in x[1] else "")
-
-    # Run all verifications. Use return_exceptions to ensure one task crash
-    # does not fail the entire batch request.
-    tasks = [_verify_with_limit(email) for _, email in indexed_emails]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Restore original order
-    ordered_results = [None] * len(emails)
-    for (orig_idx, email), result in zip(indexed_emails, results):
-        if isinstance(result, BaseException):
-            logger.error(f"Batch task crashed for {email}: {result}")
+        # Greylisted: keep the provisional result and retry once the delay
+        # has passed, without holding a worker or a slot in the meantime.
+        ordered_results[idx] = result
+        if attempt < GREYLIST_RETRIES and _is_greylisted(result):
+            logger.info(f"Greylisted {email} (attempt {attempt + 1}), deferring retry by {GREYLIST_DELAY}s")
+            retries.defer((idx, email, attempt + 1), GREYLIST_DELAY)
+            return
+        for dup in duplicates.get(idx, ()):
+            ordered_results[dup] = result.model_copy(update={"email": emails[dup]})
+        if progress_callback:
+            progress_callback(result)
+            for dup in duplicates.get(idx, ()):
+                progress_callback(ordered_results[dup])
+
+    work = DomainWorkQueue(_verify_one, workers=min(concurrency, max(1, len(emails))),
+                           per_key_limit=domain_concurrency)
+
+    async def _retry(item: tuple[int, str, int]) -> None:
+        idx, email, attempt = item
+        # Drop greylisted answers cached by the planner or the catch-all probe
+        smtp_cache.pop(ordered_results[idx].normalized, None)
+        domain = ordered_results[idx].domain
+        if domain and catch_all_cache.get(domain, False) is None:
+            del catch_all_cache[domain]
+        await work.put(_domain_key(email), item)
+
+    retries = RetryScheduler(_retry)
+
+    async with work:
+        for idx in first_index.values():
+            work.put(_domain_key(emails[idx]), (idx, emails[idx], 0))
+        await work.join()
+
+        # The batch only finishes once every deferred greylist retry has run
+        if retries.pending:
+            logger.info(f"Waiting on {retries.pending} deferred greylist retries")
+        await retries.join()
+
+    if shared is not None:
+        for domain, verdict in catch_all_cache.items():
+            if verdict is not None and domain not in known_catch_all:
+                shared.set_catch_all(domain, verdict)
+
+    # Duplicates of an address whose retry never settled share its last result
+    for idx, dups in duplicates.items():
+        if ordered_results[idx] is not None:
+            for dup in dups:
+                if ordered_results[dup] is None:
+                    ordered_results[dup] = ordered_results[idx].model_copy(update={"email": emails[dup]})
+
+    for idx, email in enumerate(emails):
+        if ordered_results[idx] is None:
+            logger.error(f"Batch task crashed for {email}")
             parts = email.strip().split("@")
             domain = parts[-1].lower() if len(parts) == 2 else ""
-            result = VerificationResult(
+            ordered_results[idx] = VerificationResult(
                 email=email,
                 normalized=email.strip().lower(),
                 reachability=Reachability.unknown,
@@ -320,6 +709,134 @@ async def verify_batch(
                 domain=domain,
                 error="internal verification task error",
             )
-        ordered_results[orig_idx] = result
 
     return ordered_results
+
+
+async def _aiter_emails(emails: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if hasattr(emails, "__aiter__"):
+        async for email in emails:
+            yield email
+    else:
+        for email in emails:
+            yield email
+
+
+async def verify_stream(
+    emails: Union[Iterable[str], AsyncIterable[str]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    domain_concurrency: int = 2,
+    helo_domain: str = "verify.kadenwood.com",
+    from_address: str = "verify@kadenwood.com",
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    window: int = STREAM_WINDOW,
+) -> AsyncIterator[tuple[int, VerificationResult]]:
+    """Verify an (async) iterable of emails, yielding (index, result) as results complete.
+
+    The input is read lazily and cut into chunks of ``chunk_size`` that are
+    each run through verify_batch (MX-grouped sessions, catch-all sharing,
+    deferred greylist retries). At most ``window`` addresses are in flight or
+    waiting to be consumed: a new chunk starts only once the consumer has
+    taken every result of an earlier one, so memory stays flat however long
+    the input is. All chunks share one ``concurrency`` limit and one
+    per-domain ``domain_concurrency`` limit.
+
+    Results come in completion order; ``index`` is the address's position in
+    the input.
+    """
+    chunk_size = max(1, chunk_size)
+    semaphore = asyncio.Semaphore(concurrency)
+    domain_limiter = KeyLimiter(domain_concurrency)
+    slots = asyncio.Semaphore(max(1, window // chunk_size))
+    queue: asyncio.Queue = asyncio.Queue()
+    outstanding: dict[int, int] = {}
+    tasks: set[asyncio.Task] = set()
+    end = object()
+
+    async def _run_chunk(chunk_id: int, start: int, chunk: list[str]) -> None:
+        pending: dict[str, deque] = defaultdict(deque)
+        for offset, email in enumerate(chunk):
+            pending[email].append(start + offset)
+
+        def _on_result(result: VerificationResult) -> None:
+            indices = pending.get(result.email)
+            if indices:
+                queue.put_nowait((chunk_id, indices.popleft(), result))
+
+        try:
+            results = await verify_batch(
+                chunk,
+                concurrency=concurrency,
+                domain_concurrency=domain_concurrency,
+                helo_domain=helo_domain,
+                from_address=from_address,
+                progress_callback=_on_result,
+                semaphore=semaphore,
+                domain_limiter=domain_limiter,
+            )
+        except Exception as e:
+            logger.error(f"Stream chunk at {start} failed: {e}")
+            results = [
+                VerificationResult(
+                    email=email,
+                    normalized=email.strip().lower(),
+                    reachability=Reachability.unknown,
+                    is_deliverable=None,
+                    error="internal batch error",
+                )
+                for email in chunk
+            ]
+        # Results the batch did not report through the callback (crashed tasks)
+        for indices in pending.values():
+            while indices:
+                idx = indices.popleft()
+                queue.put_nowait((chunk_id, idx, results[idx - start]))
+
+    async def _feed() -> None:
+        try:
+            chunk: list[str] = []
+            start = 0
+            chunk_id = 0
+
+            async def _launch() -> None:
+                nonlocal chunk, start, chunk_id
+                await slots.acquire()
+                outstanding[chunk_id] = len(chunk)
+                task = asyncio.ensure_future(_run_chunk(chunk_id, start, chunk))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                start += len(chunk)
+                chunk_id += 1
+                chunk = []
+
+            async for email in _aiter_emails(emails):
+                chunk.append(email)
+                if len(chunk) >= chunk_size:
+                    await _launch()
+            if chunk:
+                await _launch()
+        except Exception as e:
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(end)
+
+    feeder = asyncio.ensure_future(_feed())
+    fed = False
+    try:
+        while not fed or outstanding:
+            item = await queue.get()
+            if item is end:
+                fed = True
+                continue
+            if isinstance(item, Exception):
+                raise item
+            chunk_id, idx, result = item
+            outstanding[chunk_id] -= 1
+            if not outstanding[chunk_id]:
+                del outstanding[chunk_id]
+                slots.release()
+            yield idx, result
+    finally:
+        feeder.cancel()
+        for task in list(tasks):
+            task.cancel()
@@ -4,6 +4,7 @@ Endpoints:
   GET  /verify?email=...          Single email verification
   POST /verify                    Single email verification (JSON body)
   POST /verify/batch              Batch verification (JSON array)
+  POST /verify/stream             Streaming verification (email lines in, NDJSON out)
   POST /find-email/batch          Batch email discovery for contacts
   GET  /v1/validate/{email}       OmniVerifier-compatible (investor-outreach)
   POST /v1/verify                 OmniVerifier-compatible (kadenwood-ui)
@@ -15,21 +16,32 @@ Endpoints:
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import os
 import sys
+import tempfile
 import time
 from pathlib import Path
 from typing import Optional
 
 from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Ensure project root on path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from engine.bulk_dns import bulk_dns_stats
+from engine.dns import dns_cache_stats
+from engine.domain_intel import shared_domain_intel
+from engine.errors import classifier_cache_info
 from engine.models import Reachability, VerificationResult
-from engine.verifier import verify_batch, verify_email
+from engine.singleflight import SingleFlight
+from engine.timing import stage_timings
+from engine.smtp import get_session_pool, mx_health, mx_latency
+from engine.verifier import DEADLINE_PARTIAL, verify_batch, verify_email, verify_stream
 
 _TIERED_IMPORT_ERROR: Optional[str] = None
 try:
@@ -55,7 +67,11 @@ FROM_ADDRESS = os.environ.get("KADENVERIFY_FROM_ADDRESS", "verify@kadenwood.com"
 CONCURRENCY = int(os.environ.get("KADENVERIFY_CONCURRENCY", "5"))
 DOMAIN_CONCURRENCY = int(os.environ.get("KADENVERIFY_DOMAIN_CONCURRENCY", "2"))
 MAX_BATCH_SIZE = 1000
-ENABLE_TIERED = os.environ.get("KADENVERIFY_TIERED", "true").lower() == "true"
+# Off by default: tier 2 answers Gmail/Workspace/M365 addresses from DNS and
+# metadata alone, without SMTP, so turning it on changes verdicts
+ENABLE_TIERED = os.environ.get("KADENVERIFY_TIERED", "false").lower() == "true"
+# Default time budget for single verifications; 0 waits for the full result
+VERIFY_DEADLINE_MS = int(os.environ.get("KADENVERIFY_VERIFY_DEADLINE_MS", "0"))
 CACHE_BACKEND = os.environ.get("KADENVERIFY_CACHE_BACKEND", "duckdb").lower()
 RATE_LIMIT_BACKEND = os.environ.get("KADENVERIFY_RATE_LIMIT_BACKEND", "memory").lower()
 
@@ -70,6 +86,7 @@ app = FastAPI(
 _cache_db = None
 _cache_update_count = 0
 _supabase_client = None
+_intel_store = None
 
 
 def _get_cache_db():
@@ -123,6 +140,27 @@ def _get_supabase_client():
     return _supabase_client
 
 
+def _get_intel_store():
+    """Open the shared intel store once and attach it to the engine (MX and domain intel)."""
+    global _intel_store
+    if _intel_store is None:
+        try:
+            from engine.domain_intel import bind_domain_intel
+            from engine.smtp import mx_capabilities, rcpt_limits
+            from store.cache import DomainCache
+            from store.intel_store import bind_mx_capabilities, bind_rcpt_limits, intel_store_from_env
+
+            _intel_store = intel_store_from_env() or False
+            if _intel_store:
+                bind_rcpt_limits(rcpt_limits, _intel_store)
+                bind_mx_capabilities(mx_capabilities, _intel_store)
+                bind_domain_intel(DomainCache(backend=_intel_store))
+        except Exception as e:
+            logger.error(f"Failed to initialize intel store: {e}")
+            _intel_store = False
+    return _intel_store or None
+
+
 def _cache_lookup_duckdb(email: str) -> Optional[VerificationResult]:
     db = _get_cache_db()
     if not db:
@@ -156,6 +194,11 @@ def _cache_lookup_duckdb(email: str) -> Optional[VerificationResult]:
 
 async def _cache_lookup(email: str) -> Optional[VerificationResult]:
     """Look up cached verification result from configured backend."""
+    with stage_timings.span("cache_lookup"):
+        return _cache_lookup_backend(email)
+
+
+def _cache_lookup_backend(email: str) -> Optional[VerificationResult]:
     try:
         if CACHE_BACKEND == "none":
             _metrics["cache"]["misses"] += 1
@@ -183,6 +226,11 @@ async def _cache_lookup(email: str) -> Optional[VerificationResult]:
 
 def _cache_update(result: VerificationResult):
     """Write a verification result to the configured cache backend."""
+    with stage_timings.span("cache_update"):
+        _cache_update_backend(result)
+
+
+def _cache_update_backend(result: VerificationResult):
     global _cache_update_count
     try:
         if CACHE_BACKEND == "none":
@@ -372,7 +420,41 @@ class FindBatchRequest(BaseModel):
     contacts: list[FindContactRequest]
 
 
-async def _verify_single_email(email: str) -> dict:
+def _request_deadline(request: Request) -> Optional[float]:
+    """Deadline (time.monotonic()) from ?deadline_ms= or X-Request-Deadline-Ms.
+
+    Both give the caller's time budget in milliseconds from now. Without
+    either, KADENVERIFY_VERIFY_DEADLINE_MS applies; 0 means no deadline.
+    """
+    raw = request.query_params.get("deadline_ms") or request.headers.get("X-Request-Deadline-Ms")
+    budget_ms = VERIFY_DEADLINE_MS
+    if raw:
+        try:
+            budget_ms = float(raw)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="deadline_ms must be a number of milliseconds")
+    if budget_ms <= 0:
+        return None
+    return time.monotonic() + budget_ms / 1000.0
+
+
+_verify_flights = SingleFlight()
+
+
+async def _verify_single_email(email: str, deadline: Optional[float] = None) -> dict:
+    """Verify one address; identical concurrent requests share one verification.
+
+    Requests with a deadline run on their own, so a short budget never cuts
+    short the answer other callers are waiting on.
+    """
+    if deadline is not None:
+        return await _run_single_verification(email, deadline)
+    response = await _verify_flights.do(email.strip(), lambda: _run_single_verification(email))
+    return dict(response)
+
+
+async def _run_single_verification(email: str, deadline: Optional[float] = None) -> dict:
+    _get_intel_store()
     if ENABLE_TIERED and verify_email_tiered is not None:
         started = time.perf_counter()
         result, tier, reason = await verify_email_tiered(
@@ -381,6 +463,7 @@ async def _verify_single_email(email: str) -> dict:
             cache_update_fn=_cache_update,
             helo_domain=HELO_DOMAIN,
             from_address=FROM_ADDRESS,
+            deadline=deadline,
         )
         _record_tier_latency((time.perf_counter() - started) * 1000.0)
         response = result.to_omniverifier()
@@ -395,20 +478,54 @@ async def _verify_single_email(email: str) -> dict:
         email=email,
         helo_domain=HELO_DOMAIN,
         from_address=FROM_ADDRESS,
+        deadline=deadline,
     )
+    if result.error == DEADLINE_PARTIAL:
+        _finish_in_background(email)
     return result.to_omniverifier()
 
 
+# Full verifications behind deadline-cut answers on the non-tiered path
+_background_verifications: set[asyncio.Task] = set()
+
+
+def _finish_in_background(email: str) -> None:
+    """Run the full verification of ``email`` off the request and cache it."""
+
+    async def _run() -> None:
+        try:
+            result = await verify_email(email=email, helo_domain=HELO_DOMAIN, from_address=FROM_ADDRESS)
+            _cache_update(result)
+        except Exception as e:
+            logger.error(f"Background verification failed for {email}: {e}")
+
+    task = asyncio.create_task(_run())
+    _background_verifications.add(task)
+    task.add_done_callback(_background_verifications.discard)
+
+
 # --- Endpoints ---
 
 @app.get("/verify", dependencies=[Depends(verify_api_key), Depends(check_rate_limit)])
-async def verify_single(email: str = Query(..., description="Email address to verify")):
-    return await _verify_single_email(email)
+async def verify_single(
+    email: str = Query(..., description="Email address to verify"),
+    deadline: Optional[float] = Depends(_request_deadline),
+):
+    """Verify one address.
+
+    With ``deadline_ms`` (or an X-Request-Deadline-Ms header), the best
+    result reached within the budget is returned and the rest of the
+    verification finishes in the background to fill the cache.
+    """
+    return await _verify_single_email(email, deadline)
 
 
 @app.post("/verify", dependencies=[Depends(verify_api_key), Depends(check_rate_limit)])
-async def verify_single_post(request: SingleVerifyRequest):
-    return await _verify_single_email(request.email)
+async def verify_single_post(
+    request: SingleVerifyRequest,
+    deadline: Optional[float] = Depends(_request_deadline),
+):
+    return await _verify_single_email(request.email, deadline)
 
 
 @app.post("/verify/batch", dependencies=[Depends(verify_api_key), Depends(check_rate_limit)])
@@ -421,6 +538,7 @@ async def verify_batch_endpoint(request: BatchRequest):
     if not request.emails:
         return []
 
+    _get_intel_store()
     try:
         results = await verify_batch(
             emails=request.emails,
@@ -445,6 +563,49 @@ async def verify_batch_endpoint(request: BatchRequest):
     return [r.to_omniverifier() for r in results]
 
 
+async def _spool_request_body(request: Request):
+    """Copy the request body to a spooled temp file (kept in memory up to 1 MB).
+
+    The body has to be read before a streaming response starts: once it has,
+    Starlette listens on the same channel for client disconnects.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def _spooled_lines(spool):
+    """Yield the non-empty lines of a spooled body, then close it."""
+    with spool:
+        for line in spool:
+            line = line.strip()
+            if line:
+                yield line.decode("utf-8", errors="replace")
+
+
+@app.post("/verify/stream", dependencies=[Depends(verify_api_key), Depends(check_rate_limit)])
+async def verify_stream_endpoint(request: Request):
+    """Verify one email per body line; each result is sent as one NDJSON line
+    (with its input ``index``) as soon as it completes. No batch size limit:
+    the body is spooled to disk and read back lazily, so memory stays flat."""
+    _get_intel_store()
+    spool = await _spool_request_body(request)
+
+    async def results():
+        async for idx, result in verify_stream(
+            _spooled_lines(spool),
+            concurrency=CONCURRENCY,
+            domain_concurrency=DOMAIN_CONCURRENCY,
+            helo_domain=HELO_DOMAIN,
+            from_address=FROM_ADDRESS,
+        ):
+            yield json.dumps({"index": idx, **result.to_omniverifier()}) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @app.post("/find-email/batch", dependencies=[Depends(verify_api_key), Depends(check_rate_limit)])
 async def find_email_batch_endpoint(request: FindBatchRequest):
     if find_emails_batch is None:
@@ -470,6 +631,7 @@ async def find_email_batch_endpoint(request: FindBatchRequest):
         for c in request.contacts
     ]
 
+    _get_intel_store()
     try:
         finder_results = await find_emails_batch(
             contacts=contacts,
@@ -532,16 +694,19 @@ async def omni_credits():
 
 
 @app.get("/v1/validate/{email}", dependencies=[Depends(verify_api_key_compat), Depends(check_rate_limit)])
-async def omni_validate_get(email: str):
-    result = await _verify_single_email(email)
+async def omni_validate_get(email: str, deadline: Optional[float] = Depends(_request_deadline)):
+    result = await _verify_single_email(email, deadline)
     result.pop("_kadenverify_tier", None)
     result.pop("_kadenverify_reason", None)
     return result
 
 
 @app.post("/v1/verify", dependencies=[Depends(verify_api_key_compat), Depends(check_rate_limit)])
-async def omni_verify_post(request: SingleVerifyRequest):
-    result = await _verify_single_email(request.email)
+async def omni_verify_post(
+    request: SingleVerifyRequest,
+    deadline: Optional[float] = Depends(_request_deadline),
+):
+    result = await _verify_single_email(request.email, deadline)
     result.pop("_kadenverify_tier", None)
     result.pop("_kadenverify_reason", None)
     return result
@@ -591,6 +756,7 @@ async def stats_endpoint():
 @app.get("/metrics", dependencies=[Depends(verify_api_key)])
 async def metrics_endpoint():
     cache_readiness = await _readiness_check_cache()
+    pool = get_session_pool()
     return {
         "tier_latency_ms": _tier_latency_summary(),
         "cache": {
@@ -600,4 +766,15 @@ async def metrics_endpoint():
             "ready": cache_readiness.get("ok", False),
         },
         "rate_limited_429": _metrics["rate_limited_429"],
+        "singleflight_shared": _verify_flights.shared,
+        "smtp_pool": pool.stats(),
+        "mx_concurrency": pool.concurrency.snapshot(),
+        "mx_latency": mx_latency.snapshot(),
+        "mx_health": mx_health.snapshot(),
+        "source_ips": pool.sources.snapshot(),
+        "reply_classifier": classifier_cache_info(),
+        "dns_cache": dns_cache_stats(),
+        "dns_bulk": bulk_dns_stats(),
+        "domain_intel": shared_domain_intel().stats() if shared_domain_intel() is not None else {},
+        "stage_timings": stage_timings.snapshot(),
     }
@@ -17,8 +17,8 @@ else
     export KADENVERIFY_CONCURRENCY="5"
 fi
 
-# Enable tiered verification
-export KADENVERIFY_TIERED="true"
+# Tiered verification is opt-in (KADENVERIFY_TIERED=true)
+export KADENVERIFY_TIERED="${KADENVERIFY_TIERED:-false}"
 
 echo "Starting KadenVerify API Server..."
 echo "URL: http://localhost:8000"
@@ -2,19 +2,36 @@
 
 Caches MX records (24hr TTL) and catch-all status (7-day TTL) to avoid
 repeated lookups when processing batches of emails at the same domain.
+
+With a ``backend`` (store.intel_store.IntelStore) the cache reads through to
+its domain_intel table on a miss and writes every new result to it, so
+results survive restarts and are shared by every process using the store.
+Async callers prefetch() a batch's domains first so those reads happen in one
+query off the event loop.
 """
 
+import asyncio
+import logging
 import time
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Iterable, Optional
 
 from engine.models import DnsInfo, Provider
+from engine.timing import stage_timings
 
+logger = logging.getLogger("kadenverify.cache")
 
 # TTLs in seconds
 MX_TTL = 86400       # 24 hours
 CATCH_ALL_TTL = 604800  # 7 days
 
+# How often a domain may be re-read from the backend (other processes may
+# have stored results for it since)
+BACKEND_REFRESH = 60.0
+
+# Domains kept in memory; the oldest are dropped first (the backend keeps them)
+MAX_DOMAINS = 100_000
+
 
 @dataclass
 class DomainCacheEntry:
@@ -25,6 +42,8 @@ class DomainCacheEntry:
     is_catch_all: Optional[bool] = None
     catch_all_cached_at: float = 0.0
 
+    backend_read_at: float = 0.0
+
 
 class DomainCache:
     """In-memory domain-level cache with TTL expiration.
@@ -32,21 +51,98 @@ class DomainCache:
     Thread-safe for asyncio (single-threaded event loop).
     """
 
-    def __init__(self, mx_ttl: float = MX_TTL, catch_all_ttl: float = CATCH_ALL_TTL):
+    def __init__(
+        self,
+        mx_ttl: float = MX_TTL,
+        catch_all_ttl: float = CATCH_ALL_TTL,
+        backend=None,
+        backend_refresh: float = BACKEND_REFRESH,
+        max_domains: int = MAX_DOMAINS,
+    ):
         self._entries: dict[str, DomainCacheEntry] = {}
         self._mx_ttl = mx_ttl
         self._catch_all_ttl = catch_all_ttl
+        self._backend = backend
+        self._backend_refresh = backend_refresh
+        self._max_domains = max(1, max_domains)
+        self.backend_reads = 0
+        self.backend_hits = 0
 
     def _get_or_create(self, domain: str) -> DomainCacheEntry:
         domain = domain.lower()
         if domain not in self._entries:
             self._entries[domain] = DomainCacheEntry()
+            if len(self._entries) > self._max_domains:
+                del self._entries[next(iter(self._entries))]
         return self._entries[domain]
 
+    def _needs_backend_read(self, domain: str, now: float) -> bool:
+        entry = self._entries.get(domain)
+        return entry is None or now - entry.backend_read_at >= self._backend_refresh
+
+    def _apply_row(self, domain: str, row: Optional[dict], now: float) -> DomainCacheEntry:
+        entry = self._get_or_create(domain)
+        entry.backend_read_at = now
+        if row is None:
+            return entry
+        self.backend_hits += 1
+        if row["mx_hosts"] is not None and row["dns_checked_at"] > entry.dns_cached_at:
+            mx_hosts = list(row["mx_hosts"])
+            try:
+                provider = Provider(row["provider"])
+            except ValueError:
+                provider = Provider.generic
+            entry.dns_info = DnsInfo(mx_hosts=mx_hosts, has_mx=bool(mx_hosts), provider=provider, domain=domain)
+            entry.dns_cached_at = row["dns_checked_at"]
+        if row["catch_all_checked_at"] > entry.catch_all_cached_at:
+            entry.is_catch_all = row["is_catch_all"]
+            entry.catch_all_cached_at = row["catch_all_checked_at"]
+        return entry
+
+    def _read_through(self, domain: str) -> Optional[DomainCacheEntry]:
+        """Fill the entry for ``domain`` from the backend (rate limited per domain)."""
+        if self._backend is None:
+            return self._entries.get(domain)
+        now = time.time()
+        if not self._needs_backend_read(domain, now):
+            return self._entries[domain]
+        self.backend_reads += 1
+        try:
+            with stage_timings.span("intel_read"):
+                row = self._backend.load_domain(domain)
+        except Exception as e:
+            logger.warning(f"Could not read domain intel for {domain}: {e}")
+            row = None
+        return self._apply_row(domain, row, now)
+
+    async def prefetch(self, domains: Iterable[str]) -> None:
+        """Read ``domains`` from the backend in one query on a worker thread.
+
+        Async callers run this first so the getters below are served from
+        memory instead of blocking the event loop on SQLite per domain.
+        """
+        if self._backend is None:
+            return
+        now = time.time()
+        wanted = sorted({d.lower() for d in domains if self._needs_backend_read(d.lower(), now)})
+        if not wanted:
+            return
+        self.backend_reads += len(wanted)
+        try:
+            with stage_timings.span("intel_read"):
+                rows = await asyncio.to_thread(self._backend.load_domains, wanted)
+        except Exception as e:
+            logger.warning(f"Could not read domain intel for {len(wanted)} domains: {e}")
+            return
+        for domain in wanted:
+            self._apply_row(domain, rows.get(domain), now)
+
     def get_dns(self, domain: str) -> Optional[DnsInfo]:
         """Get cached DNS info if not expired."""
         domain = domain.lower()
         entry = self._entries.get(domain)
+        if entry is None or entry.dns_info is None:
+            entry = self._read_through(domain)
         if entry is None or entry.dns_info is None:
             return None
         if time.time() - entry.dns_cached_at > self._mx_ttl:
@@ -55,10 +151,17 @@ class DomainCache:
         return entry.dns_info
 
     def set_dns(self, domain: str, dns_info: DnsInfo) -> None:
-        """Cache DNS info for a domain."""
+        """Cache DNS info for a domain (failed lookups are not cached)."""
+        if dns_info.error:
+            return
         entry = self._get_or_create(domain)
         entry.dns_info = dns_info
         entry.dns_cached_at = time.time()
+        if self._backend is not None:
+            try:
+                self._backend.save_domain_dns(domain, dns_info.mx_hosts, dns_info.provider.value)
+            except Exception as e:
+                logger.warning(f"Could not persist DNS intel for {domain}: {e}")
 
     def get_catch_all(self, domain: str) -> Optional[bool]:
         """Get cached catch-all status if not expired.
@@ -68,6 +171,8 @@ class DomainCache:
         """
         domain = domain.lower()
         entry = self._entries.get(domain)
+        if entry is None or entry.catch_all_cached_at == 0.0:
+            entry = self._read_through(domain)
         if entry is None or entry.catch_all_cached_at == 0.0:
             return None
         if time.time() - entry.catch_all_cached_at > self._catch_all_ttl:
@@ -79,15 +184,25 @@ class DomainCache:
         """Check if catch-all status is cached and not expired."""
         domain = domain.lower()
         entry = self._entries.get(domain)
+        if entry is None or entry.catch_all_cached_at == 0.0:
+            entry = self._read_through(domain)
         if entry is None or entry.catch_all_cached_at == 0.0:
             return False
         return time.time() - entry.catch_all_cached_at <= self._catch_all_ttl
 
     def set_catch_all(self, domain: str, is_catch_all: Optional[bool]) -> None:
-        """Cache catch-all status for a domain."""
+        """Cache catch-all status for a domain.
+
+        Indeterminate (None) verdicts are kept in memory only.
+        """
         entry = self._get_or_create(domain)
         entry.is_catch_all = is_catch_all
         entry.catch_all_cached_at = time.time()
+        if self._backend is not None and is_catch_all is not None:
+            try:
+                self._backend.save_domain_catch_all(domain, is_catch_all)
+            except Exception as e:
+                logger.warning(f"Could not persist catch-all intel for {domain}: {e}")
 
     def stats(self) -> dict:
         """Return cache statistics."""
@@ -112,6 +227,8 @@ class DomainCache:
             "dns_cached": dns_valid,
             "catch_all_cached": catch_all_valid,
             "catch_all_domains": catch_all_true,
+            "backend_reads": self.backend_reads,
+            "backend_hits": self.backend_hits,
         }
 
     def clear(self) -> None:
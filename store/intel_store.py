@@ -0,0 +1,257 @@
+"""SQLite store for SMTP intelligence learned about MX hosts and domains.
+
+Holds facts that are expensive to rediscover and worth sharing between the
+API server, the CLI and batch workers: how many RCPT TO a host accepts per
+transaction, each MX host's ESMTP capabilities, and per domain its MX hosts,
+provider and catch-all verdict. SQLite in WAL mode is used instead of DuckDB
+because several processes need to read and write it at the same time.
+
+Saves are called from the event loop for every learned fact, so they only
+queue the statement; a writer thread with its own connection applies
+whatever has queued up in one transaction. flush() waits for the queue to
+drain and close() flushes before closing (also registered with atexit).
+Domain reads are blocking too; store.cache.DomainCache runs them in a worker
+thread, one bulk query per batch of domains.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("kadenverify.intel_store")
+
+DEFAULT_INTEL_DB = Path(__file__).parent.parent / "intel.sqlite"
+
+# Learned limits older than this are ignored on load so hosts get re-probed
+RCPT_LIMIT_MAX_AGE = 30 * 86400
+
+# Capabilities older than this are ignored on load
+MX_CAPABILITY_MAX_AGE = 7 * 86400
+
+# Most queued writes committed in one transaction
+WRITE_BATCH_SIZE = 500
+
+# Most domains looked up in one SELECT (SQLite caps bound parameters)
+READ_BATCH_SIZE = 500
+
+_CREATE_TABLES_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS mx_rcpt_limits (
+        mx_host TEXT PRIMARY KEY,
+        max_rcpt INTEGER NOT NULL,
+        observed_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS mx_capabilities (
+        mx_host TEXT PRIMARY KEY,
+        features TEXT NOT NULL,
+        requires_tls INTEGER NOT NULL,
+        observed_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS domain_intel (
+        domain TEXT PRIMARY KEY,
+        mx_hosts TEXT,
+        provider TEXT,
+        dns_checked_at REAL,
+        is_catch_all INTEGER,
+        catch_all_checked_at REAL
+    )
+    """,
+]
+
+
+class IntelStore:
+    """Wrapper around the intel SQLite database: synchronous reads, queued writes."""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or DEFAULT_INTEL_DB)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for sql in _CREATE_TABLES_SQL:
+            self._conn.execute(sql)
+        self._conn.commit()
+        self._read_lock = threading.Lock()
+        self._writes: queue.Queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="intel-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _write(self, sql: str, params: list) -> None:
+        if self._closed:
+            raise sqlite3.ProgrammingError(f"Intel store {self.db_path} is closed")
+        self._writes.put((sql, params))
+
+    def _write_loop(self) -> None:
+        conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            stop = False
+            while not stop:
+                batch = [self._writes.get()]
+                while len(batch) < WRITE_BATCH_SIZE:
+                    try:
+                        batch.append(self._writes.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = None in batch
+                statements = [write for write in batch if write is not None]
+                try:
+                    for sql, params in statements:
+                        conn.execute(sql, params)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    conn.rollback()
+                    logger.warning(f"Could not persist {len(statements)} intel writes to {self.db_path}: {e}")
+                finally:
+                    for _ in batch:
+                        self._writes.task_done()
+        finally:
+            conn.close()
+
+    def flush(self) -> None:
+        """Block until every queued write is committed."""
+        self._writes.join()
+
+    def load_rcpt_limits(self, max_age: float = RCPT_LIMIT_MAX_AGE) -> dict[str, int]:
+        with self._read_lock:
+            rows = self._conn.execute(
+                "SELECT mx_host, max_rcpt FROM mx_rcpt_limits WHERE observed_at >= ?",
+                [time.time() - max_age],
+            ).fetchall()
+        return {mx_host: max_rcpt for mx_host, max_rcpt in rows}
+
+    def save_rcpt_limit(self, mx_host: str, max_rcpt: int) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO mx_rcpt_limits (mx_host, max_rcpt, observed_at) VALUES (?, ?, ?)",
+            [mx_host.lower(), int(max_rcpt), time.time()],
+        )
+
+    def load_mx_capabilities(
+        self, max_age: float = MX_CAPABILITY_MAX_AGE
+    ) -> dict[str, tuple[set[str], bool, float]]:
+        with self._read_lock:
+            rows = self._conn.execute(
+                "SELECT mx_host, features, requires_tls, observed_at FROM mx_capabilities WHERE observed_at >= ?",
+                [time.time() - max_age],
+            ).fetchall()
+        return {
+            mx_host: (set(json.loads(features)), bool(requires_tls), observed_at)
+            for mx_host, features, requires_tls, observed_at in rows
+        }
+
+    def save_mx_capabilities(self, mx_host: str, features: set[str], requires_tls: bool) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO mx_capabilities (mx_host, features, requires_tls, observed_at) "
+            "VALUES (?, ?, ?, ?)",
+            [mx_host.lower(), json.dumps(sorted(features)), int(requires_tls), time.time()],
+        )
+
+    def load_domain(self, domain: str) -> Optional[dict]:
+        """The stored row for ``domain`` as a dict, or None."""
+        return self.load_domains([domain]).get(domain.lower())
+
+    def load_domains(self, domains: list[str]) -> dict[str, dict]:
+        """Stored rows for ``domains`` keyed by lowercased domain; unknown domains are left out."""
+        wanted = sorted({domain.lower() for domain in domains})
+        rows = []
+        with self._read_lock:
+            for start in range(0, len(wanted), READ_BATCH_SIZE):
+                chunk = wanted[start:start + READ_BATCH_SIZE]
+                rows += self._conn.execute(
+                    "SELECT domain, mx_hosts, provider, dns_checked_at, is_catch_all, catch_all_checked_at "
+                    f"FROM domain_intel WHERE domain IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+        return {
+            domain: {
+                "mx_hosts": json.loads(mx_hosts) if mx_hosts is not None else None,
+                "provider": provider,
+                "dns_checked_at": dns_checked_at or 0.0,
+                "is_catch_all": None if is_catch_all is None else bool(is_catch_all),
+                "catch_all_checked_at": catch_all_checked_at or 0.0,
+            }
+            for domain, mx_hosts, provider, dns_checked_at, is_catch_all, catch_all_checked_at in rows
+        }
+
+    def save_domain_dns(self, domain: str, mx_hosts: list[str], provider: str) -> None:
+        self._write(
+            "INSERT INTO domain_intel (domain, mx_hosts, provider, dns_checked_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(domain) DO UPDATE SET mx_hosts = excluded.mx_hosts, "
+            "provider = excluded.provider, dns_checked_at = excluded.dns_checked_at",
+            [domain.lower(), json.dumps(mx_hosts), provider, time.time()],
+        )
+
+    def save_domain_catch_all(self, domain: str, is_catch_all: bool) -> None:
+        self._write(
+            "INSERT INTO domain_intel (domain, is_catch_all, catch_all_checked_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(domain) DO UPDATE SET is_catch_all = excluded.is_catch_all, "
+            "catch_all_checked_at = excluded.catch_all_checked_at",
+            [domain.lower(), int(is_catch_all), time.time()],
+        )
+
+    def close(self) -> None:
+        """Commit queued writes, stop the writer thread and close the store."""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer.join()
+        self._conn.close()
+        atexit.unregister(self.close)
+
+
+def bind_rcpt_limits(table, store: IntelStore) -> None:
+    """Seed an engine RcptLimitTable from the store and persist new observations."""
+    try:
+        table.load(store.load_rcpt_limits())
+    except sqlite3.Error as e:
+        logger.warning(f"Could not load RCPT limits from {store.db_path}: {e}")
+
+    def _persist(mx_host: str, max_rcpt: int) -> None:
+        try:
+            store.save_rcpt_limit(mx_host, max_rcpt)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist RCPT limit for {mx_host}: {e}")
+
+    table.subscribe(_persist)
+
+
+def bind_mx_capabilities(cache, store: IntelStore) -> None:
+    """Seed an engine MxCapabilityCache from the store and persist changes."""
+    try:
+        cache.load(store.load_mx_capabilities())
+    except sqlite3.Error as e:
+        logger.warning(f"Could not load MX capabilities from {store.db_path}: {e}")
+
+    def _persist(mx_host: str, entry) -> None:
+        try:
+            store.save_mx_capabilities(mx_host, entry.features, entry.requires_tls)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist capabilities for {mx_host}: {e}")
+
+    cache.subscribe(_persist)
+
+
+def intel_store_from_env() -> Optional[IntelStore]:
+    """Open the store at KADENVERIFY_INTEL_DB (default intel.sqlite); "none" disables it."""
+    raw = os.environ.get("KADENVERIFY_INTEL_DB", "").strip()
+    if raw.lower() == "none":
+        return None
+    try:
+        return IntelStore(Path(raw) if raw else None)
+    except sqlite3.Error as e:
+        logger.error(f"Failed to open intel store: {e}")
+        return None
@@ -1,7 +1,12 @@
+import json
+import time
+
+import pytest
 from fastapi.testclient import TestClient
 
 import server
 from engine.models import Provider, Reachability, VerificationResult
+from engine.verifier import DEADLINE_PARTIAL
 
 
 def _stub_result(email: str, reachability: Reachability = Reachability.safe) -> VerificationResult:
@@ -16,12 +21,20 @@ def _stub_result(email: str, reachability: Reachability = Reachability.safe) ->
     )
 
 
+@pytest.fixture(autouse=True)
+def _no_intel_store(monkeypatch):
+    # Keep the shared intel store (and the domain intel bound with it) out of
+    # these tests so nothing leaks into the engine tests that follow.
+    monkeypatch.setattr(server, "_intel_store", False)
+
+
 def test_auth_header_compatibility(monkeypatch) -> None:
     async def fake_verify_email_tiered(**kwargs):
         return _stub_result(kwargs["email"]), 1, "cached_result"
 
     monkeypatch.setattr(server, "API_KEY", "test-secret")
     monkeypatch.setattr(server, "verify_email_tiered", fake_verify_email_tiered)
+    monkeypatch.setattr(server, "ENABLE_TIERED", True)
     server._rate_limit_store.clear()
 
     client = TestClient(server.app)
@@ -44,6 +57,7 @@ def test_rate_limit_returns_429(monkeypatch) -> None:
 
     monkeypatch.setattr(server, "API_KEY", "test-secret")
     monkeypatch.setattr(server, "verify_email_tiered", fake_verify_email_tiered)
+    monkeypatch.setattr(server, "ENABLE_TIERED", True)
     monkeypatch.setattr(server, "RATE_LIMIT_BACKEND", "memory")
     monkeypatch.setattr(server, "RATE_LIMIT_MAX", 1)
     server._rate_limit_store.clear()
@@ -55,6 +69,72 @@ def test_rate_limit_returns_429(monkeypatch) -> None:
     assert client.get("/verify", params={"email": "two@example.com"}, headers=headers).status_code == 429
 
 
+def test_request_deadline_reaches_tiered_verifier(monkeypatch) -> None:
+    seen: list = []
+
+    async def fake_verify_email_tiered(**kwargs):
+        seen.append(kwargs["deadline"])
+        return _stub_result(kwargs["email"]), 3, "deadline_exceeded_partial"
+
+    monkeypatch.setattr(server, "API_KEY", "test-secret")
+    monkeypatch.setattr(server, "verify_email_tiered", fake_verify_email_tiered)
+    monkeypatch.setattr(server, "ENABLE_TIERED", True)
+    monkeypatch.setattr(server, "RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(server, "RATE_LIMIT_MAX", 100)
+    server._rate_limit_store.clear()
+
+    client = TestClient(server.app)
+    headers = {"X-API-Key": "test-secret"}
+
+    before = time.monotonic()
+    response = client.get("/verify", params={"email": "a@example.com", "deadline_ms": "2000"}, headers=headers)
+    assert response.json()["_kadenverify_reason"] == "deadline_exceeded_partial"
+    client.post("/v1/verify", json={"email": "b@example.com"}, headers={**headers, "X-Request-Deadline-Ms": "500"})
+    client.get("/verify", params={"email": "c@example.com"}, headers=headers)
+
+    assert before + 1.5 < seen[0] <= time.monotonic() + 2
+    assert seen[1] is not None and seen[1] < seen[0]
+    assert seen[2] is None
+    bad = client.get("/verify", params={"email": "d@example.com", "deadline_ms": "soon"}, headers=headers)
+    assert bad.status_code == 400
+
+
+def test_deadline_cut_verify_fills_cache_in_background_without_tiers(monkeypatch) -> None:
+    calls: list = []
+    cached: list[VerificationResult] = []
+
+    async def fake_verify_email(email: str, deadline=None, **kwargs):
+        calls.append(deadline)
+        result = _stub_result(email, Reachability.risky if deadline is not None else Reachability.safe)
+        if deadline is not None:
+            result.error = DEADLINE_PARTIAL
+        return result
+
+    monkeypatch.setattr(server, "API_KEY", "test-secret")
+    monkeypatch.setattr(server, "ENABLE_TIERED", False)
+    monkeypatch.setattr(server, "verify_email", fake_verify_email)
+    monkeypatch.setattr(server, "_cache_update", cached.append)
+    monkeypatch.setattr(server, "RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(server, "RATE_LIMIT_MAX", 100)
+    server._rate_limit_store.clear()
+
+    with TestClient(server.app) as client:
+        response = client.get(
+            "/verify",
+            params={"email": "slow@example.com", "deadline_ms": "1000"},
+            headers={"X-API-Key": "test-secret"},
+        )
+        for _ in range(100):
+            if cached:
+                break
+            time.sleep(0.01)
+
+    assert response.json()["reason"] == DEADLINE_PARTIAL
+    # The full run has no deadline and its result reaches the cache
+    assert calls[0] is not None and calls[1] is None
+    assert [r.reachability for r in cached] == [Reachability.safe]
+
+
 def test_verify_batch_partial_failure_shape(monkeypatch) -> None:
     async def fake_verify_batch(**kwargs):
         emails = kwargs["emails"]
@@ -82,6 +162,36 @@ def test_verify_batch_partial_failure_shape(monkeypatch) -> None:
     assert body[1]["reason"] == "internal verification error"
 
 
+def test_verify_stream_endpoint_emits_ndjson(monkeypatch) -> None:
+    received: list[str] = []
+
+    async def fake_verify_stream(emails, **kwargs):
+        received.extend(emails)
+        for idx in reversed(range(len(received))):
+            yield idx, _stub_result(received[idx])
+
+    monkeypatch.setattr(server, "API_KEY", "test-secret")
+    monkeypatch.setattr(server, "verify_stream", fake_verify_stream)
+    monkeypatch.setattr(server, "RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(server, "RATE_LIMIT_MAX", 100)
+    server._rate_limit_store.clear()
+
+    client = TestClient(server.app)
+    resp = client.post(
+        "/verify/stream",
+        content=b"a@example.com\n\nb@example.com\r\nc@example.com",
+        headers={"X-API-Key": "test-secret", "Content-Type": "text/plain"},
+    )
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert received == ["a@example.com", "b@example.com", "c@example.com"]
+    assert [(row["index"], row["email"]) for row in rows] == [
+        (2, "c@example.com"), (1, "b@example.com"), (0, "a@example.com"),
+    ]
+
+
 def test_readiness_endpoint_contract() -> None:
     client = TestClient(server.app)
     resp = client.get("/ready")
@@ -102,3 +212,4 @@ def test_metrics_endpoint_contract(monkeypatch) -> None:
     assert "tier_latency_ms" in body
     assert "cache" in body
     assert "rate_limited_429" in body
+    assert "mx_concurrency" in body
@@ -1,7 +1,7 @@
 import asyncio
 
 from engine.models import DnsInfo, Provider, Reachability, VerificationResult
-from engine.verifier import verify_batch
+from engine.verifier import verify_batch, verify_stream
 
 
 def _result(email: str) -> VerificationResult:
@@ -18,7 +18,7 @@ def _result(email: str) -> VerificationResult:
 def test_verify_batch_survives_single_email_crash(monkeypatch) -> None:
     emails = ["ok1@example.com", "boom@example.com", "ok2@example.com"]
 
-    async def fake_lookup_mx(domain: str):
+    async def fake_lookup_mx(domain: str, *args, **kwargs):
         return DnsInfo(
             mx_hosts=["mx.example.com"],
             has_mx=True,
@@ -32,6 +32,7 @@ def test_verify_batch_survives_single_email_crash(monkeypatch) -> None:
         return _result(email)
 
     monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.bulk_dns.lookup_mx", fake_lookup_mx)
     monkeypatch.setattr("engine.verifier.verify_email", fake_verify_email)
 
     results = asyncio.run(verify_batch(emails, concurrency=3))
@@ -41,3 +42,73 @@ def test_verify_batch_survives_single_email_crash(monkeypatch) -> None:
     assert results[1].reachability == Reachability.unknown
     assert results[1].error == "internal verification error"
     assert results[2].reachability == Reachability.safe
+
+
+def test_verify_stream_yields_every_index_with_bounded_read_ahead(monkeypatch) -> None:
+    emails = [f"u{i % 7}@d{i % 3}.example.com" for i in range(20)] + ["boom@example.com"]
+    pulled: list[int] = []
+
+    async def fake_lookup_mx(domain: str, *args, **kwargs):
+        return DnsInfo(mx_hosts=["mx.example.com"], has_mx=True, provider=Provider.generic, domain=domain)
+
+    async def fake_verify_email(email: str, **kwargs):
+        if email == "boom@example.com":
+            raise RuntimeError("simulated verifier crash")
+        await asyncio.sleep(0.001)
+        return _result(email)
+
+    async def source():
+        for i, email in enumerate(emails):
+            pulled.append(i)
+            yield email
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.bulk_dns.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.verify_email", fake_verify_email)
+
+    async def run():
+        seen = []
+        read_ahead = 0
+        async for idx, result in verify_stream(source(), concurrency=3, chunk_size=4, window=8):
+            read_ahead = max(read_ahead, len(pulled) - len(seen))
+            seen.append((idx, result))
+        return seen, read_ahead
+
+    seen, read_ahead = asyncio.run(run())
+
+    assert sorted(idx for idx, _ in seen) == list(range(len(emails)))
+    assert all(result.email == emails[idx] for idx, result in seen)
+    assert dict(seen)[len(emails) - 1].reachability == Reachability.unknown
+    # Two chunks in flight, plus the chunk being filled while waiting for a slot
+    assert read_ahead <= 8 + 4
+
+
+def test_verify_stream_caps_each_domain_across_chunks(monkeypatch) -> None:
+    emails = [f"u{i}@hot.example.com" for i in range(12)]
+    active = 0
+    peak = 0
+
+    async def fake_lookup_mx(domain: str, *args, **kwargs):
+        return DnsInfo(mx_hosts=["mx.example.com"], has_mx=True, provider=Provider.generic, domain=domain)
+
+    async def fake_verify_email(email: str, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return _result(email)
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.bulk_dns.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.verify_email", fake_verify_email)
+
+    async def run():
+        stream = verify_stream(emails, concurrency=8, domain_concurrency=2, chunk_size=2, window=12)
+        return [idx async for idx, _ in stream]
+
+    seen = asyncio.run(run())
+
+    assert sorted(seen) == list(range(len(emails)))
+    # Six chunks run at once; without a shared limiter each would allow 2
+    assert peak == 2
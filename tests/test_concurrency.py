@@ -0,0 +1,79 @@
+import asyncio
+
+from engine.concurrency import AimdLimiter, MxConcurrencyController
+
+
+def test_limit_grows_per_healthy_window_and_halves_on_congestion() -> None:
+    limiter = AimdLimiter(initial=2, maximum=4)
+    for _ in range(2):
+        limiter.on_success(0.05)
+    assert limiter.snapshot()["limit"] == 3
+    for _ in range(3):
+        limiter.on_success(0.05)
+    assert limiter.snapshot()["limit"] == 4
+    for _ in range(10):
+        limiter.on_success(0.05)
+    assert limiter.snapshot()["limit"] == 4
+
+    limiter.on_congestion("421")
+    limiter.on_congestion("timeout")  # same round trip: not cut twice
+    snap = limiter.snapshot()
+    assert snap["limit"] == 2
+    assert snap["decreases"] == 1
+    assert snap["congestion"] == {"421": 1, "timeout": 1}
+
+
+def test_latency_spike_does_not_raise_the_limit() -> None:
+    limiter = AimdLimiter(initial=1, maximum=4)
+    limiter.on_success(0.05)
+    assert limiter.snapshot()["limit"] == 2
+    for _ in range(2):
+        limiter.on_success(5.0)
+    assert limiter.snapshot()["limit"] == 2
+
+
+def test_waiters_admitted_when_limit_grows() -> None:
+    async def _main():
+        limiter = MxConcurrencyController(initial=1, maximum=2).limiter("MX.Example.com")
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        limiter.on_success(0.01)  # window of 1 healthy reply -> limit 2
+        await asyncio.wait_for(waiter, timeout=1)
+        return limiter.snapshot()
+
+    snap = asyncio.run(_main())
+    assert snap["limit"] == 2
+    assert snap["in_flight"] == 2
+
+
+def test_waiters_keep_their_turn_across_a_limit_cut() -> None:
+    async def _main():
+        limiter = AimdLimiter(initial=2, maximum=2)
+        admitted: list[str] = []
+
+        async def _session(name: str) -> None:
+            await limiter.acquire()
+            admitted.append(name)
+
+        async def _release_later() -> None:
+            for _ in range(3):
+                await asyncio.sleep(0.01)
+                limiter.release()
+
+        await limiter.acquire()
+        await limiter.acquire()
+        first = asyncio.ensure_future(_session("first"))
+        second = asyncio.ensure_future(_session("second"))
+        await asyncio.sleep(0)
+        limiter.on_congestion("421")  # limit 2 -> 1
+        limiter.release()
+        limiter.release()  # the one free slot is handed to "first"
+        releaser = asyncio.ensure_future(_release_later())
+        # Arrives before "first" has run: must queue, not take its slot
+        await _session("late")
+        await asyncio.wait_for(asyncio.gather(first, second, releaser), timeout=1)
+        return admitted
+
+    assert asyncio.run(_main()) == ["first", "second", "late"]
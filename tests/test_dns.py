@@ -0,0 +1,166 @@
+import asyncio
+from types import SimpleNamespace
+
+import dns.resolver
+import pytest
+
+from engine import dns as engine_dns
+from engine.bulk_dns import BulkResolver
+from engine.dns import DnsCache, lookup_mx, resolve_host_addresses
+from engine.models import Reachability
+from engine.verifier import verify_email
+
+
+class _Answer(list):
+    def __init__(self, records, ttl):
+        super().__init__(records)
+        self.rrset = SimpleNamespace(ttl=ttl)
+
+
+class FakeResolver:
+    """Answers from a table; records every query that reaches it."""
+
+    def __init__(self, table: dict, delay: float = 0.0):
+        self.table = table
+        self.delay = delay
+        self.queries: list[tuple[str, str]] = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def resolve(self, name, rdtype, lifetime=None):
+        self.queries.append((name, rdtype))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        answer = self.table.get((name, rdtype))
+        if isinstance(answer, Exception):
+            raise answer
+        if answer is None:
+            raise dns.resolver.NoAnswer()
+        records, ttl = answer
+        if rdtype == "MX":
+            records = [SimpleNamespace(preference=p, exchange=f"{host}.") for p, host in records]
+        return _Answer(records, ttl)
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    fake = FakeResolver({
+        ("gmail.com", "MX"): ([(20, "alt1.gmail-smtp-in.l.google.com"), (5, "gmail-smtp-in.l.google.com")], 3600),
+        ("nomx.example", "A"): (["192.0.2.10"], 0),
+        ("gone.example", "MX"): dns.resolver.NXDOMAIN(),
+        ("mx.dual.example", "AAAA"): (["2001:db8::25"], 300),
+        ("mx.dual.example", "A"): (["192.0.2.25", "192.0.2.26"], 300),
+        ("slow.example", "MX"): dns.exception.Timeout(),
+    })
+    monkeypatch.setattr(engine_dns, "_resolver", fake)
+    monkeypatch.setattr(engine_dns, "dns_cache", DnsCache(max_entries=100, negative_ttl=60, min_ttl=30))
+    return fake
+
+
+def test_answers_are_cached_and_concurrent_misses_share_a_query(resolver) -> None:
+    async def run():
+        first = await asyncio.gather(*(lookup_mx("gmail.com") for _ in range(5)))
+        again = await lookup_mx("GMAIL.com")
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first[0].mx_hosts == ["gmail-smtp-in.l.google.com", "alt1.gmail-smtp-in.l.google.com"]
+    assert again.mx_hosts == first[0].mx_hosts
+    assert [q for q in resolver.queries if q[0] == "gmail.com"] == [("gmail.com", "MX")]
+    # The best MX host's addresses were prefetched once
+    assert resolver.queries.count(("gmail-smtp-in.l.google.com", "A")) == 1
+    assert resolver.queries.count(("alt1.gmail-smtp-in.l.google.com", "A")) == 0
+    assert engine_dns.dns_cache.stats()["hits"] >= 1
+
+
+def test_negative_answers_cached_and_failures_not(resolver) -> None:
+    async def run():
+        for _ in range(2):
+            await lookup_mx("nomx.example")
+            await lookup_mx("gone.example")
+            await lookup_mx("slow.example")
+
+    asyncio.run(run())
+    assert resolver.queries.count(("nomx.example", "MX")) == 1
+    assert resolver.queries.count(("nomx.example", "A")) == 1
+    # NXDOMAIN: no A/AAAA fallback, and cached
+    assert [q for q in resolver.queries if q[0] == "gone.example"] == [("gone.example", "MX")]
+    # Timeouts are retried on the next lookup
+    assert resolver.queries.count(("slow.example", "MX")) == 2
+
+
+def test_host_addresses_ipv4_first_and_cached(resolver) -> None:
+    async def run():
+        first = await resolve_host_addresses("mx.dual.example")
+        again = await resolve_host_addresses("MX.DUAL.example")
+        missing = await resolve_host_addresses("slow.example")
+        literal = await resolve_host_addresses("198.51.100.7")
+        return first, again, missing, literal
+
+    first, again, missing, literal = asyncio.run(run())
+    assert first == ["192.0.2.25", "192.0.2.26", "2001:db8::25"]
+    assert again == first
+    assert resolver.queries.count(("mx.dual.example", "A")) == 1
+    assert missing == []
+    assert literal == ["198.51.100.7"]
+    assert not any(q[0] == "198.51.100.7" for q in resolver.queries)
+
+
+def test_cache_honors_ttl_and_evicts_lru(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(engine_dns.time, "monotonic", lambda: now[0])
+    cache = DnsCache(max_entries=2, negative_ttl=10, min_ttl=30, max_ttl=100)
+
+    cache.put("a.example", "MX", ("mx.a.example",), ttl=0)  # clamped up to 30s
+    cache.put("b.example", "MX", ("mx.b.example",), ttl=1000)  # clamped down to 100s
+    assert cache.get("a.example", "MX") is not None
+    cache.put("c.example", "MX", ("mx.c.example",), ttl=60)  # evicts b (least recently used)
+    assert cache.get("b.example", "MX") is None
+
+    now[0] += 31
+    assert cache.get("a.example", "MX") is None
+    assert cache.get("c.example", "MX") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_timed_out_lookup_is_unknown_not_invalid(resolver) -> None:
+    info = asyncio.run(lookup_mx("slow.example"))
+    assert not info.has_mx and info.error
+
+    result = asyncio.run(verify_email("someone@slow.example"))
+    assert result.reachability == Reachability.unknown
+    assert result.error.startswith("dns:")
+
+    # An empty answer is still a definite "no MX"
+    assert not asyncio.run(lookup_mx("gone.example")).error
+
+
+def test_bulk_resolver_retries_on_next_upstream(resolver) -> None:
+    broken = FakeResolver({("gmail.com", "MX"): dns.exception.Timeout()})
+    bulk = BulkResolver(upstreams={"broken": broken, "good": resolver}, attempts=2)
+
+    info = asyncio.run(bulk.lookup("gmail.com"))  # starts on the broken upstream
+    assert info.has_mx and not info.error
+    assert broken.queries.count(("gmail.com", "MX")) == 1
+    assert resolver.queries.count(("gmail.com", "MX")) == 1
+    stats = bulk.stats()
+    assert stats["retried"] == 1 and stats["failed"] == 0
+    assert stats["upstreams"]["broken"]["failed_lookups"] == 1
+
+
+def test_bulk_resolver_bounds_concurrency_and_reports_progress(monkeypatch) -> None:
+    monkeypatch.setattr(engine_dns, "dns_cache", DnsCache(max_entries=1000))
+    table = {(f"d{i}.example", "MX"): ([(10, f"mx.d{i}.example")], 300) for i in range(40)}
+    upstream = FakeResolver(table, delay=0.005)
+    bulk = BulkResolver(upstreams={"ns": upstream}, concurrency=4)
+    progress: list[tuple[int, int]] = []
+
+    domains = [f"D{i}.example" for i in range(40)] + ["d0.example", ""]
+    results = asyncio.run(bulk.resolve(domains, lambda done, total: progress.append((done, total))))
+
+    assert len(results) == 40 and all(info.has_mx for info in results.values())
+    # One MX query plus the A/AAAA prefetch pair per domain in flight at most
+    assert upstream.peak <= 4 * 2
+    assert progress[-1] == (40, 40) and len(progress) == 40
@@ -0,0 +1,52 @@
+import asyncio
+
+from engine.domain_queue import DomainWorkQueue
+
+
+def test_round_robin_across_domains_with_per_domain_limit() -> None:
+    started: list[str] = []
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def _main() -> None:
+        async def handler(item: tuple[str, int]) -> None:
+            domain, _ = item
+            started.append(domain)
+            active[domain] = active.get(domain, 0) + 1
+            peak[domain] = max(peak.get(domain, 0), active[domain])
+            await asyncio.sleep(0.01)
+            active[domain] -= 1
+
+        async with DomainWorkQueue(handler, workers=3, per_key_limit=1) as work:
+            # A hot domain queued first must not starve the cold ones
+            for i in range(6):
+                work.put("hot.com", ("hot.com", i))
+            work.put("cold1.com", ("cold1.com", 0))
+            work.put("cold2.com", ("cold2.com", 0))
+            assert len(work) == 8
+            await work.join()
+            assert len(work) == 0
+            assert work.dispatched == 8
+
+    asyncio.run(_main())
+    assert sorted(started[:3]) == ["cold1.com", "cold2.com", "hot.com"]
+    assert peak == {"hot.com": 1, "cold1.com": 1, "cold2.com": 1}
+
+
+def test_put_future_resolves_after_handler_even_when_it_fails() -> None:
+    handled: list[int] = []
+
+    async def _main() -> None:
+        async def handler(item: int) -> None:
+            handled.append(item)
+            if item == 1:
+                raise RuntimeError("boom")
+
+        async with DomainWorkQueue(handler, workers=2, per_key_limit=2) as work:
+            await asyncio.gather(work.put("a.com", 1), work.put("a.com", 2))
+            # Items queued while idle still get picked up
+            await work.put("b.com", 3)
+            await work.join()
+
+    asyncio.run(_main())
+    assert sorted(handled) == [1, 2, 3]
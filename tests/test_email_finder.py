@@ -207,7 +207,10 @@ class TestFindEmailsBatch:
                 reachability=Reachability.risky,
             )
 
-        with patch("engine.email_finder.lookup_mx", side_effect=mock_lookup_mx):
+        async def mock_resolve_domains(domains, progress_callback=None):
+            return {d: await mock_lookup_mx(d) for d in domains}
+
+        with patch("engine.email_finder.resolve_domains", side_effect=mock_resolve_domains):
             with patch("engine.email_finder.check_catch_all", side_effect=mock_catch_all):
                 with patch("engine.email_finder.find_email", side_effect=tracking_find):
                     results = asyncio.run(find_emails_batch(contacts, concurrency=5))
@@ -234,7 +237,8 @@ class TestFindEmailsBatch:
                 method="test",
             )
 
-        with patch("engine.email_finder.find_email", side_effect=mock_find):
+        with patch("engine.email_finder.find_email", side_effect=mock_find), \
+                patch("engine.email_finder.resolve_domains", new_callable=AsyncMock, return_value={}):
             with patch("engine.email_finder._get_domain_intel", new_callable=AsyncMock,
                        return_value=(DnsInfo(has_mx=True, mx_hosts=["mx"]), None)):
                 results = asyncio.run(find_emails_batch(contacts, concurrency=5))
@@ -0,0 +1,24 @@
+from engine.errors import _classify, parse_smtp_response
+
+
+def test_reply_categories_keep_their_precedence() -> None:
+    blacklisted = parse_smtp_response(554, "554 5.7.1 Client host [203.0.113.7] blocked using zen.spamhaus.org")
+    disabled = parse_smtp_response(550, "550 5.2.1 The email account that you tried to reach is disabled")
+    full = parse_smtp_response(452, "452 4.2.2 The email account that you tried to reach is over quota")
+    multiline = parse_smtp_response(550, "550-5.1.1 The email account that you tried to reach\n550 5.1.1 does not exist")
+
+    assert blacklisted.is_blacklisted and not blacklisted.is_invalid
+    assert disabled.is_disabled and disabled.is_invalid
+    assert full.is_full_inbox and not full.is_greylisted
+    assert multiline.is_invalid
+
+
+def test_replies_differing_only_by_address_share_a_memo_entry() -> None:
+    _classify.cache_clear()
+    first = parse_smtp_response(550, "550 5.1.1 <alice@example.com>: Recipient address rejected: User unknown")
+    second = parse_smtp_response(550, "550 5.1.1 <Bob.Jones@Example.org>: Recipient address rejected: User unknown")
+
+    assert first.is_invalid and second.is_invalid
+    assert second.message.startswith("550 5.1.1 <Bob.Jones@")
+    info = _classify.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from engine.greylist import RetryScheduler
+from engine.models import DnsInfo, Provider, Reachability, SmtpResponse
+from engine.verifier import DEADLINE_PARTIAL, verify_batch, verify_email
+
+
+def test_retry_scheduler_dispatches_in_due_order_and_allows_redefer() -> None:
+    handled: list[str] = []
+
+    async def _main() -> None:
+        async def handler(item: str) -> None:
+            handled.append(item)
+            if item == "b":
+                scheduler.defer("b-again", 0.01)
+
+        scheduler = RetryScheduler(handler)
+        scheduler.defer("b", 0.02)
+        scheduler.defer("a", 0.01)
+        scheduler.defer("c", 0.05)
+        assert scheduler.pending == 3
+        await scheduler.join()
+        assert scheduler.pending == 0
+
+    asyncio.run(_main())
+    assert handled == ["a", "b", "b-again", "c"]
+
+
+def test_greylisted_address_does_not_hold_batch_slot(monkeypatch) -> None:
+    emails = ["grey@slow.com", "a@fast.com", "b@fast.com"]
+    calls: list[tuple[str, float]] = []
+    start = time.monotonic()
+
+    async def fake_lookup_mx(domain: str, *args, **kwargs):
+        return DnsInfo(mx_hosts=[f"mx.{domain}"], has_mx=True, provider=Provider.generic, domain=domain)
+
+    async def fake_smtp_check_batch(recipients, mx_host, **kwargs):
+        return [SmtpResponse(code=0, message="connection refused") for _ in recipients]
+
+    async def fake_smtp_check(email, mx_host, **kwargs):
+        assert kwargs["greylist_retries"] == 0
+        calls.append((email, time.monotonic() - start))
+        if email == "grey@slow.com" and sum(1 for e, _ in calls if e == email) == 1:
+            return SmtpResponse(code=450, message="4.2.0 Greylisted, try again later", is_greylisted=True)
+        return SmtpResponse(code=250, message="ok")
+
+    async def fake_check_catch_all(domain, mx_host, **kwargs):
+        return False
+
+    async def fake_smtp_check_with_catch_all(email, mx_host, **kwargs):
+        return await fake_smtp_check(email, mx_host, **kwargs), False
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.bulk_dns.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.smtp_check_batch", fake_smtp_check_batch)
+    monkeypatch.setattr("engine.verifier.smtp_check", fake_smtp_check)
+    monkeypatch.setattr("engine.verifier.check_catch_all", fake_check_catch_all)
+    monkeypatch.setattr("engine.verifier.smtp_check_with_catch_all", fake_smtp_check_with_catch_all)
+    monkeypatch.setattr("engine.verifier.GREYLIST_DELAY", 0.3)
+    monkeypatch.setattr("engine.verifier.GREYLIST_RETRIES", 2)
+
+    progress: list[str] = []
+    results = asyncio.run(verify_batch(emails, concurrency=1, progress_callback=lambda r: progress.append(r.email)))
+
+    assert [r.reachability for r in results] == [Reachability.safe] * 3
+    # The other addresses ran while the greylisted one waited for its retry
+    assert [e for e, _ in calls] == ["grey@slow.com", "a@fast.com", "b@fast.com", "grey@slow.com"]
+    assert calls[2][1] < 0.3 <= calls[3][1]
+    assert progress == ["a@fast.com", "b@fast.com", "grey@slow.com"]
+
+
+def test_greylisted_reply_under_deadline_returns_partial_result(monkeypatch) -> None:
+    seen: dict[str, object] = {}
+
+    async def fake_lookup_mx(domain: str, *args, **kwargs):
+        return DnsInfo(mx_hosts=[f"mx.{domain}"], has_mx=True, provider=Provider.generic, domain=domain)
+
+    async def fake_smtp_check_with_catch_all(email, mx_host, **kwargs):
+        seen["deadline"] = kwargs["deadline"]
+        return SmtpResponse(code=450, message="4.2.0 Greylisted, try again later", is_greylisted=True), None
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.smtp_check_with_catch_all", fake_smtp_check_with_catch_all)
+
+    deadline = time.monotonic() + 5
+    result = asyncio.run(verify_email("grey@deadline.com", deadline=deadline))
+
+    assert seen["deadline"] == deadline
+    assert result.error == DEADLINE_PARTIAL
+    assert result.reachability == Reachability.risky
+    assert result.smtp_code == 450
@@ -0,0 +1,161 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from engine import domain_intel
+from engine.models import DnsInfo, Provider, Reachability, SmtpResponse
+from engine.smtp import MxCapabilityCache, RcptLimitTable
+from engine.verifier import verify_email
+from store.cache import DomainCache
+from store.intel_store import IntelStore, bind_mx_capabilities, bind_rcpt_limits
+
+
+def test_rcpt_limits_persist_across_store_instances(tmp_path) -> None:
+    db_path = tmp_path / "intel.sqlite"
+
+    first = IntelStore(db_path)
+    table = RcptLimitTable()
+    bind_rcpt_limits(table, first)
+    table.observe("mx.example.com", 25)
+    first.close()
+
+    second = IntelStore(db_path)
+    fresh_table = RcptLimitTable()
+    bind_rcpt_limits(fresh_table, second)
+
+    assert fresh_table.get("mx.example.com") == 25
+    assert second.load_rcpt_limits(max_age=-1) == {}
+    second.close()
+
+
+def test_writes_are_queued_and_committed_off_the_caller(tmp_path) -> None:
+    store = IntelStore(tmp_path / "intel.sqlite")
+    for i in range(50):
+        store.save_rcpt_limit(f"mx{i}.example.com", 10 + i)
+    store.flush()
+    assert len(store.load_rcpt_limits()) == 50
+
+    store.save_domain_catch_all("acme.com", True)
+    store.close()
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.save_rcpt_limit("late.example.com", 5)
+
+    reopened = IntelStore(tmp_path / "intel.sqlite")
+    assert reopened.load_domain("acme.com")["is_catch_all"] is True
+    reopened.close()
+
+
+def test_domain_intel_reads_through_to_the_store(tmp_path) -> None:
+    db_path = tmp_path / "intel.sqlite"
+    first = IntelStore(db_path)
+    writer = DomainCache(backend=first)
+    writer.set_dns("Acme.com", DnsInfo(mx_hosts=["mx1.acme.com", "mx2.acme.com"], has_mx=True,
+                                       provider=Provider.microsoft365, domain="acme.com"))
+    writer.set_catch_all("acme.com", True)
+    writer.set_catch_all("maybe.com", None)  # indeterminate: memory only
+    writer.set_dns("flaky.com", DnsInfo(domain="flaky.com", error="MX lookup failed (Timeout)"))
+    first.close()
+
+    # A fresh process: nothing in memory, everything comes from the store
+    second = IntelStore(db_path)
+    reader = DomainCache(backend=second)
+    dns_info = reader.get_dns("acme.com")
+    assert dns_info.mx_hosts == ["mx1.acme.com", "mx2.acme.com"]
+    assert dns_info.provider == Provider.microsoft365
+    assert reader.has_catch_all("acme.com") and reader.get_catch_all("acme.com") is True
+    assert not reader.has_catch_all("maybe.com")
+    assert reader.get_dns("flaky.com") is None
+    assert reader.stats()["backend_hits"] == 1
+    second.close()
+
+
+def test_domain_intel_prefetch_reads_a_batch_off_the_loop(tmp_path) -> None:
+    store = IntelStore(tmp_path / "intel.sqlite")
+    DomainCache(backend=store).set_catch_all("acme.com", True)
+    store.flush()
+
+    cache = DomainCache(backend=store)
+    loaded: list[list[str]] = []
+    load_domains = store.load_domains
+    store.load_domains = lambda domains: loaded.append(domains) or load_domains(domains)
+    store.load_domain = lambda domain: pytest.fail("prefetched domains must not be read on the loop")
+
+    asyncio.run(cache.prefetch(["Acme.com", "other.com", "acme.com"]))
+    assert loaded == [["acme.com", "other.com"]]
+    assert cache.get_catch_all("acme.com") is True
+    assert not cache.has_catch_all("other.com") and cache.get_dns("other.com") is None
+    asyncio.run(cache.prefetch(["acme.com"]))  # fresh: no second query
+    assert len(loaded) == 1
+    store.close()
+
+
+def test_mx_capabilities_persist_across_store_instances(tmp_path) -> None:
+    db_path = tmp_path / "intel.sqlite"
+    first = IntelStore(db_path)
+    cache = MxCapabilityCache()
+    bind_mx_capabilities(cache, first)
+    cache.record_features("mx.example.com", {"PIPELINING", "STARTTLS"})
+    cache.mark_requires_tls("mx.example.com")
+    first.close()
+
+    second = IntelStore(db_path)
+    fresh = MxCapabilityCache()
+    bind_mx_capabilities(fresh, second)
+    entry = fresh.get("mx.example.com")
+    assert entry.pipelining and entry.requires_tls
+    second.close()
+
+
+def test_loaded_mx_capabilities_keep_their_age(tmp_path) -> None:
+    store = IntelStore(tmp_path / "intel.sqlite")
+    store.save_mx_capabilities("fresh.example.com", {"PIPELINING"}, False)
+    store.save_mx_capabilities("stale.example.com", {"STARTTLS"}, True)
+    store.flush()
+    store._conn.execute(
+        "UPDATE mx_capabilities SET observed_at = observed_at - 3000 WHERE mx_host = 'stale.example.com'"
+    )
+    store._conn.commit()
+
+    cache = MxCapabilityCache(ttl=3600)
+    bind_mx_capabilities(cache, store)
+    assert cache.get("fresh.example.com").pipelining
+    # Restored with its stored age: it expires on schedule, not an hour from now
+    assert cache.get("stale.example.com").requires_tls
+    cache._entries["stale.example.com"].observed_at -= 601
+    assert cache.get("stale.example.com") is None
+
+    short = MxCapabilityCache(ttl=60)
+    bind_mx_capabilities(short, store)
+    assert short.get("stale.example.com") is None
+    assert not short.wants_tls("stale.example.com")
+    store.close()
+
+
+def test_verify_email_uses_shared_domain_intel(monkeypatch) -> None:
+    shared = DomainCache()
+    shared.set_dns("acme.com", DnsInfo(mx_hosts=["mx.acme.com"], has_mx=True, domain="acme.com"))
+    shared.set_catch_all("acme.com", False)
+    probed: list[str] = []
+
+    async def fail_lookup_mx(*args, **kwargs):
+        pytest.fail("MX lookup should come from the shared domain intel")
+
+    async def fake_smtp_check(email, mx_host, **kwargs):
+        probed.append(email)
+        return SmtpResponse(code=250, message="ok")
+
+    async def fail_probe(*args, **kwargs):
+        pytest.fail("catch-all verdict should come from the shared domain intel")
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fail_lookup_mx)
+    monkeypatch.setattr("engine.verifier.smtp_check", fake_smtp_check)
+    monkeypatch.setattr("engine.verifier.smtp_check_with_catch_all", fail_probe)
+    monkeypatch.setattr("engine.verifier.check_catch_all", fail_probe)
+    monkeypatch.setattr(domain_intel, "_shared", shared)
+
+    result = asyncio.run(verify_email("jane@acme.com"))
+    assert result.reachability == Reachability.safe
+    assert result.is_catch_all is False
+    assert probed == ["jane@acme.com"]
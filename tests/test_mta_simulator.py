@@ -0,0 +1,87 @@
+import asyncio
+import functools
+import shutil
+
+import pytest
+
+from benchmarks.mta_simulator import MtaProfile, MtaSimulator, self_signed_tls_context
+from engine import smtp
+from engine.latency import MxLatencyTracker
+from engine.models import DnsInfo, Reachability
+from engine.mx_health import MxHealthTable
+from engine.smtp import MxCapabilityCache, RcptLimitTable, smtp_check, smtp_check_batch
+from engine.verifier import verify_batch
+
+
+@pytest.fixture(autouse=True)
+def _fresh_host_state(monkeypatch):
+    monkeypatch.setattr(smtp, "mx_latency", MxLatencyTracker())
+    monkeypatch.setattr(smtp, "mx_health", MxHealthTable())
+    monkeypatch.setattr(smtp, "mx_capabilities", MxCapabilityCache())
+    monkeypatch.setattr(smtp, "rcpt_limits", RcptLimitTable())
+
+
+def _run(coro):
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await smtp.close_session_pool()
+
+    return asyncio.run(wrapper())
+
+
+def test_batch_against_rcpt_limited_pipelining_mta() -> None:
+    sim = MtaSimulator(MtaProfile(latency=0.005, rcpt_limit=3))
+    emails = [f"user{i}@example.com" for i in range(4)] + [f"nobody{i}@example.com" for i in range(4)]
+
+    async def run():
+        async with sim:
+            return await smtp_check_batch(emails, "127.0.0.1", port=sim.port)
+
+    results = _run(run())
+    assert [r.code for r in results] == [250] * 4 + [550] * 4
+    assert all(r.is_invalid for r in results[4:])
+    assert sim.stats.rcpts > len(emails)  # the 452s were retried
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="needs the openssl CLI")
+def test_starttls_required_mta(tmp_path) -> None:
+    profile = MtaProfile(starttls=True, require_tls=True, tls_context=self_signed_tls_context(str(tmp_path)))
+    sim = MtaSimulator(profile)
+
+    async def run():
+        async with sim:
+            return await smtp_check("user1@example.com", "127.0.0.1", port=sim.port)
+
+    result = _run(run())
+    assert result.code == 250
+    assert sim.stats.tls_upgrades == 1
+
+
+def test_verify_batch_end_to_end_with_greylisting_and_drops(monkeypatch) -> None:
+    sim = MtaSimulator(MtaProfile(latency=0.002, greylist=True, disconnect_rate=0.05, seed=7))
+
+    async def fake_lookup_mx(domain: str, *args, **kwargs) -> DnsInfo:
+        return DnsInfo(mx_hosts=["127.0.0.1"], has_mx=True, domain=domain)
+
+    async def run():
+        async with sim:
+            for name in ("smtp_check", "smtp_check_batch", "check_catch_all", "smtp_check_with_catch_all"):
+                monkeypatch.setattr(
+                    f"engine.verifier.{name}", functools.partial(getattr(smtp, name), port=sim.port)
+                )
+            emails = [f"user{i}@d{i % 3}.test" for i in range(6)] + [f"nobody{i}@d{i % 3}.test" for i in range(6)]
+            return emails, await verify_batch(emails, concurrency=4)
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.bulk_dns.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.GREYLIST_DELAY", 0)
+    emails, results = _run(run())
+
+    assert [r.email for r in results] == emails
+    # A connection dropped twice in a row leaves an address unknown, never wrong
+    assert all(r.reachability in (Reachability.safe, Reachability.unknown) for r in results[:6])
+    assert all(r.reachability in (Reachability.invalid, Reachability.unknown) for r in results[6:])
+    assert sum(r.reachability != Reachability.unknown for r in results) >= 10
+    assert sim.stats.greylisted >= len(emails)
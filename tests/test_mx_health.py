@@ -0,0 +1,51 @@
+from engine.mx_health import MxHealthTable
+
+
+def test_circuit_opens_then_allows_one_half_open_trial() -> None:
+    table = MxHealthTable(failure_threshold=2, open_seconds=0.0)
+    table.record("mx1.example.com", False)
+    assert table.allow("mx1.example.com")
+    table.record("mx1.example.com", False)
+
+    # open_seconds=0: the circuit is immediately half-open with one trial
+    assert table.allow("mx1.example.com")
+    assert not table.allow("mx1.example.com")
+    table.record("mx1.example.com", True, 0.05)
+    assert table.snapshot()["mx1.example.com"]["state"] == "closed"
+    assert table.allow("mx1.example.com")
+
+
+def test_failed_trial_reopens_and_abandoned_trial_is_released() -> None:
+    table = MxHealthTable(failure_threshold=1, open_seconds=0.0)
+    table.record("mx1.example.com", False)
+    assert table.allow("mx1.example.com")
+    table.record("mx1.example.com", None)
+    assert table.allow("mx1.example.com")
+    table.record("mx1.example.com", False)
+    assert table.snapshot()["mx1.example.com"]["failures"] == 2
+
+
+def test_order_moves_failing_hosts_behind_healthy_ones() -> None:
+    table = MxHealthTable(failure_threshold=3, open_seconds=60.0)
+    hosts = ["mx1.example.com", "mx2.example.com", "mx3.example.com"]
+    assert table.order(hosts) == hosts
+
+    for _ in range(3):
+        table.record("mx1.example.com", False)
+    table.record("mx2.example.com", True, 0.1)
+
+    assert table.order(hosts) == ["mx2.example.com", "mx3.example.com", "mx1.example.com"]
+    assert table.snapshot()["mx1.example.com"]["state"] == "open"
+
+
+def test_order_prefers_a_much_faster_backup_over_a_slow_primary() -> None:
+    table = MxHealthTable()
+    hosts = ["mx1.example.com", "mx2.example.com"]
+    table.record("mx1.example.com", True, 0.3)
+    table.record("mx2.example.com", True, 0.1)
+    # Comparable latency: DNS preference wins
+    assert table.order(hosts) == hosts
+
+    for _ in range(10):
+        table.record("mx1.example.com", True, 4.0)
+    assert table.order(hosts) == ["mx2.example.com", "mx1.example.com"]
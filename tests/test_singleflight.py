@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from engine.models import DnsInfo, Provider, SmtpResponse
+from engine.singleflight import SingleFlight
+from engine.verifier import verify_email
+
+
+def test_concurrent_callers_share_one_call() -> None:
+    calls = 0
+
+    async def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def _main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*[flight.do("k", fetch) for _ in range(5)])
+        assert not flight.pending("k")
+        assert flight.shared == 4
+        # Finished flights are not cached
+        assert await flight.do("k", fetch) == 42
+        return results
+
+    assert asyncio.run(_main()) == [42] * 5
+    assert calls == 2
+
+
+def test_errors_reach_every_waiter() -> None:
+    async def boom() -> None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("probe failed")
+
+    async def _main():
+        flight = SingleFlight()
+        return await asyncio.gather(flight.do("k", boom), flight.do("k", boom), return_exceptions=True)
+
+    results = asyncio.run(_main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_concurrent_verifications_probe_catch_all_once(monkeypatch) -> None:
+    lookups: list[str] = []
+    combined: list[str] = []
+    singles: list[str] = []
+
+    async def fake_lookup_mx(domain: str):
+        lookups.append(domain)
+        await asyncio.sleep(0.01)
+        return DnsInfo(mx_hosts=["mx.acme.com"], has_mx=True, provider=Provider.generic, domain=domain)
+
+    async def fake_smtp_check_with_catch_all(email, mx_host, **kwargs):
+        combined.append(email)
+        await asyncio.sleep(0.02)
+        return SmtpResponse(code=250, message="ok"), False
+
+    async def fake_smtp_check(email, mx_host, **kwargs):
+        singles.append(email)
+        return SmtpResponse(code=250, message="ok")
+
+    async def fake_check_catch_all(*args, **kwargs):
+        pytest.fail("catch-all verdict should come from the in-flight probe")
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.smtp_check_with_catch_all", fake_smtp_check_with_catch_all)
+    monkeypatch.setattr("engine.verifier.smtp_check", fake_smtp_check)
+    monkeypatch.setattr("engine.verifier.check_catch_all", fake_check_catch_all)
+
+    async def _main():
+        catch_all_cache: dict = {}
+        return await asyncio.gather(
+            verify_email("jane@acme.com", catch_all_cache=catch_all_cache),
+            verify_email("john@acme.com", catch_all_cache=catch_all_cache),
+        )
+
+    results = asyncio.run(_main())
+
+    assert lookups == ["acme.com"]
+    assert combined == ["jane@acme.com"]
+    assert singles == ["john@acme.com"]
+    assert [r.is_catch_all for r in results] == [False, False]
+
+
+def test_waiter_retries_when_leader_is_cancelled() -> None:
+    calls = 0
+
+    async def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def _main():
+        flight = SingleFlight()
+        leader = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    # The waiter was never cancelled: it takes over and gets a result
+    assert asyncio.run(_main()) == 42
+    assert calls == 2
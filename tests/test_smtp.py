@@ -0,0 +1,738 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+from engine import smtp
+from engine.latency import LatencySketch, MxLatencyTracker
+from engine.mx_health import MxHealthTable
+from engine.errors import parse_smtp_response
+from engine.smtp_protocol import open_smtp_connection
+from engine.source_ip import SourceIpPool
+from engine.smtp import (
+    MxCapabilityCache,
+    RcptLimitTable,
+    SmtpSessionPool,
+    check_catch_all,
+    rcpt_limit_for,
+    smtp_check,
+    smtp_check_batch,
+    smtp_check_with_catch_all,
+)
+
+
+class FakeMta:
+    """Minimal line-based SMTP server that records connections and commands.
+
+    With ``pipelining`` set, PIPELINING is advertised and replies to
+    MAIL/RCPT are held back until a full group of ``group_size`` commands
+    has arrived, so a client that waits between commands stalls.
+    """
+
+    def __init__(
+        self,
+        valid: set[str],
+        drop_after_rcpt: bool = False,
+        pipelining: bool = False,
+        group_size: int = 0,
+        rcpt_limit: int = 0,
+        starttls: bool = False,
+        require_tls: bool = False,
+        broken_tls: bool = False,
+        banner_delay: float = 0.0,
+        blocked_ips: set[str] = frozenset(),
+    ):
+        self.valid = valid
+        self.drop_after_rcpt = drop_after_rcpt
+        self.pipelining = pipelining
+        self.group_size = group_size
+        self.rcpt_limit = rcpt_limit
+        self.starttls = starttls
+        self.require_tls = require_tls
+        self.broken_tls = broken_tls
+        self.banner_delay = banner_delay
+        self.blocked_ips = blocked_ips
+        self.connections = 0
+        self.peers: list[str] = []
+        self.commands: list[str] = []
+        self.writers: set = set()
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        # wait_closed() waits for open clients (3.12.1+); pooled sessions are still connected.
+        for writer in list(self.writers):
+            writer.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.writers.add(writer)
+        try:
+            await self._serve(reader, writer)
+        finally:
+            self.writers.discard(writer)
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        peer = writer.get_extra_info("peername")[0]
+        self.peers.append(peer)
+        if self.banner_delay:
+            await asyncio.sleep(self.banner_delay)
+        if peer in self.blocked_ips:
+            writer.write(b"554 5.7.1 Client host blocked using zen.spamhaus.org\r\n")
+            await writer.drain()
+            writer.close()
+            return
+        writer.write(b"220 fake.mta ESMTP\r\n")
+        held: list[bytes] = []
+        rcpts = 0
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            cmd = line.decode().strip()
+            self.commands.append(cmd)
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                extensions = ["PIPELINING"] if self.pipelining else []
+                if self.starttls:
+                    extensions.append("STARTTLS")
+                lines = ["fake.mta"] + extensions + ["8BITMIME"]
+                writer.write("".join(
+                    f"250{' ' if i == len(lines) - 1 else '-'}{line}\r\n" for i, line in enumerate(lines)
+                ).encode())
+            elif verb == "STARTTLS" and self.broken_tls:
+                writer.write(b"220 2.0.0 go ahead\r\n" + b"not a TLS record\r\n" * 4)
+                await writer.drain()
+                break
+            elif verb == "STARTTLS":
+                writer.write(b"454 4.7.0 TLS not available due to local problem\r\n")
+            elif verb == "MAIL" and self.require_tls:
+                writer.write(b"530 5.7.0 Must issue a STARTTLS command first\r\n")
+            elif verb in ("MAIL", "RCPT") and self.group_size:
+                held.append(self._reply(cmd, verb))
+                if len(held) == self.group_size:
+                    writer.write(b"".join(held))
+                    held.clear()
+            elif verb == "RCPT":
+                rcpts += 1
+                addr = cmd.split("<", 1)[1].rstrip(">")
+                if self.rcpt_limit and rcpts > self.rcpt_limit:
+                    writer.write(b"452 4.5.3 Error: too many recipients\r\n")
+                elif addr in self.valid:
+                    writer.write(b"250 2.1.5 ok\r\n")
+                else:
+                    writer.write(b"550 5.1.1 user unknown\r\n")
+                if self.drop_after_rcpt:
+                    await writer.drain()
+                    break
+            elif verb == "QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                rcpts = 0
+                writer.write(b"250 ok\r\n")
+            await writer.drain()
+        writer.close()
+
+    def _reply(self, cmd: str, verb: str) -> bytes:
+        if verb == "MAIL":
+            return b"250 2.1.0 ok\r\n"
+        addr = cmd.split("<", 1)[1].rstrip(">")
+        return b"250 2.1.5 ok\r\n" if addr in self.valid else b"550 5.1.1 user unknown\r\n"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_host_state(monkeypatch):
+    monkeypatch.setattr(smtp, "mx_latency", MxLatencyTracker())
+    monkeypatch.setattr(smtp, "mx_health", MxHealthTable())
+
+
+def _run(coro):
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await smtp.close_session_pool()
+
+    return asyncio.run(wrapper())
+
+
+def test_smtp_check_reuses_pooled_session_with_rset() -> None:
+    mta = FakeMta(valid={"alice@example.com"})
+
+    async def run():
+        port = await mta.start()
+        try:
+            first = await smtp_check("alice@example.com", "127.0.0.1", port=port)
+            second = await smtp_check("bob@example.com", "127.0.0.1", port=port)
+            catch_all = await check_catch_all("example.com", "127.0.0.1", port=port)
+            return first, second, catch_all
+        finally:
+            await mta.stop()
+
+    first, second, catch_all = _run(run())
+
+    assert first.code == 250
+    assert second.code == 550 and second.is_invalid
+    assert catch_all is False
+    assert mta.connections == 1
+    assert [c for c in mta.commands if c.startswith("EHLO")] == [f"EHLO {smtp.DEFAULT_HELO_DOMAIN}"]
+    assert mta.commands.count("RSET") == 2
+
+
+def test_dropped_session_is_evicted_and_redialed() -> None:
+    mta = FakeMta(valid={"alice@example.com"}, drop_after_rcpt=True)
+
+    async def run():
+        port = await mta.start()
+        try:
+            first = await smtp_check("alice@example.com", "127.0.0.1", port=port)
+            await asyncio.sleep(0.05)
+            second = await smtp_check("alice@example.com", "127.0.0.1", port=port)
+            return first, second
+        finally:
+            await mta.stop()
+
+    first, second = _run(run())
+
+    assert first.code == 250
+    assert second.code == 250
+    assert mta.connections == 2
+
+
+def test_pool_caps_sessions_per_host() -> None:
+    mta = FakeMta(valid=set())
+
+    async def run():
+        port = await mta.start()
+        pool = SmtpSessionPool(max_per_host=2)
+        try:
+            held = [await pool.acquire("127.0.0.1", port=port) for _ in range(2)]
+            waiter = asyncio.ensure_future(pool.acquire("127.0.0.1", port=port))
+            await asyncio.sleep(0.05)
+            blocked = not waiter.done()
+            pool.release(held[0])
+            third = await asyncio.wait_for(waiter, timeout=2)
+            pool.release(third)
+            pool.release(held[1])
+            return blocked, pool.stats()
+        finally:
+            pool.close()
+            await mta.stop()
+
+    blocked, stats = asyncio.run(run())
+
+    assert blocked is True
+    assert stats["dialed"] == 2
+    assert stats["reused"] == 1
+
+
+def test_smtp_check_batch_pipelines_when_advertised() -> None:
+    emails = ["a@example.com", "b@example.com", "c@example.com"]
+    mta = FakeMta(valid={"b@example.com"}, pipelining=True, group_size=len(emails) + 1)
+
+    async def run():
+        port = await mta.start()
+        try:
+            return await smtp_check_batch(emails, "127.0.0.1", port=port, command_timeout=1)
+        finally:
+            await mta.stop()
+
+    results = _run(run())
+
+    assert [r.code for r in results] == [550, 250, 550]
+    assert mta.connections == 1
+
+
+def test_smtp_check_batch_stays_serial_without_pipelining() -> None:
+    emails = ["a@example.com", "b@example.com"]
+    mta = FakeMta(valid={"a@example.com"})
+
+    async def run():
+        port = await mta.start()
+        try:
+            return await smtp_check_batch(emails, "127.0.0.1", port=port)
+        finally:
+            await mta.stop()
+
+    results = _run(run())
+
+    assert [r.code for r in results] == [250, 550]
+    assert [c.split(":")[0] for c in mta.commands if c.startswith(("MAIL", "RCPT"))] == [
+        "MAIL FROM", "RCPT TO", "RCPT TO",
+    ]
+
+
+def test_rcpt_limit_reply_is_not_greylisting() -> None:
+    result = parse_smtp_response(452, "4.5.3 Error: too many recipients")
+
+    assert result.is_rcpt_limit is True
+    assert result.is_greylisted is False
+    assert parse_smtp_response(452, "4.2.2 Mailbox full").is_rcpt_limit is False
+
+
+def test_smtp_check_batch_splits_on_rcpt_limit_and_learns_it(monkeypatch) -> None:
+    table = RcptLimitTable()
+    monkeypatch.setattr(smtp, "rcpt_limits", table)
+    emails = [f"u{i}@example.com" for i in range(5)]
+    mta = FakeMta(valid={"u1@example.com", "u4@example.com"}, rcpt_limit=2)
+
+    async def run():
+        port = await mta.start()
+        try:
+            return await smtp_check_batch(emails, "127.0.0.1", port=port)
+        finally:
+            await mta.stop()
+
+    results = _run(run())
+
+    assert [r.code for r in results] == [550, 250, 550, 550, 250]
+    assert not any(r.is_rcpt_limit for r in results)
+    assert mta.connections == 1
+    assert table.get("127.0.0.1") == 2
+    assert rcpt_limit_for("127.0.0.1") == 2
+
+
+def test_smtp_check_batch_requeues_recipients_after_a_dropped_connection() -> None:
+    # The MTA hangs up after every RCPT; the unanswered recipients go on new sessions
+    mta = FakeMta(valid={"a@example.com", "c@example.com"}, drop_after_rcpt=True)
+    emails = ["a@example.com", "b@example.com", "c@example.com"]
+
+    async def run():
+        port = await mta.start()
+        try:
+            return await smtp_check_batch(emails, "127.0.0.1", port=port, fallback_individual=False)
+        finally:
+            await mta.stop()
+
+    results = _run(run())
+
+    assert [r.code for r in results] == [250, 550, 250]
+    assert mta.connections == 3
+
+
+def test_smtp_check_batch_fallback_keeps_the_callers_retry_policy(monkeypatch) -> None:
+    calls: list[tuple] = []
+
+    async def fake_smtp_check(email, mx_host, helo_domain, from_address, port, *timeouts, **kwargs):
+        calls.append((email, timeouts, kwargs))
+        return smtp.SmtpResponse(code=250, message="ok")
+
+    monkeypatch.setattr(smtp, "smtp_check", fake_smtp_check)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]  # nothing listens here once closed
+    deadline = time.monotonic() + 30
+
+    results = _run(smtp_check_batch(
+        ["a@example.com", "b@example.com"], "127.0.0.1", port=port,
+        connect_timeout=2, command_timeout=3, greylist_retries=0, deadline=deadline,
+    ))
+    expired = _run(smtp_check_batch(["c@example.com"], "127.0.0.1", port=port, deadline=time.monotonic()))
+
+    assert [r.code for r in results] == [250, 250]
+    assert calls == [
+        (email, (2, 3), {"greylist_retries": 0, "deadline": deadline})
+        for email in ("a@example.com", "b@example.com")
+    ]
+    assert expired[0].message == smtp.DEADLINE_EXCEEDED and len(calls) == 2
+
+
+def test_smtp_check_batch_starts_at_the_learned_rcpt_limit(monkeypatch) -> None:
+    table = RcptLimitTable()
+    table.observe("127.0.0.1", 2)
+    monkeypatch.setattr(smtp, "rcpt_limits", table)
+    emails = [f"u{i}@example.com" for i in range(5)]
+    mta = FakeMta(valid={"u1@example.com"}, rcpt_limit=2)
+
+    async def run():
+        port = await mta.start()
+        try:
+            return await smtp_check_batch(emails, "127.0.0.1", port=port)
+        finally:
+            await mta.stop()
+
+    results = _run(run())
+
+    assert [r.code for r in results] == [550, 250, 550, 550, 550]
+    # Chunks of two from the start: no RCPT was refused and sent again
+    assert len([c for c in mta.commands if c.startswith("RCPT")]) == 5
+    assert mta.commands.count(f"MAIL FROM:<{smtp.DEFAULT_FROM_ADDRESS}>") == 3
+
+
+def test_rcpt_limit_table_only_lowers_and_notifies() -> None:
+    table = RcptLimitTable()
+    seen: list[tuple[str, int]] = []
+    table.subscribe(lambda mx, limit: seen.append((mx, limit)))
+
+    table.observe("MX.Example.com", 50)
+    table.observe("mx.example.com", 80)
+    table.observe("mx.example.com", 20)
+
+    assert table.get("mx.example.com") == 20
+    assert seen == [("mx.example.com", 50), ("mx.example.com", 20)]
+
+
+def test_starttls_skipped_until_host_refuses_plaintext(monkeypatch) -> None:
+    monkeypatch.setattr(smtp, "mx_capabilities", MxCapabilityCache())
+    plain = FakeMta(valid={"alice@example.com"}, starttls=True, pipelining=True)
+    strict = FakeMta(valid={"alice@example.com"}, starttls=True, require_tls=True)
+
+    async def run():
+        plain_port = await plain.start()
+        strict_port = await strict.start()
+        try:
+            ok = await smtp_check("alice@example.com", "127.0.0.1", port=plain_port)
+            plain_caps = smtp.mx_capabilities.get("127.0.0.1").as_dict()
+            refused = await smtp_check("alice@example.com", "127.0.0.1", port=strict_port)
+            return ok, plain_caps, refused
+        finally:
+            await plain.stop()
+            await strict.stop()
+
+    ok, plain_caps, refused = _run(run())
+
+    assert ok.code == 250
+    assert "STARTTLS" not in plain.commands
+    assert plain_caps["pipelining"] and plain_caps["starttls"] and not plain_caps["requires_tls"]
+
+    # 530 on plaintext -> host marked, one redial that negotiates STARTTLS
+    assert refused.code == 530
+    assert strict.connections == 2
+    assert strict.commands.count("STARTTLS") == 1
+    assert smtp.mx_capabilities.get("127.0.0.1").requires_tls
+
+
+def test_failed_tls_handshake_redials_in_plaintext(monkeypatch) -> None:
+    monkeypatch.setattr(smtp, "STARTTLS_MODE", "always")
+    monkeypatch.setattr(smtp, "mx_capabilities", MxCapabilityCache())
+    mta = FakeMta(valid={"alice@example.com"}, starttls=True, broken_tls=True)
+
+    async def run():
+        port = await mta.start()
+        try:
+            return await smtp_check("alice@example.com", "127.0.0.1", port=port)
+        finally:
+            await mta.stop()
+
+    result = _run(run())
+
+    assert result.code == 250
+    assert mta.connections == 2
+    assert mta.commands.count("STARTTLS") == 1
+    assert smtp.mx_capabilities.get("127.0.0.1").tls_broken
+    assert not smtp.mx_capabilities.wants_tls("127.0.0.1")
+
+
+def test_only_tls_refusals_pin_a_host_to_starttls() -> None:
+    assert smtp._requires_tls((530, "5.7.0 Must issue a STARTTLS command first"))
+    assert smtp._requires_tls((554, "5.7.0 TLS required for this recipient"))
+    assert not smtp._requires_tls((530, "5.7.0 Authentication required"))
+    assert not smtp._requires_tls((530, "Access denied"))
+    assert not smtp._requires_tls((250, "2.1.0 ok, STARTTLS available"))
+
+
+def test_capability_cache_entries_expire() -> None:
+    cache = MxCapabilityCache(ttl=60)
+    cache.record_features("MX.Example.com", {"PIPELINING", "CHUNKING"})
+    cache.mark_requires_tls("mx.example.com")
+    assert cache.snapshot()["mx.example.com"]["chunking"]
+    cache._entries["mx.example.com"].observed_at -= 61
+    assert cache.get("mx.example.com") is None
+    assert not cache.wants_tls("mx.example.com")
+
+
+def test_catch_all_probe_shares_the_transaction() -> None:
+    mta = FakeMta(valid={"alice@example.com"}, pipelining=True)
+
+    async def run():
+        port = await mta.start()
+        try:
+            return await smtp_check_with_catch_all("alice@example.com", "127.0.0.1", port=port)
+        finally:
+            await mta.stop()
+
+    result, is_catch_all = _run(run())
+
+    assert result.code == 250
+    assert is_catch_all is False
+    assert mta.connections == 1
+    rcpts = [c for c in mta.commands if c.startswith("RCPT")]
+    assert rcpts[0] == "RCPT TO:<alice@example.com>"
+    assert len(rcpts) == 2 and rcpts[1].endswith("@example.com>")
+
+
+def test_deadline_cuts_probe_short() -> None:
+    mta = FakeMta(valid={"alice@example.com"}, banner_delay=1.0)
+
+    async def run():
+        port = await mta.start()
+        try:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            result = await smtp_check(
+                "alice@example.com", "127.0.0.1", port=port, deadline=time.monotonic() + 0.2,
+            )
+            expired = await smtp_check(
+                "alice@example.com", "127.0.0.1", port=port, deadline=time.monotonic() - 1,
+            )
+            return result, expired, loop.time() - started
+        finally:
+            await mta.stop()
+
+    result, expired, elapsed = _run(run())
+
+    assert result.code == 0 and result.message == smtp.DEADLINE_EXCEEDED
+    assert expired.message == smtp.DEADLINE_EXCEEDED
+    assert elapsed < 0.8
+    # The expired call never dialed, and deadline cuts are not held against the host
+    assert mta.connections == 1
+    assert smtp.mx_health.snapshot().get("127.0.0.1", {}).get("failures", 0) == 0
+
+
+def test_catch_all_probe_cut_by_rcpt_limit_keeps_the_real_verdict(monkeypatch) -> None:
+    table = RcptLimitTable()
+    monkeypatch.setattr(smtp, "rcpt_limits", table)
+    mta = FakeMta(valid={"alice@example.com"}, rcpt_limit=1)
+
+    async def run():
+        port = await mta.start()
+        try:
+            return await smtp_check_with_catch_all("alice@example.com", "127.0.0.1", port=port)
+        finally:
+            await mta.stop()
+
+    result, is_catch_all = _run(run())
+
+    assert result.code == 250
+    assert is_catch_all is False
+    # No fresh redial: the probe moves to its own transaction on the same session
+    assert mta.connections == 1
+    assert [c for c in mta.commands if c.startswith("RCPT")][0] == "RCPT TO:<alice@example.com>"
+    assert len([c for c in mta.commands if c.startswith("RCPT")]) == 3
+    assert table.get("127.0.0.1") == 1
+
+
+def test_latency_sketch_quantiles_within_bucket_error() -> None:
+    sketch = LatencySketch(decay_every=10_000)
+    for i in range(1, 1001):
+        sketch.add(i / 1000.0)
+    assert sketch.quantile(0.5) == pytest.approx(0.5, rel=0.15)
+    assert sketch.quantile(0.99) == pytest.approx(0.99, rel=0.15)
+
+
+def test_timeouts_shrink_to_host_latency_within_bounds() -> None:
+    tracker = MxLatencyTracker(min_timeout=2.0, min_samples=4)
+    defaults = (10.0, 10.0, 45.0)
+    assert tracker.timeouts("mx.fast.com", None, None, None, *defaults) == defaults
+    for _ in range(10):
+        tracker.observe_connect("mx.fast.com", 0.05)
+        tracker.observe_banner("mx.fast.com", 0.05)
+        tracker.observe_command("mx.fast.com", 0.02)
+    connect, command, total = tracker.timeouts("mx.fast.com", None, None, None, *defaults)
+    assert connect == command == 2.0
+    assert total < 45.0
+    # Explicit values win
+    assert tracker.timeouts("mx.fast.com", 7.0, None, 30.0, *defaults)[::2] == (7.0, 30.0)
+
+
+def test_tarpit_banner_gets_longer_wait() -> None:
+    tracker = MxLatencyTracker(tarpit_banner=0.1)
+    for _ in range(3):
+        tracker.observe_banner("mx.tarpit.com", 0.3)
+        tracker.observe_command("mx.tarpit.com", 0.01)
+    assert tracker.is_tarpit("mx.tarpit.com")
+    assert tracker.banner_timeout("mx.tarpit.com", 0.2, cap=20.0) > 0.5
+
+
+def test_slow_banner_is_learned_and_waited_out() -> None:
+    mta = FakeMta(valid={"alice@example.com"}, banner_delay=0.3)
+
+    async def run():
+        port = await mta.start()
+        try:
+            await smtp_check("alice@example.com", "127.0.0.1", port=port)
+            pool = smtp.get_session_pool()
+            pool.close()
+            # The learned banner delay outlasts a short command timeout
+            return await smtp_check("alice@example.com", "127.0.0.1", port=port, command_timeout=0.2)
+        finally:
+            await mta.stop()
+
+    result = _run(run())
+
+    assert result.code == 250
+    assert mta.connections == 2
+
+
+def test_circuit_opens_after_repeated_connect_failures() -> None:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def run():
+        return [await smtp_check("a@example.com", "127.0.0.1", port=port) for _ in range(4)]
+
+    results = _run(run())
+
+    assert all(r.code == 0 for r in results)
+    assert "refused" in results[2].message
+    assert "circuit open" in results[3].message
+    assert smtp.mx_health.snapshot()["127.0.0.1"]["state"] == "open"
+
+
+def test_total_timeouts_count_against_mx_health() -> None:
+    # Each reply arrives inside the command timeout, the transaction never
+    # inside the total one
+    mta = FakeMta(valid={"a@example.com"}, banner_delay=0.5)
+
+    async def run():
+        port = await mta.start()
+        try:
+            return [
+                await smtp_check(
+                    "a@example.com", "127.0.0.1", port=port,
+                    command_timeout=2, total_timeout=0.2, greylist_retries=0,
+                )
+                for _ in range(4)
+            ]
+        finally:
+            await mta.stop()
+
+    results = _run(run())
+
+    assert [r.message for r in results[:3]] == ["total timeout exceeded"] * 3
+    assert "circuit open" in results[3].message
+    assert smtp.mx_health.snapshot()["127.0.0.1"]["failures"] == 3
+
+
+def test_failover_to_secondary_mx_when_primary_refuses() -> None:
+    mta = FakeMta(valid={"alice@example.com"})
+
+    async def run():
+        port = await mta.start()
+        try:
+            return await smtp.with_mx_failover(
+                ["127.0.0.2", "127.0.0.1"],
+                lambda mx: smtp_check("alice@example.com", mx, port=port),
+                smtp.is_unreachable,
+            )
+        finally:
+            await mta.stop()
+
+    mx_host, result = _run(run())
+
+    assert mx_host == "127.0.0.1"
+    assert result.code == 250
+    assert smtp.mx_health.snapshot()["127.0.0.2"]["failures"] == 1
+
+
+def test_protocol_parses_split_multiline_and_pipelined_replies() -> None:
+    async def handle(reader, writer):
+        # Banner split mid-line, then a multi-line reply and a second reply in one chunk
+        writer.write(b"220 fake")
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        writer.write(b".mta ESMTP\r\n")
+        await reader.readline()
+        writer.write(b"250-fake.mta\r\n250-PIPELINING\r\n250 8BITMIME\r\n250 2.1.0 ok\r\n")
+        await writer.drain()
+        await reader.readline()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            protocol = await open_smtp_connection("127.0.0.1", port, 2)
+            banner = await protocol.read_replies(1, 2)
+            await protocol.send(["EHLO test"])
+            replies = await protocol.read_replies(2, 2)
+            missing = await protocol.read_replies(1, 0.05)
+            protocol.close()
+            return banner, replies, missing
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    banner, replies, missing = asyncio.run(run())
+    assert banner == [(220, "220 fake.mta ESMTP")]
+    assert replies == [(250, "250-fake.mta\n250-PIPELINING\n250 8BITMIME"), (250, "250 2.1.0 ok")]
+    assert missing == [(0, "read timeout")]
+
+
+def test_connect_by_ip_falls_back_to_next_address() -> None:
+    async def handle(reader, writer):
+        writer.write(b"220 fake.mta ESMTP\r\n")
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            # Nothing listens on 127.0.0.2: that attempt fails and 127.0.0.1 wins
+            protocol = await open_smtp_connection("mx.example", port, 2, addresses=["127.0.0.2", "127.0.0.1"])
+            banner = await protocol.read_replies(1, 2)
+            peer = protocol.transport.get_extra_info("peername")[0]
+            protocol.close()
+            return banner, peer
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    banner, peer = asyncio.run(run())
+    assert banner == [(220, "220 fake.mta ESMTP")]
+    assert peer == "127.0.0.1"
+
+
+def test_sessions_spread_over_source_addresses_with_their_helo() -> None:
+    mta = FakeMta(valid={"alice@example.com"})
+    sources = SourceIpPool([("127.0.0.2", "a.helo.test"), ("127.0.0.3", "b.helo.test")])
+
+    async def run():
+        port = await mta.start()
+        smtp._pools[asyncio.get_running_loop()] = SmtpSessionPool(enabled=False, sources=sources)
+        try:
+            for _ in range(4):
+                result = await smtp_check("alice@example.com", "127.0.0.1", port=port)
+                assert result.code == 250
+        finally:
+            await mta.stop()
+
+    _run(run())
+    assert mta.peers == ["127.0.0.2", "127.0.0.3"] * 2
+    helos = [c for c in mta.commands if c.startswith("EHLO")]
+    assert helos == ["EHLO a.helo.test", "EHLO b.helo.test"] * 2
+    assert sources.snapshot()["127.0.0.2"]["transactions"] == 2
+
+
+def test_blacklisted_source_address_is_benched() -> None:
+    mta = FakeMta(valid={"alice@example.com"}, blocked_ips={"127.0.0.3"})
+    sources = SourceIpPool([("127.0.0.2", "a.helo.test"), ("127.0.0.3", "b.helo.test")], min_samples=2, alpha=0.5)
+
+    async def run():
+        port = await mta.start()
+        smtp._pools[asyncio.get_running_loop()] = SmtpSessionPool(enabled=False, sources=sources)
+        try:
+            return [
+                await smtp_check("alice@example.com", "127.0.0.1", port=port, greylist_retries=0)
+                for _ in range(10)
+            ]
+        finally:
+            await mta.stop()
+
+    results = _run(run())
+    snapshot = sources.snapshot()
+    assert snapshot["127.0.0.3"]["benched"] and snapshot["127.0.0.3"]["blacklisted"] >= 2
+    assert not snapshot["127.0.0.2"]["benched"]
+    assert mta.peers[-4:] == ["127.0.0.2"] * 4
+    assert all(r.code == 250 for r in results[-4:])
@@ -1,8 +1,10 @@
 import asyncio
+import time
 from datetime import datetime, timezone
 
 from engine.models import Provider, Reachability, VerificationResult
-from engine.tiered_verifier import Tier3BackgroundScheduler, verify_email_tiered
+from engine.tiered_verifier import Tier3BackgroundScheduler, background_scheduler, verify_email_tiered
+from engine.verifier import DEADLINE_PARTIAL
 
 
 def test_tier3_scheduler_is_bounded() -> None:
@@ -19,7 +21,7 @@ def test_tier3_scheduler_is_bounded() -> None:
 
 
 def test_role_filter_can_be_disabled(monkeypatch) -> None:
-    async def fake_full_verify_email(email: str, helo_domain: str, from_address: str):
+    async def fake_full_verify_email(email: str, helo_domain: str, from_address: str, deadline=None):
         return VerificationResult(
             email=email,
             normalized=email,
@@ -48,3 +50,41 @@ def test_role_filter_can_be_disabled(monkeypatch) -> None:
     assert result.is_deliverable is True
     assert tier == 3
     assert reason == "full_smtp_verification"
+
+
+def test_deadline_partial_result_is_returned_and_finished_in_background(monkeypatch) -> None:
+    calls: list[dict] = []
+    cached: list[VerificationResult] = []
+
+    async def fake_full_verify_email(email: str, helo_domain: str, from_address: str, deadline=None):
+        calls.append(deadline)
+        partial = deadline is not None
+        return VerificationResult(
+            email=email,
+            normalized=email,
+            reachability=Reachability.risky if partial else Reachability.safe,
+            is_deliverable=None if partial else True,
+            domain=email.split("@")[-1],
+            smtp_code=450 if partial else 250,
+            error=DEADLINE_PARTIAL if partial else None,
+        )
+
+    monkeypatch.setattr("engine.tiered_verifier.full_verify_email", fake_full_verify_email)
+
+    async def run():
+        result, tier, reason = await verify_email_tiered(
+            email="slow@example.com",
+            force_tier=3,
+            cache_update_fn=cached.append,
+            deadline=time.monotonic() + 5,
+        )
+        await background_scheduler().join()
+        return result, tier, reason
+
+    result, tier, reason = asyncio.run(run())
+
+    assert (tier, reason) == (3, "deadline_exceeded_partial")
+    assert result.error == DEADLINE_PARTIAL
+    # Only the background run's complete result reaches the cache
+    assert len(calls) == 2 and calls[0] is not None and calls[1] is None
+    assert [r.reachability for r in cached] == [Reachability.safe]
@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+from engine.timing import StageTimings
+
+
+def test_disabled_timings_record_nothing() -> None:
+    timings = StageTimings(enabled=False)
+    with timings.span("dns", provider="google") as span:
+        span.mx = "mx.example.com"
+    timings.record("rcpt", 0.2, mx="mx.example.com")
+    assert timings.snapshot()["stages"] == {}
+
+
+def test_stage_histograms_by_provider_and_mx_with_trace(tmp_path) -> None:
+    trace = tmp_path / "trace.jsonl"
+    timings = StageTimings(trace_path=str(trace), max_mx=1)
+    assert timings.enabled
+
+    for ms in (10, 20, 30, 40):
+        timings.record("rcpt", ms / 1000.0, provider="google_workspace", mx="ASPMX.L.GOOGLE.COM")
+    timings.record("rcpt", 0.5, mx="mx.other.net")
+
+    async def _main() -> None:
+        with timings.span("dns") as span:
+            await asyncio.sleep(0.01)
+            span.provider = "generic"
+
+    asyncio.run(_main())
+    timings.close()
+
+    stages = timings.snapshot()["stages"]
+    rcpt = stages["rcpt"]
+    assert rcpt["count"] == 5
+    assert rcpt["mean_ms"] == 120.0
+    assert rcpt["p50_ms"] is not None and 25 <= rcpt["p50_ms"] <= 40
+    assert rcpt["by_provider"]["google_workspace"]["count"] == 4
+    # MX labels are capped; the overflow goes to "other"
+    assert rcpt["by_mx"]["aspmx.l.google.com"]["count"] == 4
+    assert rcpt["by_mx"]["other"]["count"] == 1
+    assert stages["dns"]["by_provider"]["generic"]["p50_ms"] >= 10
+
+    lines = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert [line["stage"] for line in lines] == ["rcpt"] * 5 + ["dns"]
+    assert lines[0]["mx"] == "aspmx.l.google.com" and lines[0]["ms"] == 10.0
@@ -0,0 +1,77 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from engine.metadata import classify
+from engine.models import DnsInfo, Provider, Reachability
+from engine.syntax import validate_syntax
+from engine.triage import needs_network, settled_results, triage
+
+CASES = [
+    "a@b.com",
+    " John.Doe+news@GoogleMail.com ",
+    "bad",
+    "a..b@c.com",
+    ".a@c.com",
+    "a.@c.com",
+    '"q"@c.com',
+    "a@b",
+    "a@b.c",
+    "a@b.c0m",
+    "a@-b.com",
+    "x@" + "a" * 64 + ".com",
+    "a" * 65 + "@c.com",
+    "a@b@c.com",
+    "a @c.com",
+    "ü@c.com",
+    "a@b..com",
+    "info@mailinator.com",
+    "admin@sub.gmail.com",
+    "A+B@Example.ORG",
+    "",
+]
+
+
+def test_triage_matches_scalar_syntax_and_metadata() -> None:
+    rows = triage(pa.array(CASES)).to_pylist()
+
+    assert [row["index"] for row in rows] == list(range(len(CASES)))
+    for email, row in zip(CASES, rows):
+        syntax = validate_syntax(email)
+        assert (row["stage"] != "invalid_syntax") == syntax.is_valid, email
+        if not syntax.is_valid:
+            continue
+        meta = classify(syntax.local_part, syntax.domain)
+        assert row["normalized"] == syntax.normalized
+        assert row["domain"] == syntax.domain
+        assert (row["is_disposable"], row["is_role"], row["is_free"]) == (
+            meta["is_disposable"], meta["is_role"], meta["is_free"],
+        )
+
+
+def test_triage_joins_dns_and_settles_rows_without_network() -> None:
+    dns_cache = {
+        "nomx.com": DnsInfo(domain="nomx.com", has_mx=False),
+        "live.com": DnsInfo(domain="live.com", has_mx=True, mx_hosts=["mx"], provider=Provider.hotmail),
+        "flaky.com": DnsInfo(domain="flaky.com", error="timeout"),
+    }
+    emails = ["a@nomx.com", "b@live.com", "c@flaky.com", "d@unknown.com", "nope", "e@mailinator.com"]
+    table = triage(emails, dns_cache=dns_cache)
+
+    assert table.column("stage").to_pylist() == [
+        "no_mx", "no_smtp", "smtp", "smtp", "invalid_syntax", "disposable",
+    ]
+    assert table.column("has_mx").to_pylist() == [False, True, None, None, None, None]
+
+    settled = dict(settled_results(table))
+    assert sorted(settled) == [0, 4]
+    assert settled[0].reachability == Reachability.invalid
+    assert settled[0].error == "no MX or A records found"
+    assert settled[4].error == "syntax: must contain exactly one @"
+    assert needs_network(table).column("email").to_pylist() == [
+        "b@live.com", "c@flaky.com", "d@unknown.com", "e@mailinator.com",
+    ]
+
+    settled = dict(settled_results(table, skip_disposable=True))
+    assert settled[5].reachability == Reachability.risky and settled[5].is_disposable
+    assert "e@mailinator.com" not in needs_network(table, skip_disposable=True).column("email").to_pylist()
@@ -0,0 +1,203 @@
+import asyncio
+
+from engine.models import DnsInfo, Provider, Reachability, SmtpResponse
+from engine.verifier import _plan_mx_sessions, verify_batch
+
+
+def _dns(domain: str, mx: str, provider: Provider = Provider.generic) -> DnsInfo:
+    return DnsInfo(mx_hosts=[mx], has_mx=True, provider=provider, domain=domain)
+
+
+def test_plan_groups_domains_sharing_an_mx_and_chunks(monkeypatch) -> None:
+    monkeypatch.setattr("engine.verifier.rcpt_limit_for", lambda mx: 2)
+    dns_cache = {
+        "a.com": _dns("a.com", "aspmx.l.google.com", Provider.google_workspace),
+        "b.com": _dns("b.com", "aspmx.l.google.com", Provider.google_workspace),
+        "c.com": _dns("c.com", "mx.c.com"),
+        "live.com": _dns("live.com", "x.olc.protection.outlook.com", Provider.hotmail),
+        "nomx.com": DnsInfo(has_mx=False, domain="nomx.com"),
+    }
+    emails = [
+        "one@a.com", "two@b.com", "Three@a.com", "one@a.com",
+        "x@c.com", "y@live.com", "z@nomx.com", "not-an-email",
+    ]
+
+    plan = _plan_mx_sessions(emails, dns_cache)
+
+    assert plan == [
+        ("aspmx.l.google.com", ["one@a.com", "two@b.com"]),
+        ("aspmx.l.google.com", ["three@a.com"]),
+        ("mx.c.com", ["x@c.com"]),
+    ]
+
+
+def test_verify_batch_uses_session_results_and_retries_inconclusive(monkeypatch) -> None:
+    emails = ["ok@a.com", "bad@b.com", "grey@a.com"]
+    batch_calls: list[tuple[str, list[str]]] = []
+    single_calls: list[str] = []
+
+    async def fake_lookup_mx(domain: str, *args, **kwargs):
+        return _dns(domain, "mx.shared.net")
+
+    async def fake_smtp_check_batch(recipients, mx_host, **kwargs):
+        assert kwargs["fallback_individual"] is False
+        batch_calls.append((mx_host, list(recipients)))
+        replies = {
+            "ok@a.com": SmtpResponse(code=250, message="ok"),
+            "bad@b.com": SmtpResponse(code=550, message="user unknown", is_invalid=True),
+            "grey@a.com": SmtpResponse(code=451, message="greylisted", is_greylisted=True),
+        }
+        unknown = SmtpResponse(code=550, message="user unknown", is_invalid=True)
+        return [replies.get(r, unknown) for r in recipients]
+
+    async def fake_smtp_check(email, mx_host, **kwargs):
+        assert kwargs["greylist_retries"] == 0
+        single_calls.append(email)
+        return SmtpResponse(code=250, message="ok")
+
+    async def fake_check_catch_all(domain, mx_host, **kwargs):
+        raise AssertionError("catch-all verdicts come from the planned sessions")
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.bulk_dns.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.smtp_check_batch", fake_smtp_check_batch)
+    monkeypatch.setattr("engine.verifier.smtp_check", fake_smtp_check)
+    monkeypatch.setattr("engine.verifier.check_catch_all", fake_check_catch_all)
+    monkeypatch.setattr("engine.verifier.GREYLIST_DELAY", 0)
+
+    results = asyncio.run(verify_batch(emails, concurrency=2))
+
+    assert len(batch_calls) == 1
+    mx_host, recipients = batch_calls[0]
+    assert mx_host == "mx.shared.net"
+    # One random catch-all probe per domain, right after its first address
+    assert recipients[0] == "ok@a.com" and recipients[1].endswith("@a.com")
+    assert recipients[2] == "bad@b.com" and recipients[3].endswith("@b.com")
+    assert recipients[4] == "grey@a.com" and len(recipients) == 5
+    assert single_calls == ["grey@a.com"]
+    assert [r.email for r in results] == emails
+    assert [r.reachability for r in results] == [
+        Reachability.safe,
+        Reachability.invalid,
+        Reachability.safe,
+    ]
+
+
+def test_plan_adds_one_catch_all_probe_per_domain() -> None:
+    dns_cache = {
+        "a.com": _dns("a.com", "mx.shared.net"),
+        "b.com": _dns("b.com", "mx.shared.net"),
+    }
+    probes: dict[str, str] = {}
+
+    plan = _plan_mx_sessions(["x@a.com", "y@a.com", "z@b.com"], dns_cache, probes)
+
+    assert sorted(probes.values()) == ["a.com", "b.com"]
+    (mx_host, recipients), = plan
+    assert [r for r in recipients if r not in probes] == ["x@a.com", "y@a.com", "z@b.com"]
+    assert recipients.index(next(p for p, d in probes.items() if d == "a.com")) == 1
+
+
+def test_verify_batch_collapses_duplicate_mailboxes(monkeypatch) -> None:
+    emails = ["ok@a.com", "grey@a.com", "OK@A.com ", "bad@b.com", "Grey@a.com", "ok@a.com"]
+    batch_recipients: list[str] = []
+    single_calls: list[str] = []
+
+    async def fake_lookup_mx(domain: str, *args, **kwargs):
+        return _dns(domain, "mx.shared.net")
+
+    async def fake_smtp_check_batch(recipients, mx_host, **kwargs):
+        batch_recipients.extend(recipients)
+        replies = {
+            "ok@a.com": SmtpResponse(code=250, message="ok"),
+            "grey@a.com": SmtpResponse(code=451, message="greylisted", is_greylisted=True),
+        }
+        unknown = SmtpResponse(code=550, message="user unknown", is_invalid=True)
+        return [replies.get(r, unknown) for r in recipients]
+
+    async def fake_smtp_check(email, mx_host, **kwargs):
+        single_calls.append(email)
+        return SmtpResponse(code=250, message="ok")
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.bulk_dns.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.smtp_check_batch", fake_smtp_check_batch)
+    monkeypatch.setattr("engine.verifier.smtp_check", fake_smtp_check)
+    monkeypatch.setattr("engine.verifier.GREYLIST_DELAY", 0)
+
+    progress: list[str] = []
+    results = asyncio.run(verify_batch(emails, concurrency=2, progress_callback=lambda r: progress.append(r.email)))
+
+    # One RCPT per mailbox and one greylist retry, whatever the duplicates
+    assert sorted(r for r in batch_recipients if r in ("ok@a.com", "grey@a.com", "bad@b.com")) == [
+        "bad@b.com", "grey@a.com", "ok@a.com",
+    ]
+    assert single_calls == ["grey@a.com"]
+    assert [r.email for r in results] == emails
+    assert [r.reachability for r in results] == [
+        Reachability.safe,
+        Reachability.safe,
+        Reachability.safe,
+        Reachability.invalid,
+        Reachability.safe,
+        Reachability.safe,
+    ]
+    assert {r.normalized for r in results} == {"ok@a.com", "grey@a.com", "bad@b.com"}
+    assert sorted(progress) == sorted(emails)
+
+
+def test_verify_batch_reports_the_planned_mx_for_session_results(monkeypatch) -> None:
+    emails = ["ok@a.com", "bad@a.com"]
+    ranked: list[int] = []
+
+    async def fake_lookup_mx(domain: str, *args, **kwargs):
+        return DnsInfo(mx_hosts=["mx1.a.com", "mx2.a.com"], has_mx=True, domain=domain)
+
+    def fake_mx_candidates(mx_hosts):
+        # Health ranking flips after the plan is made
+        ranked.append(1)
+        return list(mx_hosts) if len(ranked) == 1 else list(reversed(mx_hosts))
+
+    async def fake_smtp_check_batch(recipients, mx_host, **kwargs):
+        assert mx_host == "mx1.a.com"
+        return [
+            SmtpResponse(code=250, message="ok") if r == "ok@a.com"
+            else SmtpResponse(code=550, message="user unknown", is_invalid=True)
+            for r in recipients
+        ]
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.bulk_dns.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.mx_candidates", fake_mx_candidates)
+    monkeypatch.setattr("engine.verifier.smtp_check_batch", fake_smtp_check_batch)
+
+    results = asyncio.run(verify_batch(emails, concurrency=2))
+
+    assert [r.reachability for r in results] == [Reachability.safe, Reachability.invalid]
+    assert {r.mx_host for r in results} == {"mx1.a.com"}
+
+
+def test_verify_batch_logs_a_failed_session_and_checks_individually(monkeypatch, caplog) -> None:
+    async def fake_lookup_mx(domain: str, *args, **kwargs):
+        return _dns(domain, "mx.shared.net")
+
+    async def failing_smtp_check_batch(recipients, mx_host, **kwargs):
+        raise RuntimeError("session exploded")
+
+    async def fake_smtp_check(email, mx_host, **kwargs):
+        return SmtpResponse(code=250, message="ok")
+
+    async def fake_smtp_check_with_catch_all(email, mx_host, **kwargs):
+        return SmtpResponse(code=250, message="ok"), False
+
+    monkeypatch.setattr("engine.verifier.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.bulk_dns.lookup_mx", fake_lookup_mx)
+    monkeypatch.setattr("engine.verifier.smtp_check_batch", failing_smtp_check_batch)
+    monkeypatch.setattr("engine.verifier.smtp_check", fake_smtp_check)
+    monkeypatch.setattr("engine.verifier.smtp_check_with_catch_all", fake_smtp_check_with_catch_all)
+
+    with caplog.at_level("WARNING"):
+        results = asyncio.run(verify_batch(["ok@a.com"], concurrency=1))
+
+    assert results[0].reachability == Reachability.safe
+    assert "failed on mx.shared.net: session exploded" in caplog.text